@@ -0,0 +1,143 @@
+import asyncio
+import atexit
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError
+
+from .models import Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBuffer:
+    """
+    Write-behind buffer for chat messages received over WebSockets.
+
+    Messages are kept in memory and written with a single bulk INSERT once
+    `batch_size` messages are pending or `flush_interval` milliseconds after
+    the first pending one, whichever comes first. Consumers flush it on
+    disconnect and the process flushes it at exit. The buffer is only
+    changed from the event loop: the rows are detached before the INSERT
+    runs in a worker thread, and rows to retry are put back afterwards.
+
+    Messages are broadcast before they are written, so a failed batch is
+    not dropped: it is written again row by row, rows the database rejects
+    are logged and counted in `dropped`, and if the database cannot be
+    reached the remaining rows go back to the buffer for the next flush.
+
+    Attributes:
+        batch_size (int): Number of pending messages that triggers a flush.
+        flush_interval (int): Maximum time in milliseconds a message stays pending.
+        dropped (int): Number of messages the database rejected.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or settings.CHAT_MESSAGE_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.CHAT_MESSAGE_FLUSH_INTERVAL
+        self.pending = []
+        self.timer = None
+        self.timer_loop = None
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    async def add(self, user_id, room_id, content):
+        """
+        Queue a message to be written with the next batch. Its timestamp is
+        the time it was received, not the time the batch is written.
+        """
+        self.pending.append(Message(user_id=user_id, room_id=room_id, content=content))
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+        else:
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        """
+        Make sure pending messages are flushed within `flush_interval`.
+
+        The timer runs on the current event loop; a timer left on another
+        loop, which may be closed and never fire, is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self.timer is not None and self.timer_loop is not loop:
+            self.timer.cancel()
+            self.timer = None
+        if self.timer is None and self.pending:
+            self.timer_loop = loop
+            self.timer = loop.call_later(self.flush_interval / 1000, lambda: asyncio.ensure_future(self.flush()))
+
+    def take(self):
+        """
+        Detach the pending messages from the buffer and cancel the flush timer.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        return batch
+
+    def requeue(self, messages):
+        """
+        Put messages that could not be written back in front of the pending ones.
+        """
+        self.pending[:0] = messages
+
+    def write(self, batch):
+        """
+        Write a batch with one INSERT, falling back to one INSERT per row if
+        the batch fails. The buffer itself is left untouched, so this can run
+        in a worker thread.
+
+        Returns:
+            tuple: (number of messages written, list of messages to retry later)
+        """
+        if not batch:
+            return 0, []
+        try:
+            Message.objects.bulk_create(batch)
+            return len(batch), []
+        except DatabaseError as e:
+            logger.warning(f"Failed to write {len(batch)} chat messages at once, writing them one by one: {e}")
+
+        written = 0
+        for index, message in enumerate(batch):
+            try:
+                Message.objects.bulk_create([message])
+            except (OperationalError, InterfaceError) as e:
+                logger.error(f"Database unavailable, re-queued {len(batch) - index} chat messages: {e}")
+                return written, batch[index:]
+            except DatabaseError as e:
+                self.dropped += 1
+                logger.error(f"Dropped chat message of user {message.user_id} in room {message.room_id}: {e}")
+            else:
+                written += 1
+        return written, []
+
+    async def flush(self):
+        """
+        Write all pending messages with one INSERT.
+
+        Returns:
+            int: number of messages written
+        """
+        written, retry = await sync_to_async(self.write)(self.take())
+        self.requeue(retry)
+        # Retry re-queued messages even if no new message arrives
+        self.schedule_flush()
+        return written
+
+    def flush_sync(self):
+        """
+        Write all pending messages from synchronous code, e.g. at interpreter exit.
+        """
+        written, retry = self.write(self.take())
+        self.requeue(retry)
+        return written
+
+
+message_buffer = MessageBuffer()
+atexit.register(message_buffer.flush_sync)
@@ -1,8 +1,15 @@
 import json
+import time
+from urllib.parse import parse_qs
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from channels.generic.websocket import AsyncWebsocketConsumer
-from .models import Room
+from .buffers import message_buffer
+from .membership import aget_room_membership
+from .models import Message
+from .outbound import OutboundQueue
+from .presence import get_presence
 from users.models import *
 
 User = get_user_model()
@@ -15,39 +22,91 @@ class ChatConsumer(AsyncWebsocketConsumer):
         if not self.scope["user"].is_authenticated:
             await self.close(code=403)
             return
-        # Check if the room exists
-        room_exists = await sync_to_async(
-            Room.objects.filter(name=self.room_name).exists
-        )()
-        if not room_exists:
+        # Check that the room exists and the user takes part in it
+        membership = await aget_room_membership(self.room_name)
+        if membership is None:
             await self.close(code=404)
             return
+        if self.scope["user"].pk not in membership["members"]:
+            await self.close(code=403)
+            return
+        self.room_id = membership["id"]
 
         # Join room group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        await self.update_presence()
+
+        # Opt-in coalescing of group events into chat_batch frames
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        batch = query.get("batch", [""])[0].lower() in ("1", "true")
+        self.outbound = OutboundQueue(
+            lambda text_data: self.send(text_data=text_data),
+            batch_window=settings.CHAT_BATCH_WINDOW if batch else None,
+            on_error=lambda: self.close(code=1011),
+        )
+        self.outbound.start()
+
+    async def update_presence(self, online=True):
+        presence = get_presence()
+        update = presence.touch if online else presence.leave
+        await sync_to_async(update, thread_sensitive=False)(
+            self.room_id, self.scope["user"].pk, self.channel_name
+        )
+        self.presence_updated_at = time.monotonic()
+
+    async def refresh_presence(self):
+        """
+        Keep an active connection online without a Redis write per frame:
+        presence is renewed once a third of its TTL has passed.
+        """
+        if time.monotonic() - getattr(self, "presence_updated_at", 0) >= settings.CHAT_PRESENCE_TTL / 3:
+            await self.update_presence()
 
     async def disconnect(self, close_code):
         # Leave room group
+        if getattr(self, "room_id", None) is None:
+            return
+        if getattr(self, "outbound", None) is not None:
+            self.outbound.stop()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        await self.update_presence(online=False)
+        # Persist the messages of this connection that are still buffered
+        await message_buffer.flush()
 
     async def receive(self, text_data):
         try:
             text_data_json = json.loads(text_data)  # Парсимо JSON
+            if text_data_json.get("type") == "heartbeat":
+                # Keep the connection online for another CHAT_PRESENCE_TTL seconds
+                await self.update_presence()
+                return
+            # Any frame shows the client is still there
+            await self.refresh_presence()
             message = text_data_json.get("message")
 
             if not message:
                 await self.send(json.dumps({"error": "Empty message is not allowed."}))
                 return
 
-            sender = self.scope["user"].get_full_name()
+            max_length = Message._meta.get_field("content").max_length
+            if len(message) > max_length:
+                await self.send(json.dumps({"error": f"Content must have less than {max_length} characters."}))
+                return
+
+            user = self.scope["user"]
+            sender = user.get_full_name()
+            await message_buffer.add(user.pk, self.room_id, message)
 
+            # Serialized once here instead of once per receiving consumer
+            payload = json.dumps({"type": "chat_message", "message": message, "sender": sender})
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     "type": "chat_message",
                     "message": message,
                     "sender": sender,
+                    "payload": payload,
                 },
             )
         except json.JSONDecodeError:
@@ -56,10 +115,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.send(json.dumps({"error": f"Unexpected error: {str(e)}"}))
 
     async def chat_message(self, event):
-        message = event["message"]
-        sender = event["sender"]
+        payload = event.get("payload")
+        if payload is None:
+            payload = json.dumps({"type": "chat_message", "message": event["message"], "sender": event["sender"]})
 
-        # Send message to WebSocket
-        await self.send(
-            json.dumps({"type": "chat_message", "message": message, "sender": sender})
-        )
+        # Queue the frame for the WebSocket; a refused frame means the client cannot keep up or is gone
+        if not self.outbound.put(payload):
+            await self.close(code=4008)
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from notifications.factories import create_users_batch
+from .buffers import message_buffer
+from .models import Message, Room
+
+logger = logging.getLogger(__name__)
+
+IN_MEMORY_CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+ROOM_PATH = "/ws/api/v1/communications/room/{room_name}/"
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of a sorted list.
+    """
+    if not values:
+        return None
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def seed(connections, rooms):
+    """
+    Create one user per connection, the rooms they are spread across and a
+    session per user, with one INSERT per table.
+
+    Returns:
+        tuple: (list of (room name, session key) per connection, cleanup callable)
+    """
+    prefix = uuid4().hex[:8]
+    users = create_users_batch(connections)
+    room_objects = Room.objects.bulk_create(Room(name=f"load_{prefix}_{index}") for index in range(rooms))
+    Room.online.through.objects.bulk_create(
+        Room.online.through(room_id=room_objects[index % rooms].id, customuser_id=user.pk)
+        for index, user in enumerate(users)
+    )
+
+    expire_date = timezone.now() + timedelta(hours=1)
+    backend = settings.AUTHENTICATION_BACKENDS[0]
+    sessions = [
+        Session(
+            session_key=f"{prefix}{uuid4().hex}",
+            session_data=SessionStore().encode({
+                SESSION_KEY: str(user.pk),
+                BACKEND_SESSION_KEY: backend,
+                HASH_SESSION_KEY: user.get_session_auth_hash(),
+            }),
+            expire_date=expire_date,
+        )
+        for user in users
+    ]
+    Session.objects.bulk_create(sessions)
+
+    def cleanup():
+        room_ids = [room.id for room in room_objects]
+        Message.objects.filter(room_id__in=room_ids).delete()
+        Room.objects.filter(id__in=room_ids).delete()
+        Session.objects.filter(session_key__in=[session.session_key for session in sessions]).delete()
+        type(users[0]).objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    clients = [
+        (room_objects[index % rooms].name, session.session_key)
+        for index, session in enumerate(sessions)
+    ]
+    return clients, cleanup
+
+
+class ChatLoadTest:
+    """
+    Drives many concurrent WebSocket chat connections against the project's
+    ASGI application, in-process, and measures fan-out latency.
+
+    Every message carries its send time, so each delivery to each member of
+    the room yields one end-to-end latency sample (sender frame -> consumer
+    -> channel layer -> every receiving consumer -> client frame).
+
+    Attributes:
+        connections (int): Number of concurrent connections.
+        rooms (int): Number of rooms the connections are spread across.
+        rate (float): Messages sent per second, across all connections.
+        duration (float): Seconds during which messages are sent.
+        batch (bool): Whether connections use the coalesced ?batch=1 mode.
+    """
+
+    def __init__(self, connections, rooms, rate, duration, batch=False):
+        self.connections = connections
+        self.rooms = rooms
+        self.rate = rate
+        self.duration = duration
+        self.batch = batch
+        self.latencies = []
+        self.sent = 0
+
+    async def connect(self, application, room_name, session_key):
+        path = ROOM_PATH.format(room_name=room_name) + ("?batch=1" if self.batch else "")
+        host = next((host for host in settings.ALLOWED_HOSTS if host != "*"), "localhost").lstrip(".")
+        communicator = WebsocketCommunicator(
+            application,
+            path,
+            headers=[
+                (b"cookie", f"{settings.SESSION_COOKIE_NAME}={session_key}".encode()),
+                (b"origin", f"http://{host}".encode()),
+                (b"host", host.encode()),
+            ],
+        )
+        connected, _ = await communicator.connect(timeout=30)
+        if not connected:
+            raise RuntimeError(f"Connection to {room_name} was refused.")
+        return communicator
+
+    async def read(self, communicator):
+        while True:
+            try:
+                frame = json.loads(await communicator.receive_from(timeout=3600))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return
+            received_at = time.perf_counter()
+            events = frame["messages"] if frame.get("type") == "chat_batch" else [frame]
+            for event in events:
+                if event.get("type") == "chat_message":
+                    sent_at = float(event["message"].split(" ", 1)[0])
+                    self.latencies.append(received_at - sent_at)
+
+    async def send(self, communicators):
+        interval = 1 / self.rate
+        started = time.perf_counter()
+        while time.perf_counter() - started < self.duration:
+            communicator = random.choice(communicators)
+            await communicator.send_to(text_data=json.dumps({"message": f"{time.perf_counter()!r} load"}))
+            self.sent += 1
+            # Sleep until the next message is due, catching up if sending fell behind
+            await asyncio.sleep(max(started + self.sent * interval - time.perf_counter(), 0))
+
+    async def run_async(self, application, clients):
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        connect_started = time.perf_counter()
+        communicators = await asyncio.gather(
+            *(self.connect(application, room_name, session_key) for room_name, session_key in clients)
+        )
+        connect_seconds = time.perf_counter() - connect_started
+        memory_per_connection = (tracemalloc.get_traced_memory()[0] - memory_before) / len(communicators)
+        tracemalloc.stop()
+
+        readers = [asyncio.ensure_future(self.read(communicator)) for communicator in communicators]
+        send_started = time.perf_counter()
+        await self.send(communicators)
+        send_seconds = time.perf_counter() - send_started
+        # Let the last messages reach every member
+        await asyncio.sleep(max(settings.CHAT_BATCH_WINDOW / 1000 * 2, 0.5))
+
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        await asyncio.gather(*(communicator.disconnect() for communicator in communicators))
+        await message_buffer.flush()
+        # Release the database connection of the thread running sync ORM calls
+        await sync_to_async(connections.close_all)()
+
+        latencies = sorted(self.latencies)
+        to_ms = lambda value: None if value is None else round(value * 1000, 3)
+        return {
+            "connections": self.connections,
+            "rooms": self.rooms,
+            "batch": self.batch,
+            "target_rate": self.rate,
+            "duration_seconds": round(send_seconds, 3),
+            "connect_seconds": round(connect_seconds, 3),
+            "messages_sent": self.sent,
+            "messages_delivered": len(latencies),
+            "sent_per_second": round(self.sent / send_seconds, 1),
+            "delivered_per_second": round(len(latencies) / send_seconds, 1),
+            "latency_ms": {
+                "p50": to_ms(percentile(latencies, 50)),
+                "p95": to_ms(percentile(latencies, 95)),
+                "p99": to_ms(percentile(latencies, 99)),
+                "max": to_ms(latencies[-1] if latencies else None),
+            },
+            "memory_per_connection_bytes": round(memory_per_connection),
+        }
+
+    def run(self):
+        """
+        Seed users and rooms, run the load and remove everything it created.
+
+        The in-memory channel layer is used, so the numbers reflect the
+        consumers and the event loop of a single worker process.
+
+        Returns:
+            dict: machine-readable report
+        """
+        from forum.asgi import application
+
+        clients, cleanup = seed(self.connections, self.rooms)
+        try:
+            with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS):
+                return asyncio.run(self.run_async(application, clients))
+        finally:
+            cleanup()
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from communications.loadtest import ChatLoadTest
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many concurrent chat WebSocket connections against the ASGI application "
+        "in-process, send messages at a fixed rate and print fan-out latency percentiles, "
+        "throughput and memory per connection as JSON. Created users and rooms are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000, help="Number of concurrent connections.")
+        parser.add_argument("--rooms", type=int, default=100, help="Number of rooms the connections are spread across.")
+        parser.add_argument("--rate", type=float, default=100.0, help="Messages sent per second across all connections.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds during which messages are sent.")
+        parser.add_argument("--batch", action="store_true", help="Connect in the coalesced ?batch=1 delivery mode.")
+        parser.add_argument("--output", help="File to write the JSON report to instead of standard output.")
+
+    def handle(self, *args, **options):
+        load_test = ChatLoadTest(
+            connections=options["connections"],
+            rooms=options["rooms"],
+            rate=options["rate"],
+            duration=options["duration"],
+            batch=options["batch"],
+        )
+        report = json.dumps(load_test.run(), indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Chat benchmark report written to {options['output']}."))
+        else:
+            self.stdout.write(report)
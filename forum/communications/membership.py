@@ -0,0 +1,74 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+ROOM_MEMBERS_KEY = "chat:room:{room_name}"
+
+
+def room_members_key(room_name):
+    return ROOM_MEMBERS_KEY.format(room_name=room_name)
+
+
+def load_room_membership(room_name):
+    """
+    Read a room's id and participants from the database with a single query.
+
+    Returns:
+        dict | None: {"id": room id, "members": set of user ids}, or None if
+            the room does not exist
+    """
+    from .models import Room
+
+    rows = list(Room.objects.filter(name=room_name).order_by("id").values_list("id", "online__user_id"))
+    if not rows:
+        return None
+    room_id = rows[0][0]
+    return {"id": room_id, "members": {user_id for id_, user_id in rows if id_ == room_id and user_id is not None}}
+
+
+def get_room_membership(room_name):
+    """
+    Return a room's id and participants, served from the shared cache.
+
+    On a miss the membership is loaded from the database and cached for
+    CHAT_ROOM_CACHE_TIMEOUT seconds; it is invalidated whenever participants
+    join or leave the room. Missing rooms are not cached.
+
+    Returns:
+        dict | None: {"id": room id, "members": set of user ids}, or None if
+            the room does not exist
+    """
+    key = room_members_key(room_name)
+    membership = cache.get(key)
+    if membership is None:
+        membership = load_room_membership(room_name)
+        if membership is not None:
+            cache.set(key, membership, timeout=settings.CHAT_ROOM_CACHE_TIMEOUT)
+            logger.debug(f"Cached membership of room {room_name}")
+    return membership
+
+
+async def aget_room_membership(room_name):
+    """
+    Async variant of get_room_membership for consumers. Cache hits do not
+    touch the database.
+    """
+    membership = await cache.aget(room_members_key(room_name))
+    if membership is None:
+        membership = await sync_to_async(get_room_membership)(room_name)
+    return membership
+
+
+def invalidate_room(room_name):
+    """
+    Drop a room's cached membership now and again once the current
+    transaction commits, so concurrent readers cannot cache the old state.
+    """
+    key = room_members_key(room_name)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
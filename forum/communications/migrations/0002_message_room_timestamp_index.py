@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['room', 'timestamp', 'id'], name='message_room_timestamp'),
+        ),
+    ]
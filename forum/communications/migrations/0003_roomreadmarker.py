@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('communications', '0002_message_room_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomReadMarker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_at', models.DateTimeField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to='communications.room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_read_markers', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='roomreadmarker',
+            constraint=models.UniqueConstraint(fields=('room', 'user'), name='unique_room_read_marker'),
+        ),
+    ]
@@ -1,23 +1,94 @@
+from datetime import datetime, timezone
+
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone as django_timezone
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django_cryptography.fields import encrypt
 
+from .membership import invalidate_room
+from .presence import online_users
+
 User = get_user_model()
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RoomQuerySet(models.QuerySet):
+    def inbox(self, user):
+        """
+        Rooms of a user annotated with their last message and the number of
+        messages from other participants posted after the user's read marker.
+
+        Everything is computed by correlated subqueries in a single query on
+        the (room, timestamp, id) index of Message. The last message is one
+        index lookup per room; the unread count is a range scan over the
+        messages after the read marker, so it grows with the number of
+        unread messages, not with the length of the conversation.
+        `last_activity_at` is the last message time, or the epoch for rooms
+        without messages, and orders the inbox (see InboxPagination).
+        """
+        last_message = Message.objects.filter(room=models.OuterRef("pk")).order_by("-timestamp", "-id")
+        unread = (
+            Message.objects.filter(
+                room=models.OuterRef("pk"),
+                timestamp__gt=Coalesce(models.OuterRef("last_read_at"), models.Value(EPOCH)),
+            )
+            .exclude(user=user)
+            .order_by()
+            .values("room")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return (
+            self.filter(online=user)
+            .annotate(
+                last_read_at=models.Subquery(
+                    RoomReadMarker.objects.filter(room=models.OuterRef("pk"), user=user).values("last_read_at")[:1]
+                ),
+                last_message_id=models.Subquery(last_message.values("id")[:1]),
+                last_message_at=models.Subquery(last_message.values("timestamp")[:1]),
+                last_message_user=models.Subquery(last_message.values("user_id")[:1]),
+                last_message=models.Subquery(last_message.values("content")[:1]),
+                unread_count=Coalesce(models.Subquery(unread[:1]), 0),
+            )
+            .annotate(last_activity_at=Coalesce(models.F("last_message_at"), models.Value(EPOCH)))
+            .order_by("-last_activity_at", "-id")
+        )
+
 
 class Room(models.Model):
     name = models.CharField(max_length=128)
     online = models.ManyToManyField(to=settings.AUTH_USER_MODEL, blank=True)
 
+    objects = RoomQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_room(self.name)
+
+    def delete(self, *args, **kwargs):
+        invalidate_room(self.name)
+        return super().delete(*args, **kwargs)
+
+    def get_online_users(self):
+        """
+        Ids of participants connected to the room, read from presence
+        tracking; `online` holds the room's participants.
+        """
+        return online_users(self.pk)
+
     def get_online_count(self):
-        return self.online.count()
+        return len(self.get_online_users())
 
     def join(self, user):
         self.online.add(user)
+        invalidate_room(self.name)
 
     def leave(self, user):
         self.online.remove(user)
+        invalidate_room(self.name)
 
     def get_users_id(self):
         return {
@@ -26,24 +97,52 @@ class Room(models.Model):
         }
 
     def get_users_names(self):
+        names = list(self.online.order_by("pk").values_list("first_name", flat=True))
         return {
-            "user_1": self.online.first().first_name if self.online.exists() else None,
-            "user_2": (
-                self.online.last().first_name if self.online.count() > 1 else None
-            ),
+            "user_1": names[0] if names else None,
+            "user_2": names[-1] if len(names) > 1 else None,
         }
 
     def __str__(self):
-        return f"{self.name} ({self.get_online_count()})"
+        return self.name
 
 
 class Message(models.Model):
     user = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     room = models.ForeignKey(to=Room, on_delete=models.CASCADE)
     content = encrypt(models.CharField(max_length=512))
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the instance is built rather than when it is saved, so messages
+    # written in batches keep the time they were received
+    timestamp = models.DateTimeField(default=django_timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "timestamp", "id"], name="message_room_timestamp"),
+        ]
 
     def save(self, *args, **kwargs):
         if len(self.content) > 512:
             raise ValueError("Content must have less than 512 characters.")
         super().save(*args, **kwargs)
+
+
+class RoomReadMarker(models.Model):
+    """
+    Records up to when a participant has read a conversation.
+
+    Attributes:
+        user (ForeignKey): The participant.
+        room (ForeignKey): The conversation.
+        last_read_at (DateTimeField): Messages posted after this time are unread.
+    """
+    user = models.ForeignKey(to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="room_read_markers")
+    room = models.ForeignKey(to=Room, on_delete=models.CASCADE, related_name="read_markers")
+    last_read_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "user"], name="unique_room_read_marker"),
+        ]
+
+    def __str__(self):
+        return f"RoomReadMarker(room={self.room_id}, user={self.user_id}, last_read_at={self.last_read_at})"
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DROP = "drop"
+CLOSE = "close"
+
+
+def batch_frame(payloads):
+    """
+    Join pre-serialized chat events into one frame without decoding them.
+    """
+    return '{"type": "chat_batch", "messages": [' + ", ".join(payloads) + "]}"
+
+
+class OutboundQueue:
+    """
+    Bounded queue of pre-serialized frames waiting to be sent to one client.
+
+    Group events are only appended here, so a slow client never blocks the
+    consumer's handling of further events. A background task drains the
+    queue; in batch mode it waits `batch_window` milliseconds and sends all
+    queued events as one frame. When the queue is full, the overflow policy
+    either drops the oldest frame or asks the consumer to close. If sending
+    fails, e.g. because the client is gone, the error is logged, the queue
+    stops accepting frames and `on_error` is awaited so the consumer can
+    close the connection.
+
+    Attributes:
+        send: Coroutine function sending one text frame.
+        on_error: Coroutine function called once when sending fails, or None.
+        batch_window (int | None): Coalescing window in milliseconds, None to send frames one by one.
+        max_size (int): Maximum number of queued frames.
+        overflow (str): "drop" or "close".
+    """
+
+    def __init__(self, send, batch_window=None, max_size=None, overflow=None, on_error=None):
+        self.send = send
+        self.on_error = on_error
+        self.batch_window = batch_window
+        self.max_size = max_size or settings.CHAT_OUTBOUND_QUEUE_SIZE
+        self.overflow = overflow or settings.CHAT_OUTBOUND_OVERFLOW
+        self.frames = deque()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.failed = False
+        self.task = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def put(self, payload):
+        """
+        Queue a frame.
+
+        Returns:
+            bool: False if the queue is full or sending failed, and the client must be disconnected
+        """
+        if self.failed:
+            return False
+        if len(self.frames) >= self.max_size:
+            if self.overflow == CLOSE:
+                return False
+            self.frames.popleft()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % self.max_size == 0:
+                logger.warning(f"Chat client is too slow, {self.dropped} frames dropped so far.")
+        self.frames.append(payload)
+        self.ready.set()
+        return True
+
+    async def run(self):
+        while True:
+            await self.ready.wait()
+            if self.batch_window is not None:
+                await asyncio.sleep(self.batch_window / 1000)
+            self.ready.clear()
+            frames = list(self.frames)
+            self.frames.clear()
+            try:
+                if self.batch_window is not None:
+                    await self.send(batch_frame(frames))
+                else:
+                    for frame in frames:
+                        await self.send(frame)
+            except Exception as e:
+                logger.warning(f"Sending to chat client failed, closing its outbound queue: {e}")
+                self.failed = True
+                self.frames.clear()
+                if self.on_error is not None:
+                    await self.on_error()
+                return
+
+    def start(self):
+        self.task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
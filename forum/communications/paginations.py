@@ -1,7 +1,134 @@
-from rest_framework.pagination import PageNumberPagination
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class MessagePagination(PageNumberPagination):
     page_size = 10  
     page_size_query_param = "page_size"  
     max_page_size = 100  
+
+
+class MessageCursorPagination(CursorPagination):
+    """
+    Infinite scroll through a conversation on (timestamp, id).
+
+    Without parameters the newest messages are returned and `next` scrolls
+    back in time. `before=<id>` starts from the messages preceding message
+    <id> and `after=<id>` from the ones following it, e.g. everything since
+    the last message a reconnecting client has seen; `next` then continues
+    forward in time. Every page is a range scan on the (room, timestamp, id)
+    index, so its cost does not depend on how old the messages are. Results
+    are always in chronological order.
+
+    Example Usage:
+    - GET /conversations/1/messages/
+    - GET /conversations/1/messages/?before=120
+    - GET /conversations/1/messages/?after=250
+    """
+    page_size = MessagePagination.page_size
+    page_size_query_param = MessagePagination.page_size_query_param
+    max_page_size = MessagePagination.max_page_size
+    ordering = ("-timestamp", "-id")
+    before_query_param = "before"
+    after_query_param = "after"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        before = self.get_message_id(request, self.before_query_param)
+        self.after = self.get_message_id(request, self.after_query_param)
+        if before is not None and self.after is not None:
+            raise ValidationError(f"Use either '{self.before_query_param}' or '{self.after_query_param}', not both.")
+
+        if before is not None:
+            timestamp = self.get_timestamp(queryset, before)
+            queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=before))
+        elif self.after is not None:
+            timestamp = self.get_timestamp(queryset, self.after)
+            queryset = queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=self.after))
+
+        page = super().paginate_queryset(queryset, request, view)
+        if self.after is not None:
+            return page
+        # self.page keeps the query order, which the next/previous links are built from
+        return list(reversed(page))
+
+    def get_ordering(self, request, queryset, view):
+        if self.get_message_id(request, self.after_query_param) is not None:
+            return tuple(field.lstrip("-") for field in self.ordering)
+        return self.ordering
+
+    def get_message_id(self, request, query_param):
+        value = request.query_params.get(query_param)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_timestamp(self, queryset, pk):
+        """
+        Return the timestamp of the given message, which must belong to the queryset.
+        """
+        timestamp = queryset.filter(id=pk).values_list("timestamp", flat=True).first()
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.before_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Start from the messages preceding the message with this id.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.after_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Start from the messages following the message with this id.",
+                "schema": {"type": "integer"},
+            },
+            *super().get_schema_operation_parameters(view),
+        ]
+
+
+class MessageHistoryPagination(MessageCursorPagination):
+    """
+    Cursor pagination by default; a `page` query parameter switches to the
+    page-number mode of MessagePagination for existing clients.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_paginator = None
+        if MessagePagination.page_query_param in request.query_params:
+            self.page_paginator = MessagePagination()
+            return self.page_paginator.paginate_queryset(queryset.order_by("timestamp", "id"), request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_paginator is not None:
+            return self.page_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            *MessagePagination().get_schema_operation_parameters(view)[:1],
+        ]
+
+
+class InboxPagination(CursorPagination):
+    """
+    Cursor pagination of the inbox, most recently active conversation first.
+
+    The cursor is the time of the last message of the last room on the page,
+    so a page does not shift when new messages move other rooms to the top.
+    Rooms without messages come last, newest room first.
+    """
+    page_size = MessagePagination.page_size
+    page_size_query_param = MessagePagination.page_size_query_param
+    max_page_size = MessagePagination.max_page_size
+    ordering = ("-last_activity_at", "-id")
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_KEY = "chat:presence:{room_id}"
+REDIS_CHANNEL_LAYER = "channels_redis.core.RedisChannelLayer"
+
+
+def presence_key(room_id):
+    return PRESENCE_KEY.format(room_id=room_id)
+
+
+def connection_member(user_id, channel_name):
+    # One member per connection, so closing one of several tabs keeps the user online
+    return f"{user_id}:{channel_name}"
+
+
+def member_user_id(member):
+    if isinstance(member, bytes):
+        member = member.decode()
+    return int(member.split(":", 1)[0])
+
+
+class RedisPresence:
+    """
+    Presence stored in Redis, one sorted set per room.
+
+    Members are connections and scores the time at which they expire, so a
+    connection that stops sending heartbeats drops out on its own and no
+    background cleanup is needed.
+    """
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+
+    def touch(self, room_id, user_id, channel_name):
+        """
+        Mark a connection as online for another `ttl` seconds.
+        """
+        key = presence_key(room_id)
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(key, {connection_member(user_id, channel_name): now + self.ttl})
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.expire(key, int(self.ttl) + 1)
+        pipe.execute()
+
+    def leave(self, room_id, user_id, channel_name):
+        self.client.zrem(presence_key(room_id), connection_member(user_id, channel_name))
+
+    def online_in_rooms(self, room_ids):
+        """
+        Return {room id: set of online user ids} with one round trip.
+        """
+        room_ids = list(room_ids)
+        now = time.time()
+        pipe = self.client.pipeline()
+        for room_id in room_ids:
+            pipe.zrangebyscore(presence_key(room_id), now, "+inf")
+        return {
+            room_id: {member_user_id(member) for member in members}
+            for room_id, members in zip(room_ids, pipe.execute())
+        }
+
+
+class LocalPresence:
+    """
+    In-process stand-in for RedisPresence, used when the channel layer does
+    not run on Redis (development, tests). It is not shared between workers.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.rooms = {}
+        self.lock = threading.Lock()
+
+    def touch(self, room_id, user_id, channel_name):
+        with self.lock:
+            self.rooms.setdefault(room_id, {})[connection_member(user_id, channel_name)] = time.time() + self.ttl
+
+    def leave(self, room_id, user_id, channel_name):
+        with self.lock:
+            self.rooms.get(room_id, {}).pop(connection_member(user_id, channel_name), None)
+
+    def online_in_rooms(self, room_ids):
+        now = time.time()
+        with self.lock:
+            return {
+                room_id: {
+                    member_user_id(member)
+                    for member, expires_at in self.rooms.get(room_id, {}).items()
+                    if expires_at > now
+                }
+                for room_id in room_ids
+            }
+
+
+def redis_client(host):
+    """
+    Build a Redis client from a channels_redis host entry.
+    """
+    if isinstance(host, (list, tuple)):
+        return redis.Redis(host=host[0], port=host[1])
+    if isinstance(host, dict):
+        return redis.Redis.from_url(host["address"]) if "address" in host else redis.Redis(**host)
+    return redis.Redis.from_url(host)
+
+
+_backend = None
+_backend_config = None
+
+
+def get_presence():
+    """
+    Return the presence backend for the configured channel layer: Redis
+    when the channel layer runs on Redis, the local stand-in otherwise.
+    """
+    global _backend, _backend_config
+    layer = settings.CHANNEL_LAYERS.get("default", {})
+    config = (repr(layer), settings.CHAT_PRESENCE_TTL)
+    if _backend is None or _backend_config != config:
+        if layer.get("BACKEND") == REDIS_CHANNEL_LAYER:
+            host = layer.get("CONFIG", {}).get("hosts", [("localhost", 6379)])[0]
+            _backend = RedisPresence(redis_client(host), settings.CHAT_PRESENCE_TTL)
+        else:
+            _backend = LocalPresence(settings.CHAT_PRESENCE_TTL)
+        _backend_config = config
+    return _backend
+
+
+def online_users(room_id):
+    """
+    Return the ids of the users online in a room. Does not query the database.
+    """
+    return get_presence().online_in_rooms([room_id])[room_id]
+
+
+def online_in_rooms(room_ids):
+    """
+    Return {room id: set of online user ids}. Does not query the database.
+    """
+    return get_presence().online_in_rooms(room_ids)
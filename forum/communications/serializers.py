@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from users.serializers import CustomUserSerializer
+from .membership import invalidate_room
 from .models import Room, Message
 
 
@@ -18,6 +19,7 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         room_name = f"room_{participants[0].user_id}_{participants[1].user_id}"
         room = Room.objects.create(name=room_name, **validated_data)
         room.online.set(participants)
+        invalidate_room(room.name)
         return room
 
 
@@ -48,3 +50,35 @@ class MessageSerializer(serializers.ModelSerializer):
                 "Content must have less than 512 characters."
             )
         return value
+
+
+class MessageHistorySerializer(serializers.Serializer):
+    """
+    Flat, read-only representation of a message for history pages.
+
+    It reads only the columns selected by MessageHistoryView, so serializing
+    does not query the database.
+    """
+
+    id = serializers.IntegerField()
+    room = serializers.IntegerField(source="room_id")
+    user = serializers.IntegerField(source="user_id")
+    sender = serializers.CharField(source="user.get_full_name")
+    content = serializers.CharField()
+    timestamp = serializers.DateTimeField()
+
+
+class InboxSerializer(serializers.Serializer):
+    """
+    Read-only inbox entry: a conversation with a preview of its last
+    message and the number of messages the user has not read.
+    """
+
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    last_message_id = serializers.IntegerField(allow_null=True)
+    last_message = serializers.CharField(allow_null=True)
+    last_message_user = serializers.IntegerField(allow_null=True)
+    last_message_at = serializers.DateTimeField(allow_null=True)
+    last_read_at = serializers.DateTimeField(allow_null=True)
+    unread_count = serializers.IntegerField()
@@ -1,14 +1,26 @@
-from django.test import TestCase
-from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.db import DatabaseError, OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from unittest.mock import patch, MagicMock
 from rest_framework_simplejwt.tokens import RefreshToken
 import factory
 
+import asyncio
+import json
+from asgiref.sync import sync_to_async
 from channels.testing import WebsocketCommunicator
 
+from .buffers import MessageBuffer
 from .consumers import ChatConsumer
+from .loadtest import ChatLoadTest, percentile
+from .membership import get_room_membership
+from .outbound import OutboundQueue
+from .presence import LocalPresence, RedisPresence, get_presence, presence_key, redis_client
 from .models import Room, Message
 
 
@@ -82,6 +94,11 @@ class RoomModelTest(TestCase):
     def test_get_online_count_empty_room(self):
         self.assertEqual(self.room.get_online_count(), 0)
 
+    def test_str_does_no_io(self):
+        with self.assertNumQueries(0), patch("communications.models.online_users") as online_users:
+            self.assertEqual(str(self.room), self.room.name)
+        online_users.assert_not_called()
+
     def test_message_encryption(self):
         room = Room.objects.create(name="room_1_2")
         message = Message.objects.create(user=self.user1, room=room, content="Hello!")
@@ -98,6 +115,7 @@ class ChatConsumerTest(TestCase):
     def setUp(self):
         self.user = User1Factory()
         self.room = RoomFactory()
+        self.room.join(self.user)
 
     async def connect_to_chat(self, user):
         communicator = WebsocketCommunicator(
@@ -113,6 +131,33 @@ class ChatConsumerTest(TestCase):
         self.assertTrue(connected)
         await communicator.disconnect()
 
+    async def test_presence_follows_connection(self):
+        communicator, connected = await self.connect_to_chat(self.user)
+        self.assertTrue(connected)
+        self.assertEqual(await sync_to_async(self.room.get_online_users)(), {self.user.pk})
+
+        await communicator.send_json_to({"type": "heartbeat"})
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.disconnect()
+        self.assertEqual(await sync_to_async(self.room.get_online_count)(), 0)
+
+    @override_settings(CHAT_PRESENCE_TTL=0)
+    async def test_chat_messages_refresh_presence(self):
+        communicator, _ = await self.connect_to_chat(self.user)
+
+        with patch.object(type(get_presence()), "touch") as touch:
+            await communicator.send_json_to({"message": "Still here"})
+            await communicator.receive_json_from()
+
+        touch.assert_called_once()
+        await communicator.disconnect()
+
+    async def test_connect_non_member_is_rejected(self):
+        outsider = await sync_to_async(User2Factory)()
+        _, connected = await self.connect_to_chat(outsider)
+        self.assertFalse(connected)
+
     async def test_receive_message(self):
         communicator, connected = await self.connect_to_chat(self.user)
         self.assertTrue(connected)
@@ -127,6 +172,22 @@ class ChatConsumerTest(TestCase):
 
         await communicator.disconnect()
 
+    async def test_messages_are_persisted_on_disconnect(self):
+        communicator, connected = await self.connect_to_chat(self.user)
+        self.assertTrue(connected)
+
+        for text in ("First", "Second"):
+            await communicator.send_json_to({"message": text})
+            await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        contents = await sync_to_async(list)(
+            Message.objects.filter(room=self.room, user=self.user)
+            .order_by("timestamp")
+            .values_list("content", flat=True)
+        )
+        self.assertEqual(contents, ["First", "Second"])
+
     async def test_empty_message(self):
         communicator, connected = await self.connect_to_chat(self.user)
         self.assertTrue(connected)
@@ -174,6 +235,252 @@ class ChatConsumerTest(TestCase):
         self.assertFalse(connected)
 
 
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    CHAT_BATCH_WINDOW=100,
+)
+class ChatBatchDeliveryTest(TestCase):
+    def setUp(self):
+        self.user = User1Factory()
+        self.room = RoomFactory()
+        self.room.join(self.user)
+
+    async def test_events_are_coalesced_into_one_frame(self):
+        communicator = WebsocketCommunicator(
+            ChatConsumer.as_asgi(), "/ws/api/v1/communications/room/room_1_2/?batch=1"
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"room_name": "room_1_2"}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        for text in ("one", "two", "three"):
+            await communicator.send_json_to({"message": text})
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "chat_batch")
+        self.assertEqual([m["message"] for m in response["messages"]], ["one", "two", "three"])
+        self.assertEqual(response["messages"][0]["sender"], self.user.get_full_name())
+        await communicator.disconnect()
+
+
+class OutboundQueueTest(TestCase):
+    async def test_full_queue_drops_oldest_frames(self):
+        queue = OutboundQueue(send=None, max_size=2, overflow="drop")
+
+        for frame in ("1", "2", "3"):
+            self.assertTrue(queue.put(frame))
+
+        self.assertEqual(list(queue.frames), ["2", "3"])
+        self.assertEqual(queue.dropped, 1)
+
+    async def test_full_queue_asks_to_close(self):
+        queue = OutboundQueue(send=None, max_size=1, overflow="close")
+
+        self.assertTrue(queue.put("1"))
+        self.assertFalse(queue.put("2"))
+
+    async def test_batch_frame_is_valid_json(self):
+        sent = []
+
+        async def send(text_data):
+            sent.append(text_data)
+
+        queue = OutboundQueue(send=send, batch_window=0)
+        queue.start()
+        queue.put('{"message": "a"}')
+        queue.put('{"message": "b"}')
+        await asyncio.sleep(0.05)
+        queue.stop()
+
+        self.assertEqual(json.loads(sent[0]), {"type": "chat_batch", "messages": [{"message": "a"}, {"message": "b"}]})
+
+    async def test_failed_send_stops_the_queue(self):
+        closed = []
+
+        async def send(text_data):
+            raise ConnectionResetError("client gone")
+
+        async def on_error():
+            closed.append(True)
+
+        queue = OutboundQueue(send=send, on_error=on_error)
+        queue.start()
+        queue.put('{"message": "a"}')
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(queue.task.done())
+        self.assertIsNone(queue.task.exception())
+        self.assertEqual(closed, [True])
+        self.assertFalse(queue.put('{"message": "b"}'))
+        self.assertEqual(len(queue), 0)
+        queue.stop()
+
+
+class RoomMembershipCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user1 = User1Factory()
+        self.user2 = User2Factory()
+        self.room = RoomFactory()
+        self.room.join(self.user1)
+
+    def test_membership_is_served_from_cache(self):
+        self.assertEqual(
+            get_room_membership(self.room.name), {"id": self.room.id, "members": {self.user1.pk}}
+        )
+        with self.assertNumQueries(0):
+            get_room_membership(self.room.name)
+
+    def test_join_and_leave_invalidate_membership(self):
+        get_room_membership(self.room.name)
+
+        self.room.join(self.user2)
+        self.assertEqual(get_room_membership(self.room.name)["members"], {self.user1.pk, self.user2.pk})
+
+        self.room.leave(self.user1)
+        self.assertEqual(get_room_membership(self.room.name)["members"], {self.user2.pk})
+
+    def test_missing_room_is_not_cached(self):
+        self.assertIsNone(get_room_membership("room_missing"))
+        room = Room.objects.create(name="room_missing")
+        self.assertEqual(get_room_membership("room_missing")["id"], room.id)
+
+
+class PresenceTest(TestCase):
+    def check_backend(self, presence):
+        presence.touch(1, 10, "channel-a")
+        presence.touch(1, 10, "channel-b")
+        presence.touch(2, 20, "channel-c")
+        self.assertEqual(presence.online_in_rooms([1, 2, 3]), {1: {10}, 2: {20}, 3: set()})
+
+        presence.leave(1, 10, "channel-a")
+        self.assertEqual(presence.online_in_rooms([1])[1], {10})
+        presence.leave(1, 10, "channel-b")
+        self.assertEqual(presence.online_in_rooms([1])[1], set())
+
+    def test_local_presence(self):
+        self.check_backend(LocalPresence(ttl=60))
+
+    def test_redis_presence(self):
+        client = redis_client(("127.0.0.1", 6379))
+        try:
+            client.delete(presence_key(1), presence_key(2), presence_key(3))
+            self.check_backend(RedisPresence(client, ttl=60))
+        finally:
+            client.delete(presence_key(1), presence_key(2), presence_key(3))
+
+    def test_expired_connections_are_offline(self):
+        presence = LocalPresence(ttl=0)
+        presence.touch(1, 10, "channel-a")
+        self.assertEqual(presence.online_in_rooms([1])[1], set())
+
+    @override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+    def test_online_users_api_reads_no_sql_for_presence(self):
+        user1, user2 = User1Factory(), User2Factory()
+        room = Room.objects.create(name="room_presence")
+        room.online.set([user1, user2])
+        get_presence().touch(room.id, user2.pk, "channel-a")
+        client = APIClient()
+        client.force_authenticate(user=user1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(room.get_online_users(), {user2.pk})
+        response = client.get(f"/api/v1/communications/conversations/{room.id}/online/")
+        self.assertEqual(response.json(), {"room": room.id, "online": [user2.pk]})
+        response = client.get("/api/v1/communications/conversations/online/")
+        self.assertEqual(response.json(), {str(room.id): [user2.pk]})
+
+
+class MessageBufferTest(TestCase):
+    def setUp(self):
+        self.user = User1Factory()
+        self.room = RoomFactory()
+
+    def count_messages(self):
+        return Message.objects.filter(room=self.room).count()
+
+    async def test_flushes_when_batch_is_full(self):
+        buffer = MessageBuffer(batch_size=3, flush_interval=60_000)
+
+        await buffer.add(self.user.pk, self.room.id, "one")
+        await buffer.add(self.user.pk, self.room.id, "two")
+        self.assertEqual(await sync_to_async(self.count_messages)(), 0)
+
+        await buffer.add(self.user.pk, self.room.id, "three")
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(await sync_to_async(self.count_messages)(), 3)
+
+    async def test_flushes_after_interval(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=10)
+
+        await buffer.add(self.user.pk, self.room.id, "Hello!")
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(await sync_to_async(self.count_messages)(), 1)
+
+    async def test_flush_timer_of_a_closed_loop_is_replaced(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=10)
+
+        def add_on_another_loop():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(buffer.add(self.user.pk, self.room.id, "one"))
+            loop.close()
+
+        await sync_to_async(add_on_another_loop, thread_sensitive=False)()
+        await buffer.add(self.user.pk, self.room.id, "two")
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(await sync_to_async(self.count_messages)(), 2)
+
+    def test_flush_sync_writes_pending_messages(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=60_000)
+        buffer.pending.append(Message(user=self.user, room=self.room, content="Bye"))
+
+        self.assertEqual(buffer.flush_sync(), 1)
+        self.assertEqual(Message.objects.get(room=self.room).content, "Bye")
+
+    async def test_timestamp_is_the_time_received(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=60_000)
+
+        await buffer.add(self.user.pk, self.room.id, "Hello!")
+        received = timezone.now()
+        await asyncio.sleep(0.05)
+        await buffer.flush()
+
+        message = await sync_to_async(Message.objects.get)(room=self.room)
+        self.assertLessEqual(message.timestamp, received)
+
+    def test_failed_batch_is_written_row_by_row(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=60_000)
+        buffer.pending = [Message(user=self.user, room=self.room, content=text) for text in ("one", "bad", "two")]
+        bulk_create = Message.objects.bulk_create
+
+        def reject_bad_rows(messages, *args, **kwargs):
+            if len(messages) > 1 or messages[0].content == "bad":
+                raise DatabaseError("rejected")
+            return bulk_create(messages, *args, **kwargs)
+
+        with patch.object(Message.objects, "bulk_create", side_effect=reject_bad_rows):
+            self.assertEqual(buffer.flush_sync(), 2)
+
+        self.assertEqual(buffer.dropped, 1)
+        self.assertCountEqual(Message.objects.filter(room=self.room).values_list("content", flat=True), ["one", "two"])
+
+    def test_messages_are_requeued_while_database_is_unavailable(self):
+        buffer = MessageBuffer(batch_size=100, flush_interval=60_000)
+        buffer.pending = [Message(user=self.user, room=self.room, content=text) for text in ("one", "two")]
+
+        with patch.object(Message.objects, "bulk_create", side_effect=OperationalError("connection refused")):
+            self.assertEqual(buffer.flush_sync(), 0)
+
+        self.assertEqual([message.content for message in buffer.pending], ["one", "two"])
+        self.assertEqual(buffer.flush_sync(), 2)
+        self.assertEqual(self.count_messages(), 2)
+
+
 class ChatAPITests(APITestCase):
     def setUp(self):
         self.user1 = User1Factory()
@@ -208,6 +515,36 @@ class ChatAPITests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_message_history_is_flat_and_decrypted(self):
+        room = Room.objects.create()
+        room.online.set([self.user1, self.user2])
+        Message.objects.create(room=room, user=self.user1, content="Hello!")
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.get(f"/api/v1/communications/conversations/{room.id}/messages/")
+
+        message = response.data["results"][0]
+        self.assertEqual(message["content"], "Hello!")
+        self.assertEqual(message["user"], self.user1.user_id)
+        self.assertEqual(message["sender"], self.user1.get_full_name())
+        self.assertEqual(message["room"], room.id)
+
+    def test_message_history_query_count_does_not_grow_with_page(self):
+        room = Room.objects.create()
+        room.online.set([self.user1, self.user2])
+        self.client.force_authenticate(user=self.user2)
+        url = f"/api/v1/communications/conversations/{room.id}/messages/?page_size=100"
+
+        Message.objects.bulk_create(Message(room=room, user=self.user1, content=f"m{i}") for i in range(5))
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(url)
+        Message.objects.bulk_create(Message(room=room, user=self.user2, content=f"m{i}") for i in range(95))
+        with CaptureQueriesContext(connection) as full_page:
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.data["results"]), 100)
+        self.assertEqual(len(full_page), len(small_page))
+
     def test_create_room_with_invalid_participants(self):
         """Test creating a room with invalid participant data."""
         self.client.force_authenticate(user=self.user1)
@@ -293,6 +630,144 @@ class PaginationTest(APITestCase):
         self.assertEqual(response.data["detail"], "Invalid page.")
 
 
+class MessageCursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.user1 = User1Factory()
+        self.user2 = User2Factory()
+        self.room = Room.objects.create(name="room_cursor")
+        self.room.online.set([self.user1, self.user2])
+        self.messages = Message.objects.bulk_create(
+            Message(content=f"Message {i}", user=self.user1, room=self.room) for i in range(25)
+        )
+        self.url = f"/api/v1/communications/conversations/{self.room.id}/messages/"
+        self.client.force_authenticate(user=self.user2)
+
+    def contents(self, response):
+        return [message["content"] for message in response.data["results"]]
+
+    def test_first_page_returns_newest_messages_in_order(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(15, 25)])
+        self.assertIn("cursor=", response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_scrolling_back_reaches_the_first_message(self):
+        response = self.client.get(self.url)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(5, 15)])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(5)])
+        self.assertIsNone(response.data["next"])
+
+    def test_after_returns_messages_since_last_seen(self):
+        response = self.client.get(f"{self.url}?after={self.messages[20].id}")
+
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(21, 25)])
+        self.assertIsNone(response.data["next"])
+
+    def test_after_scrolls_forward_in_time(self):
+        response = self.client.get(f"{self.url}?after={self.messages[2].id}")
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(3, 13)])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(13, 23)])
+
+    def test_before_starts_from_the_preceding_messages(self):
+        response = self.client.get(f"{self.url}?before={self.messages[15].id}")
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(5, 15)])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self.contents(response), [f"Message {i}" for i in range(5)])
+
+    def test_cursor_of_another_room_is_rejected(self):
+        other_room = Room.objects.create(name="room_other")
+        message = Message.objects.create(content="Elsewhere", user=self.user1, room=other_room)
+
+        self.assertEqual(self.client.get(f"{self.url}?before={message.id}").status_code, 404)
+        self.assertEqual(self.client.get(f"{self.url}?after=abc").status_code, 404)
+        self.assertEqual(
+            self.client.get(f"{self.url}?before={self.messages[5].id}&after={self.messages[1].id}").status_code, 400
+        )
+
+    def test_old_pages_cost_the_same_queries(self):
+        with CaptureQueriesContext(connection) as newest:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as oldest:
+            self.client.get(f"{self.url}?before={self.messages[3].id}")
+
+        self.assertEqual(len(oldest), len(newest) + 1)  # cursor timestamp lookup
+        self.assertNotIn("OFFSET", oldest.captured_queries[-1]["sql"])
+
+
+class InboxTest(APITestCase):
+    def setUp(self):
+        self.user1 = User1Factory()
+        self.user2 = User2Factory()
+        self.quiet_room = self.create_room("room_quiet")
+        self.busy_room = self.create_room("room_busy")
+        Message.objects.create(room=self.busy_room, user=self.user1, content="Mine")
+        Message.objects.create(room=self.busy_room, user=self.user2, content="Hi")
+        Message.objects.create(room=self.busy_room, user=self.user2, content="Are you there?")
+        self.client.force_authenticate(user=self.user1)
+
+    def create_room(self, name):
+        room = Room.objects.create(name=name)
+        room.online.set([self.user1, self.user2])
+        return room
+
+    def get_inbox(self, url="/api/v1/communications/conversations/inbox/"):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_inbox_lists_rooms_with_last_message_and_unread_count(self):
+        inbox = self.get_inbox()
+
+        self.assertEqual([room["id"] for room in inbox], [self.busy_room.id, self.quiet_room.id])
+        self.assertEqual(inbox[0]["last_message"], "Are you there?")
+        self.assertEqual(inbox[0]["last_message_user"], self.user2.user_id)
+        self.assertEqual(inbox[0]["unread_count"], 2)
+        self.assertIsNone(inbox[1]["last_message"])
+        self.assertEqual(inbox[1]["unread_count"], 0)
+
+    def test_marking_read_resets_unread_count(self):
+        response = self.client.post(f"/api/v1/communications/conversations/{self.busy_room.id}/read/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_inbox()[0]["unread_count"], 0)
+
+        Message.objects.create(room=self.busy_room, user=self.user2, content="Hello again")
+        self.assertEqual(self.get_inbox()[0]["unread_count"], 1)
+
+    def test_inbox_page_is_one_query(self):
+        with CaptureQueriesContext(connection) as small_inbox:
+            self.get_inbox()
+        for i in range(20):
+            room = self.create_room(f"room_extra_{i}")
+            Message.objects.create(room=room, user=self.user2, content=f"Message {i}")
+        with CaptureQueriesContext(connection) as large_inbox:
+            inbox = self.get_inbox("/api/v1/communications/conversations/inbox/?page_size=100")
+
+        self.assertEqual(len(inbox), 22)
+        self.assertEqual(len(small_inbox), 1)
+        self.assertEqual(len(large_inbox), 1)
+
+    def test_inbox_is_paginated_by_last_activity(self):
+        rooms = [self.create_room(f"room_extra_{i}") for i in range(3)]
+        for i, room in enumerate(rooms):
+            Message.objects.create(room=room, user=self.user2, content=f"Message {i}")
+
+        response = self.client.get("/api/v1/communications/conversations/inbox/?page_size=2")
+        first = [room["id"] for room in response.data["results"]]
+        Message.objects.create(room=self.busy_room, user=self.user2, content="Bumped")
+        second = [room["id"] for room in self.client.get(response.data["next"]).data["results"]]
+
+        self.assertEqual(first, [rooms[2].id, rooms[1].id])
+        # The bumped room moved above the cursor instead of shifting the next page
+        self.assertEqual(second, [rooms[0].id, self.quiet_room.id])
+
+
 class MessageValidationTests(APITestCase):
     def setUp(self):
         self.user1 = User1Factory()
@@ -331,3 +806,24 @@ class MessageValidationTests(APITestCase):
         self.assertEqual(message.content, data["content"])
         self.assertEqual(message.room, self.room)
         self.assertEqual(message.user, self.user1)
+
+
+class ChatLoadTestTest(TransactionTestCase):
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 95))
+
+    def test_load_test_reports_fan_out_and_cleans_up(self):
+        users = User.objects.count()
+        report = ChatLoadTest(connections=6, rooms=2, rate=20, duration=0.3).run()
+
+        self.assertEqual(report["connections"], 6)
+        self.assertGreater(report["messages_sent"], 0)
+        # Every message reaches the three members of its room
+        self.assertEqual(report["messages_delivered"], report["messages_sent"] * 3)
+        self.assertIsNotNone(report["latency_ms"]["p99"])
+        self.assertGreater(report["memory_per_connection_bytes"], 0)
+        self.assertFalse(Room.objects.filter(name__startswith="load_").exists())
+        self.assertEqual(User.objects.count(), users)
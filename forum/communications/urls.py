@@ -1,5 +1,13 @@
 from django.urls import path
-from .views import CreateConversationView, SendMessageView, MessageHistoryView
+from .views import (
+    ConversationReadView,
+    CreateConversationView,
+    InboxView,
+    SendMessageView,
+    MessageHistoryView,
+    OnlineUsersView,
+    RoomOnlineUsersView,
+)
 
 from . import views
 
@@ -17,4 +25,16 @@ urlpatterns = [
         MessageHistoryView.as_view(),
         name="message_history",
     ),
+    path("conversations/inbox/", InboxView.as_view(), name="inbox"),
+    path(
+        "conversations/<int:conversation_id>/read/",
+        ConversationReadView.as_view(),
+        name="conversation_read",
+    ),
+    path("conversations/online/", OnlineUsersView.as_view(), name="online_users"),
+    path(
+        "conversations/<int:conversation_id>/online/",
+        RoomOnlineUsersView.as_view(),
+        name="room_online_users",
+    ),
 ]
@@ -2,14 +2,18 @@ from django.forms import ValidationError
 from django.shortcuts import render
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
+from django.utils import timezone
 
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import Message, Room
-from .serializers import ChatRoomSerializer, MessageSerializer
+from .models import Message, Room, RoomReadMarker
+from .serializers import ChatRoomSerializer, InboxSerializer, MessageHistorySerializer, MessageSerializer
 from .permissions import IsParticipant
-from .paginations import MessagePagination
+from .paginations import InboxPagination, MessageHistoryPagination
+from .presence import online_in_rooms, online_users
 
 
 User = get_user_model()
@@ -51,14 +55,71 @@ class SendMessageView(generics.CreateAPIView):
 
 
 class MessageHistoryView(generics.ListAPIView):
-    serializer_class = MessageSerializer
+    """
+    Messages of a conversation in chronological order, paginated with
+    before/after cursors, see MessageHistoryPagination.
+
+    Each page is loaded with its senders in one query.
+    """
+    serializer_class = MessageHistorySerializer
     permission_classes = [IsAuthenticated, IsParticipant]
-    pagination_class = MessagePagination
+    pagination_class = MessageHistoryPagination
 
     def get_queryset(self):
         room_id = self.kwargs["conversation_id"]
         return (
             Message.objects.filter(room_id=room_id)
-            .only("id", "content")
-            .order_by("timestamp")
+            .select_related("user")
+            .only("id", "room_id", "content", "timestamp", "user__user_id", "user__first_name", "user__last_name")
+        )
+
+
+class RoomOnlineUsersView(APIView):
+    """
+    Ids of the participants currently connected to a conversation.
+    Presence is read from the channel layer's Redis, not from the database.
+    """
+    permission_classes = [IsAuthenticated, IsParticipant]
+
+    def get(self, request, conversation_id):
+        return Response({"room": conversation_id, "online": sorted(online_users(conversation_id))})
+
+
+class OnlineUsersView(APIView):
+    """
+    Online participants of every conversation of the current user, as
+    {room id: [user ids]}. Only the user's rooms are read from the database.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        room_ids = list(request.user.room_set.values_list("id", flat=True))
+        online = online_in_rooms(room_ids)
+        return Response({str(room_id): sorted(online[room_id]) for room_id in room_ids})
+
+
+class InboxView(generics.ListAPIView):
+    """
+    Conversations of the current user, most recently active first, each
+    with its last message and unread count. Each page is loaded with a
+    single query, see RoomQuerySet.inbox and InboxPagination.
+    """
+    serializer_class = InboxSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxPagination
+
+    def get_queryset(self):
+        return Room.objects.inbox(self.request.user)
+
+
+class ConversationReadView(APIView):
+    """
+    Mark every message of a conversation posted so far as read by the current user.
+    """
+    permission_classes = [IsAuthenticated, IsParticipant]
+
+    def post(self, request, conversation_id):
+        marker, _ = RoomReadMarker.objects.update_or_create(
+            room_id=conversation_id, user=request.user, defaults={"last_read_at": timezone.now()}
         )
+        return Response({"room": conversation_id, "last_read_at": marker.last_read_at})
@@ -6,7 +6,8 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from django.core.asgi import get_asgi_application
 
-from communications.routing import websocket_urlpatterns
+from communications.routing import websocket_urlpatterns as chat_urlpatterns
+from notifications.routing import websocket_urlpatterns as notification_urlpatterns
 
 logger = logging.getLogger("django")
 
@@ -19,7 +20,7 @@ application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
         "websocket": AllowedHostsOriginValidator(
-            AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+            AuthMiddlewareStack(URLRouter(chat_urlpatterns + notification_urlpatterns))
         ),
     }
 )
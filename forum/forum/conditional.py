@@ -0,0 +1,94 @@
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering conditional GET requests of `list` and
+    `retrieve` with 304 Not Modified before anything is serialized.
+
+    The ETag and Last-Modified validators come from one aggregate query over
+    the same queryset the view would serialize: the latest value of each
+    timestamp field, the number, highest and sum of the primary keys of the
+    rows (so swapping one row for an older one changes the ETag as well as
+    adding or removing it) and the number of related rows, so deletions
+    change the ETag too. Each of them is a single value however many rows
+    the queryset has.
+    Deletions do not move the latest timestamp, so Last-Modified is only
+    used for single objects without counted relations; everything else is
+    validated by ETag alone.
+
+    Attributes:
+        conditional_timestamps: model fields, possibly spanning relations, whose latest
+            value changes the representation
+        conditional_counts: relations whose number of rows is part of the ETag
+    """
+    conditional_timestamps = ("updated_at",)
+    conditional_counts = ()
+
+    def get_validators(self, queryset):
+        """
+        Return the ETag and last modification time of a queryset's representation.
+
+        Returns:
+            tuple: (quoted ETag, datetime or None)
+        """
+        aggregates = {f"latest_{index}": Max(field) for index, field in enumerate(self.conditional_timestamps)}
+        aggregates["rows"] = Count("pk", distinct=True)
+        aggregates["rows_max"] = Max("pk")
+        aggregates["rows_sum"] = Sum("pk", distinct=True)
+        for index, relation in enumerate(self.conditional_counts):
+            aggregates[f"count_{index}"] = Count(relation, distinct=True)
+        values = queryset.order_by().aggregate(**aggregates)
+
+        timestamps = [values[f"latest_{index}"] for index in range(len(self.conditional_timestamps))]
+        last_modified = max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+        fingerprint = "|".join([
+            self.request.accepted_renderer.format,
+            *(timestamp.isoformat() if timestamp else "" for timestamp in timestamps),
+            *(str(values[key]) for key in sorted(values) if not key.startswith("latest_")),
+        ])
+        return f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"', last_modified
+
+    def conditional(self, request, queryset, render, use_last_modified=False):
+        """
+        Return 304 Not Modified if the client's validators still match the
+        queryset, otherwise the response built by `render` with validators set.
+        """
+        etag, last_modified = self.get_validators(queryset)
+        timestamp = int(last_modified.timestamp()) if last_modified and use_last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            return response
+        response = render()
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        render = super().list
+        return self.conditional(request, queryset, lambda: render(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        # Planned prefetches only feed the serializer, so a 304 must not pay for them
+        deferred = hasattr(self, "prefetch_plan")
+        self.defer_prefetch = deferred
+        try:
+            instance = self.get_object()
+        finally:
+            self.defer_prefetch = False
+        queryset = type(instance)._default_manager.filter(pk=instance.pk)
+
+        def render():
+            if deferred:
+                self.prefetch_plan([instance])
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional(request, queryset, render, use_last_modified=not self.conditional_counts)
@@ -0,0 +1,40 @@
+from django.db.models import prefetch_related_objects
+
+
+class QueryPlanMixin:
+    """
+    ViewSet mixin declaring, per action, which relations the serializer
+    reads, so they are loaded with select_related/prefetch_related instead
+    of one query per row.
+
+    Attributes:
+        query_plans: {action: {"select_related": [...], "prefetch_related": [...]}};
+            the "default" plan applies to actions without their own
+        defer_prefetch: when set, plan_queryset leaves out the prefetches so they can be
+            run later with prefetch_plan, once it is known they will be rendered
+    """
+    query_plans = {}
+    defer_prefetch = False
+
+    def get_query_plan(self):
+        return self.query_plans.get(self.action, self.query_plans.get("default", {}))
+
+    def plan_queryset(self, queryset):
+        """
+        Apply the query plan of the current action to a queryset.
+        """
+        plan = self.get_query_plan()
+        if plan.get("select_related"):
+            queryset = queryset.select_related(*plan["select_related"])
+        if plan.get("prefetch_related") and not self.defer_prefetch:
+            queryset = queryset.prefetch_related(*plan["prefetch_related"])
+        return queryset
+
+    def prefetch_plan(self, instances):
+        """
+        Run the prefetches of the current action's plan on already loaded instances.
+        """
+        prefetch_related_objects(instances, *self.get_query_plan().get("prefetch_related", []))
+
+    def get_queryset(self):
+        return self.plan_queryset(super().get_queryset())
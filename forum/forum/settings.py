@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "django_filters",
@@ -347,6 +348,57 @@ CACHES = {
     }
 }
 
+# Share the cache between workers (required for cross-process invalidation)
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL")
+if REDIS_CACHE_URL:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_CACHE_URL,
+    }
+
+# Seconds during which repeated events of a startup are coalesced into one unread
+# investor notification instead of creating new ones (0 disables the digest)
+NOTIFICATION_DIGEST_WINDOW = int(os.getenv("NOTIFICATION_DIGEST_WINDOW", 300))
+
+# Days a notification event that ran out of retries stays in the outbox for inspection
+NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS = int(os.getenv("NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS", 7))
+
+# Days a notification email that ran out of retries stays queued for inspection
+NOTIFICATION_EMAIL_DEAD_RETENTION_DAYS = int(os.getenv("NOTIFICATION_EMAIL_DEAD_RETENTION_DAYS", 7))
+
+# Seconds between two purges of dead notification emails by the email worker
+NOTIFICATION_EMAIL_PURGE_INTERVAL = int(os.getenv("NOTIFICATION_EMAIL_PURGE_INTERVAL", 3600))
+
+# Seconds a cached unread notification counter is trusted before it is recounted
+NOTIFICATION_UNREAD_COUNT_TIMEOUT = int(os.getenv("NOTIFICATION_UNREAD_COUNT_TIMEOUT", 3600))
+
+# Full months of notifications kept in the partitioned tables before read ones are archived
+NOTIFICATION_RETENTION_MONTHS = int(os.getenv("NOTIFICATION_RETENTION_MONTHS", 12))
+
+# Chat messages received over WebSockets are written in batches of this many rows,
+# or after this many milliseconds, whichever comes first
+CHAT_MESSAGE_BATCH_SIZE = int(os.getenv("CHAT_MESSAGE_BATCH_SIZE", 50))
+CHAT_MESSAGE_FLUSH_INTERVAL = int(os.getenv("CHAT_MESSAGE_FLUSH_INTERVAL", 200))
+
+# Seconds a chat room's participants stay cached for WebSocket connects
+CHAT_ROOM_CACHE_TIMEOUT = int(os.getenv("CHAT_ROOM_CACHE_TIMEOUT", 300))
+
+# Seconds a chat connection stays online without a heartbeat
+CHAT_PRESENCE_TTL = int(os.getenv("CHAT_PRESENCE_TTL", 60))
+
+# Milliseconds during which chat events are coalesced into one frame for
+# connections opened with ?batch=1
+CHAT_BATCH_WINDOW = int(os.getenv("CHAT_BATCH_WINDOW", 10))
+# Chat frames queued per connection before CHAT_OUTBOUND_OVERFLOW applies:
+# "drop" discards the oldest queued frame, "close" disconnects the client
+CHAT_OUTBOUND_QUEUE_SIZE = int(os.getenv("CHAT_OUTBOUND_QUEUE_SIZE", 256))
+CHAT_OUTBOUND_OVERFLOW = os.getenv("CHAT_OUTBOUND_OVERFLOW", "drop")
+
+# Seconds a page of the public startup listing stays cached; entries are also
+# invalidated when the startups they show change (set REDIS_CACHE_URL to share
+# them between workers)
+PUBLIC_STARTUPS_CACHE_TIMEOUT = int(os.getenv("PUBLIC_STARTUPS_CACHE_TIMEOUT", 300))
+
 RATELIMIT_USE_CACHE = "default"  # Make sure RATELIMIT is reconfigured to use Redis when we add this type of caching
 
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,190 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from projects.models import Project
+from users.serializers import create_default_notification_preferences
+from .factories import InvestorProfileFactory, ProjectFactory, StartupProfileFactory, create_profiles_batch
+from .models import InvestorNotification, NotificationPreference, StartUpNotification
+from .outbox import process_outbox
+from .preference_masks import CategoriesThrough, MethodsThrough, rebuild_preference_masks
+from .registry import registry
+from .views import (
+    InvestorNotificationDetailView,
+    InvestorNotificationListView,
+    NotificationBulkActionView,
+    NotificationListView,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FOLLOWER_COUNTS = (10, 1000, 10000)
+DEFAULT_STARTUP_COUNT = 1
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting queries and the rows they wrote.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows_written = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.queries += 1
+        statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if statement in WRITE_STATEMENTS or (statement == "WITH" and "INSERT" in sql.upper()):
+            self.rows_written += max(context["cursor"].rowcount, 0)
+        return result
+
+
+@contextmanager
+def measure(results, scenario, followers, startups=DEFAULT_STARTUP_COUNT):
+    """
+    Record wall time, query count and rows written of the enclosed block.
+    """
+    recorder = QueryRecorder()
+    started = time.perf_counter()
+    with connection.execute_wrapper(recorder):
+        yield
+    results.append({
+        "scenario": scenario,
+        "followers": followers,
+        "startups": startups,
+        "seconds": round(time.perf_counter() - started, 6),
+        "queries": recorder.queries,
+        "rows_written": recorder.rows_written,
+    })
+
+
+def request_host():
+    """
+    Return a host accepted by ALLOWED_HOSTS, as paginated responses build absolute URLs.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def call_view(view_class, method, user, url, data=None, **kwargs):
+    factory = APIRequestFactory()
+    request = getattr(factory, method)(url, data, format="json", HTTP_HOST=request_host())
+    force_authenticate(request, user=user)
+    response = view_class.as_view()(request, **kwargs)
+    response.render()
+    return response
+
+
+def seed_investors(count):
+    """
+    Create `count` investors with the default notification preferences,
+    using one INSERT per table instead of one per row.
+    """
+    investors = create_profiles_batch(InvestorProfileFactory, count)
+    preferences = NotificationPreference.objects.bulk_create(
+        NotificationPreference(user_id=investor.user_id) for investor in investors
+    )
+    categories = registry.categories(["follow", "profile_update", "new_project"])
+    methods = registry.methods(["email", "in_app"])
+    CategoriesThrough.objects.bulk_create(
+        CategoriesThrough(notificationpreference_id=preference.id, notificationcategory_id=category.id)
+        for preference in preferences for category in categories
+    )
+    MethodsThrough.objects.bulk_create(
+        MethodsThrough(notificationpreference_id=preference.id, notificationmethod_id=method.id)
+        for preference in preferences for method in methods
+    )
+    rebuild_preference_masks(investor.user_id for investor in investors)
+    return investors
+
+
+def benchmark_followers(followers, startups=DEFAULT_STARTUP_COUNT):
+    """
+    Run every scenario for `startups` startups, each followed by the same
+    `followers` investors, so every investor receives notifications from
+    every startup and the write scenarios fan out startups × followers rows.
+
+    Returns:
+        list[dict]: one result per scenario
+    """
+    results = []
+    startup_profiles = create_profiles_batch(StartupProfileFactory, startups)
+    for startup in startup_profiles:
+        create_default_notification_preferences(startup.user)
+    investors = seed_investors(followers)
+    startup, investor = startup_profiles[0], investors[0]
+
+    def scenario(name):
+        return measure(results, name, followers, startups)
+
+    with scenario("follow"):
+        for followed in startup_profiles:
+            followed.followers.add(*investors)
+    with scenario("profile_update"):
+        for followed in startup_profiles:
+            followed.save()
+        process_outbox()
+    with scenario("project_create"):
+        projects = [ProjectFactory(startup=followed) for followed in startup_profiles]
+        process_outbox()
+    with scenario("project_update"):
+        for project in Project.objects.filter(id__in=[project.id for project in projects]):
+            project.save()
+        process_outbox()
+
+    with scenario("startup_list"):
+        call_view(NotificationListView, "get", startup.user, reverse("notifications:startup_notifications"))
+    with scenario("investor_list"):
+        call_view(InvestorNotificationListView, "get", investor.user, reverse("notifications:investor_notifications"))
+
+    notification = InvestorNotification.objects.filter(investor=investor).first()
+    url = reverse("notifications:investor_notification_detail", kwargs={"id": notification.id})
+    with scenario("detail"):
+        call_view(InvestorNotificationDetailView, "get", investor.user, url, id=notification.id)
+    with scenario("mark_read"):
+        call_view(InvestorNotificationDetailView, "patch", investor.user, url, id=notification.id)
+    with scenario("bulk_mark_read"):
+        call_view(
+            NotificationBulkActionView, "patch", startup.user,
+            reverse("notifications:startup_notifications_bulk"),
+            {"notification_category": registry.category("follow").id},
+        )
+
+    logger.info(f"Benchmarked notifications for {startups} startups with {followers} followers each "
+                f"({StartUpNotification.objects.filter(startup__in=startup_profiles).count()} startup notifications).")
+    return results
+
+
+def run_benchmarks(follower_counts=DEFAULT_FOLLOWER_COUNTS, startups=DEFAULT_STARTUP_COUNT):
+    """
+    Benchmark the notification subsystem for each number of followers,
+    spread across `startups` followed startups.
+
+    Every run happens inside a transaction that is rolled back, so the
+    database is left untouched and runs do not affect each other. Effects
+    deferred to commit, such as WebSocket pushes, are not measured.
+
+    Returns:
+        dict: machine-readable report with one entry per (followers, scenario)
+    """
+    results = []
+    for followers in follower_counts:
+        with transaction.atomic():
+            results.extend(benchmark_followers(followers, startups))
+            transaction.set_rollback(True)
+    return {
+        "database": connection.vendor,
+        "follower_counts": list(follower_counts),
+        "startups": startups,
+        "results": results,
+    }
@@ -0,0 +1,48 @@
+import json
+
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from profiles.models import InvestorProfile, StartupProfile
+from .models import InvestorNotification, StartUpNotification
+from .push import group_name
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes new notifications of the connected user as they are created.
+
+    The socket joins one group per profile of the user (startup and/or
+    investor); notifications are published to these groups by
+    notifications.push once the transaction creating them commits.
+    """
+
+    async def connect(self):
+        if not self.scope["user"].is_authenticated:
+            await self.close(code=403)
+            return
+
+        self.notification_groups = await sync_to_async(self.get_groups)(self.scope["user"])
+        for group in self.notification_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+    @staticmethod
+    def get_groups(user):
+        groups = [
+            group_name(StartUpNotification, profile_id)
+            for profile_id in StartupProfile.objects.filter(user=user).values_list("id", flat=True)
+        ]
+        groups += [
+            group_name(InvestorNotification, profile_id)
+            for profile_id in InvestorProfile.objects.filter(user=user).values_list("id", flat=True)
+        ]
+        return groups
+
+    async def disconnect(self, close_code):
+        for group in getattr(self, "notification_groups", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def notification_batch(self, event):
+        for notification in event["notifications"]:
+            await self.send(json.dumps({"type": "notification", "notification": notification}))
@@ -0,0 +1,97 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_KEY = "notifications:unread:{model}:{profile_id}"
+
+# Set when a change finds no counter to update, while a rebuild may be counting without it
+UNREAD_DIRTY_KEY = "notifications:unread-dirty:{model}:{profile_id}"
+
+
+def unread_count_key(model, profile_id):
+    return UNREAD_COUNT_KEY.format(model=model._meta.model_name, profile_id=profile_id)
+
+
+def unread_dirty_key(model, profile_id):
+    return UNREAD_DIRTY_KEY.format(model=model._meta.model_name, profile_id=profile_id)
+
+
+def get_unread_count(model, profile_id):
+    """
+    Return the number of unread notifications of a profile.
+
+    The value is served from the cache. On a miss it is rebuilt with a count
+    over the (recipient, is_read) indexes and stored with `cache.add`, so a
+    counter stored or incremented by another process in the meantime wins.
+    Between misses it is kept up to date by the increment/decrement helpers
+    below. A change committed while the counter is missing cannot be added
+    to it and may not be seen by a count already running, so it marks the
+    counter dirty and the next read counts again. The counter also expires
+    after NOTIFICATION_UNREAD_COUNT_TIMEOUT, so drift from changes the
+    helpers do not see at all heals on its own.
+
+    Args:
+        model: StartUpNotification or InvestorNotification
+        profile_id: id of the profile receiving the notifications
+
+    Returns:
+        int: number of unread notifications
+    """
+    key = unread_count_key(model, profile_id)
+    dirty_key = unread_dirty_key(model, profile_id)
+    cached = cache.get_many([key, dirty_key])
+    count = cached.get(key)
+    if count is None or count < 0 or dirty_key in cached:
+        if cached:
+            cache.delete_many([key, dirty_key])
+        count = model.objects.unread().filter(**{model.RECIPIENT_FIELD: profile_id}).count()
+        if cache.add(key, count, timeout=settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT):
+            logger.debug(f"Rebuilt unread counter {key}: {count}")
+        else:
+            cached = cache.get(key)
+            if cached is not None and cached >= 0:
+                count = cached
+    return count
+
+
+def _change(model, profile_ids, delta):
+    dirty = []
+    for profile_id in profile_ids:
+        try:
+            cache.incr(unread_count_key(model, profile_id), delta)
+        except ValueError:
+            # Not cached: the next read rebuilds it from the table, even if
+            # a rebuild that started before this change stores it first
+            dirty.append(unread_dirty_key(model, profile_id))
+    if dirty:
+        cache.set_many(dict.fromkeys(dirty, True), timeout=settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+
+
+def increment_unread(model, profile_ids, delta=1):
+    """
+    Add to the cached counters of the given profiles once the current
+    transaction commits. Missing counters are marked to be recounted on read.
+    """
+    profile_ids = list(profile_ids)
+    transaction.on_commit(lambda: _change(model, profile_ids, delta))
+
+
+def decrement_unread(model, profile_ids, delta=1):
+    """
+    Subtract from the cached counters of the given profiles once the current
+    transaction commits.
+    """
+    increment_unread(model, profile_ids, -delta)
+
+
+def reset_unread(model, profile_ids):
+    """
+    Drop the cached counters of the given profiles once the current
+    transaction commits, so they are rebuilt on the next read.
+    """
+    keys = [unread_count_key(model, profile_id) for profile_id in profile_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
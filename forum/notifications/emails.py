@@ -0,0 +1,272 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import InvestorNotification, NotificationEmail, NotificationPreferenceMask, StartUpNotification
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+# Delay before the first retry of a failed email, doubled on every further attempt
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# How long claimed emails stay hidden from other workers while they are being sent;
+# rows of a worker that dies mid-batch become due again afterwards
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+KIND_MODELS = {
+    NotificationEmail.Kind.STARTUP: StartUpNotification,
+    NotificationEmail.Kind.INVESTOR: InvestorNotification,
+}
+MODEL_KINDS = {model: kind for kind, model in KIND_MODELS.items()}
+
+DIGEST_TEMPLATE = "notifications/email_digest.txt"
+
+
+def recipient_users(model, notification_category_id, profile_ids):
+    """
+    Map recipient profiles that allow email for a category to their users.
+
+    Returns:
+        dict: {profile id: user id}
+    """
+    profile_model = model._meta.get_field(model.RECIPIENT_FIELD).related_model
+    lookup = "user__notification_preference_masks__"
+    return dict(
+        profile_model.objects.filter(
+            id__in=profile_ids,
+            **{
+                f"{lookup}category_id": notification_category_id,
+                f"{lookup}methods_mask__hasbits": NotificationPreferenceMask.METHOD_BITS["email"],
+            },
+        ).values_list('id', 'user_id')
+    )
+
+
+def enqueue_emails(notifications):
+    """
+    Queue email delivery of created notifications for recipients who allow
+    the 'email' method for the notification's category.
+
+    Eligibility is resolved with one query per (model, category) pair and
+    the queue rows are written with a single INSERT.
+
+    Args:
+        notifications: iterable of saved StartUpNotification or InvestorNotification instances
+
+    Returns:
+        int: number of queued emails
+    """
+    groups = defaultdict(list)
+    for notification in notifications:
+        groups[(type(notification), notification.notification_category_id)].append(notification)
+
+    emails = []
+    for (model, notification_category_id), group in groups.items():
+        users = recipient_users(
+            model, notification_category_id, {getattr(n, model.RECIPIENT_FIELD) for n in group}
+        )
+        emails.extend(
+            NotificationEmail(
+                user_id=users[getattr(notification, model.RECIPIENT_FIELD)],
+                kind=MODEL_KINDS[model],
+                notification_id=notification.id,
+            )
+            for notification in group
+            if getattr(notification, model.RECIPIENT_FIELD) in users
+        )
+    if emails:
+        NotificationEmail.objects.bulk_create(emails)
+    return len(emails)
+
+
+def retry_delay(attempts):
+    """
+    Return how long to wait before retrying an email that failed `attempts` times.
+    """
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def load_notifications(entries):
+    """
+    Fetch the notifications referenced by queued emails, one query per kind.
+
+    Returns:
+        dict: {(kind, notification id): notification}
+    """
+    ids = defaultdict(list)
+    for entry in entries:
+        ids[entry.kind].append(entry.notification_id)
+    notifications = {}
+    for kind, notification_ids in ids.items():
+        queryset = KIND_MODELS[kind].objects.filter(id__in=notification_ids).select_related('notification_category')
+        notifications.update(((kind, notification.id), notification) for notification in queryset)
+    return notifications
+
+
+def build_digest(user, notifications, connection=None):
+    """
+    Build the email summarizing a user's notifications.
+    """
+    count = len(notifications)
+    return EmailMessage(
+        subject=f"You have {count} new notification{'s' if count != 1 else ''}",
+        body=render_to_string(DIGEST_TEMPLATE, {"user": user, "notifications": notifications}),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Claim a batch of due emails for this worker.
+
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED only long enough
+    to push their next_attempt_at past CLAIM_TIMEOUT; the transaction then
+    commits, so no lock is held while the emails are sent.
+
+    Returns:
+        list[NotificationEmail]: the claimed rows
+    """
+    with transaction.atomic():
+        entries = list(
+            NotificationEmail.objects.due()
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .order_by('id')[:batch_size]
+        )
+        if entries:
+            NotificationEmail.objects.filter(id__in=[entry.id for entry in entries]).update(
+                next_attempt_at=timezone.now() + CLAIM_TIMEOUT
+            )
+    return entries
+
+
+def record_outcome(done, failed):
+    """
+    Delete the sent emails and schedule the retry of the failed ones.
+
+    Args:
+        done: ids of the rows that were sent or no longer need sending
+        failed: list of (NotificationEmail, exception) pairs
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if done:
+            NotificationEmail.objects.filter(id__in=done).delete()
+        if failed:
+            for entry, error in failed:
+                entry.attempts += 1
+                entry.last_error = str(error)
+                entry.next_attempt_at = now + retry_delay(entry.attempts)
+            NotificationEmail.objects.bulk_update(
+                [entry for entry, _ in failed], ['attempts', 'last_error', 'next_attempt_at']
+            )
+    for entry, error in failed:
+        if entry.attempts >= NotificationEmail.MAX_ATTEMPTS:
+            logger.error(f"Giving up on notification email {entry.id} after {entry.attempts} attempts: {error}")
+
+
+def deliver_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Claim a batch of due emails and send them as one digest per recipient.
+
+    The batch is claimed and committed first (see claim_batch), then sent,
+    then its outcome is recorded, so several workers can run concurrently
+    without holding row locks during SMTP round trips. All digests of the
+    batch are sent over a single connection of the configured email
+    backend, opened once instead of once per message. Sent rows are
+    deleted; rows of a digest that failed are kept with their error and
+    retried with exponential backoff until NotificationEmail.MAX_ATTEMPTS
+    is reached.
+
+    Args:
+        batch_size: maximum number of queued emails to claim
+
+    Returns:
+        dict: delivery metrics with keys claimed, emails_sent,
+            notifications_sent, failed and seconds
+    """
+    started = time.monotonic()
+    stats = {"claimed": 0, "emails_sent": 0, "notifications_sent": 0, "failed": 0, "seconds": 0.0}
+    entries = claim_batch(batch_size)
+    stats["claimed"] = len(entries)
+    if not entries:
+        return stats
+
+    notifications = load_notifications(entries)
+    digests = defaultdict(list)
+    done = []
+    for entry in entries:
+        notification = notifications.get((entry.kind, entry.notification_id))
+        if notification is None:
+            # The notification was deleted or archived before it could be sent
+            done.append(entry.id)
+        else:
+            digests[entry.user_id].append((entry, notification))
+
+    failed = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for items in digests.values():
+            user = items[0][0].user
+            try:
+                connection.send_messages([build_digest(user, [n for _, n in items], connection)])
+            except Exception as e:
+                logger.error(f"Failed to send notification email to user {user.pk}: {e}")
+                failed.extend((entry, e) for entry, _ in items)
+            else:
+                done.extend(entry.id for entry, _ in items)
+                stats["emails_sent"] += 1
+                stats["notifications_sent"] += len(items)
+    except Exception as e:
+        logger.error(f"Failed to open email connection: {e}")
+        sent = set(done)
+        failed.extend((entry, e) for items in digests.values() for entry, _ in items if entry.id not in sent)
+    finally:
+        connection.close()
+
+    record_outcome(done, failed)
+    stats["failed"] = len(failed)
+
+    stats["seconds"] = time.monotonic() - started
+    logger.info(
+        f"Sent {stats['emails_sent']} notification emails with {stats['notifications_sent']} notifications "
+        f"in {stats['seconds']:.3f}s, {stats['failed']} failed."
+    )
+    return stats
+
+
+def purge_dead_emails(retention_days=None):
+    """
+    Delete emails that ran out of retries and were queued more than `retention_days` ago.
+
+    Dead emails are kept for a while so their errors can be inspected (or
+    their attempts reset to retry them); this removes them afterwards so
+    they do not pile up in the queue.
+
+    Args:
+        retention_days: days a dead email is kept, defaults to
+            settings.NOTIFICATION_EMAIL_DEAD_RETENTION_DAYS
+
+    Returns:
+        int: number of emails deleted
+    """
+    if retention_days is None:
+        retention_days = settings.NOTIFICATION_EMAIL_DEAD_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = NotificationEmail.objects.dead().filter(created_at__lt=cutoff).delete()
+    if deleted:
+        logger.warning(f"Purged {deleted} dead notification emails older than {retention_days} days.")
+    return deleted
@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 import factory
 from factory.django import DjangoModelFactory
 from .models import NotificationCategory, StartUpNotification, InvestorNotification
@@ -102,4 +104,36 @@ class InvestmentFactory(DjangoModelFactory):
     def ensure_project_published(self, create, extracted, **kwargs):
         if self.project and not self.project.is_published:
             self.project.is_published = True
-            self.project.save()
\ No newline at end of file
+            self.project.save()
+
+
+def create_users_batch(size, **kwargs):
+    """
+    Insert `size` users with a single INSERT.
+
+    Emails are generated from a random prefix instead of Faker, so large
+    batches never collide on the unique email column.
+    """
+    prefix = uuid4().hex[:12]
+    users = UserFactory.build_batch(size, **kwargs)
+    for index, user in enumerate(users):
+        user.email = f"{prefix}-{index}@example.com"
+    return CustomUser.objects.bulk_create(users)
+
+
+def create_profiles_batch(factory_class, size, **kwargs):
+    """
+    Insert `size` users and one profile of `factory_class` for each of them,
+    with one INSERT per table.
+
+    Args:
+        factory_class: InvestorProfileFactory or StartupProfileFactory
+        size: number of profiles to create
+        kwargs: field values shared by all profiles
+
+    Returns:
+        list: the created profiles
+    """
+    users = create_users_batch(size)
+    profiles = [factory_class.build(user=user, email=user.email, **kwargs) for user in users]
+    return factory_class._meta.model.objects.bulk_create(profiles)
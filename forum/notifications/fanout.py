@@ -0,0 +1,211 @@
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from profiles.models import InvestorProfile, StartupProfile
+from . import counters, emails, push
+from .models import InvestorNotification, NotificationPreferenceMask, StartUpNotification, StartUpNotificationKey
+
+logger = logging.getLogger(__name__)
+
+FANOUT_BATCH_SIZE = 1000
+
+
+def eligible_profiles(profiles, notification_category, notification_method=None):
+    """
+    Narrow a profile queryset to profiles whose owner accepts the category.
+
+    Eligibility is read from NotificationPreferenceMask, so it is a single
+    indexed predicate on (category, user) plus a bit test on the methods mask,
+    resolved inside the same query regardless of the number of profiles.
+
+    Args:
+        profiles: QuerySet of InvestorProfile or StartupProfile
+        notification_category: NotificationCategory instance
+        notification_method: NotificationMethod instance or None to skip the method check
+
+    Returns:
+        QuerySet: the filtered profiles
+    """
+    lookup = "user__notification_preference_masks__"
+    filters = {f"{lookup}category": notification_category}
+    if notification_method is not None:
+        method_bit = NotificationPreferenceMask.method_bit(notification_method)
+        if not method_bit:
+            return profiles.none()
+        filters[f"{lookup}methods_mask__hasbits"] = method_bit
+    return profiles.filter(**filters)
+
+
+def bulk_insert_notifications(model, notifications, batch_size=FANOUT_BATCH_SIZE):
+    """
+    Write notifications in chunks, push them to their recipients and queue
+    their email delivery.
+
+    Args:
+        model: StartUpNotification or InvestorNotification
+        notifications: iterable of unsaved notification instances
+        batch_size: number of rows per INSERT
+
+    Returns:
+        int: number of notifications inserted
+    """
+    notifications = iter(notifications)
+    total = 0
+    while True:
+        chunk = list(islice(notifications, batch_size))
+        if not chunk:
+            return total
+        created = model.objects.bulk_create(chunk)
+        push.publish(created)
+        emails.enqueue_emails(created)
+        total += len(chunk)
+
+
+def coalesce_notifications(startup, notification_category, investor_ids, window):
+    """
+    Fold a new event into the unread notifications created inside the digest window.
+
+    A single UPDATE ... RETURNING bumps the occurrence count and last-seen
+    time of every matching notification, so a burst of events leaves one
+    row per follower instead of one row per event.
+
+    Args:
+        startup: StartupProfile that triggered the notification
+        notification_category: NotificationCategory instance
+        investor_ids: ids of the investors to notify
+        window: timedelta during which events are coalesced
+
+    Returns:
+        list[InvestorNotification]: the updated notifications
+    """
+    if not investor_ids:
+        return []
+    now = timezone.now()
+    table = InvestorNotification._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE "{table}"
+            SET occurrences = occurrences + 1, last_occurred_at = %s, updated_at = %s
+            WHERE startup_id = %s AND notification_category_id = %s AND NOT is_read
+                AND created_at >= %s AND investor_id = ANY(%s)
+            RETURNING id, investor_id, created_at, occurrences
+            """,
+            [now, now, startup.id, notification_category.id, now - window, list(investor_ids)],
+        )
+        rows = cursor.fetchall()
+    return [
+        InvestorNotification(
+            id=notification_id,
+            notification_category=notification_category,
+            investor_id=investor_id,
+            startup_id=startup.id,
+            created_at=created_at,
+            updated_at=now,
+            occurrences=occurrences,
+            last_occurred_at=now,
+        )
+        for notification_id, investor_id, created_at, occurrences in rows
+    ]
+
+
+def notify_followers(startup, notification_category, notification_method=None, digest_window=0):
+    """
+    Notify every eligible follower of a startup.
+
+    Followers who still have an unread notification of the same category
+    from this startup, created within the digest window, get that
+    notification updated; the others get a new InvestorNotification.
+
+    Args:
+        startup: StartupProfile that triggered the notification
+        notification_category: NotificationCategory instance
+        notification_method: NotificationMethod the followers must allow, if any
+        digest_window: seconds during which events are coalesced, 0 to always insert
+
+    Returns:
+        int: number of followers notified
+    """
+    investor_ids = list(eligible_profiles(
+        InvestorProfile.objects.filter(followed_startups=startup),
+        notification_category,
+        notification_method,
+    ).values_list("id", flat=True))
+
+    coalesced = []
+    if digest_window > 0:
+        coalesced = coalesce_notifications(
+            startup, notification_category, investor_ids, timedelta(seconds=digest_window)
+        )
+        push.publish(coalesced)
+        coalesced_ids = {notification.investor_id for notification in coalesced}
+        investor_ids = [investor_id for investor_id in investor_ids if investor_id not in coalesced_ids]
+
+    total = bulk_insert_notifications(
+        InvestorNotification,
+        (
+            InvestorNotification(
+                notification_category=notification_category,
+                investor_id=investor_id,
+                startup_id=startup.id,
+            )
+            for investor_id in investor_ids
+        ),
+    )
+    counters.increment_unread(InvestorNotification, investor_ids)
+    logger.info(
+        f"Fan-out of '{notification_category.name}' for startup {startup.id}: "
+        f"{total} new and {len(coalesced)} coalesced notifications."
+    )
+    return total + len(coalesced)
+
+
+def notify_startup(startup, notification_category, investor_ids, notification_method=None):
+    """
+    Create a StartUpNotification about each of the given investors, unless
+    the startup already has one of this category about that investor.
+
+    Each notification first claims its StartUpNotificationKey, whose unique
+    constraint settles concurrent fan-outs of the same event; the claim and
+    the insert share a transaction, so a failed insert releases the key.
+
+    Args:
+        startup: StartupProfile receiving the notifications
+        notification_category: NotificationCategory instance
+        investor_ids: iterable of InvestorProfile ids that triggered the notification
+        notification_method: NotificationMethod the startup must allow, if any
+
+    Returns:
+        int: number of notifications inserted
+    """
+    investor_ids = set(investor_ids)
+    is_eligible = eligible_profiles(
+        StartupProfile.objects.filter(pk=startup.pk),
+        notification_category,
+        notification_method,
+    ).exists()
+    if not is_eligible:
+        logger.info(f"Startup {startup.id} does not accept '{notification_category.name}' notifications.")
+        return 0
+
+    with transaction.atomic():
+        investor_ids = StartUpNotificationKey.claim(notification_category, startup, investor_ids)
+        total = bulk_insert_notifications(
+            StartUpNotification,
+            (
+                StartUpNotification(
+                    notification_category=notification_category,
+                    investor_id=investor_id,
+                    startup_id=startup.id,
+                )
+                for investor_id in sorted(investor_ids)
+            ),
+        )
+    if total:
+        counters.increment_unread(StartUpNotification, [startup.id], total)
+    logger.info(f"Created {total} '{notification_category.name}' notifications for startup {startup.id}.")
+    return total
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from notifications.partitions import archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Move read notifications older than the retention period to the archive tables "
+        "and drop the partitions left empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months", type=int, default=settings.NOTIFICATION_RETENTION_MONTHS,
+            help="Number of full months of notifications kept in the live tables.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report how many notifications would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Notification partitioning requires PostgreSQL.")
+        if options["retention_months"] < 1:
+            raise CommandError("--retention-months must be at least 1.")
+
+        archived = archive_read_notifications(options["retention_months"], dry_run=options["dry_run"])
+        for partition, count in archived.items():
+            self.stdout.write(f"{partition}: {count}")
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sum(archived.values())} read notifications."))
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.benchmarks import DEFAULT_FOLLOWER_COUNTS, DEFAULT_STARTUP_COUNT, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark notification scenarios for growing numbers of followers and "
+        "print wall time, query count and rows written as JSON. "
+        "All data is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--followers", type=int, nargs="+", default=list(DEFAULT_FOLLOWER_COUNTS),
+            help="Numbers of followers to benchmark.",
+        )
+        parser.add_argument(
+            "--startups", type=int, default=DEFAULT_STARTUP_COUNT,
+            help="Number of startups, each followed by every benchmarked investor.",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write the JSON report to instead of standard output.",
+        )
+
+    def handle(self, *args, **options):
+        if options["startups"] < 1:
+            raise CommandError("--startups must be at least 1.")
+        report = json.dumps(run_benchmarks(options["followers"], options["startups"]), indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}."))
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from notifications.partitions import DEFAULT_MONTHS_AHEAD, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the notification tables ahead of time. "
+        "Meant to run periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD,
+            help="Number of months after the current one that must have a partition.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Notification partitioning requires PostgreSQL.")
+        created = ensure_partitions(options["months_ahead"])
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} notification partitions."))
@@ -0,0 +1,53 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import DEFAULT_BATCH_SIZE, process_batch, purge_dead_events
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the notification outbox and fan out notifications. "
+        "Several workers can run at the same time. Events that ran out of retries "
+        "are purged once they are older than the dead-letter retention."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of events claimed per transaction.",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once the outbox is empty instead of polling.",
+        )
+        parser.add_argument(
+            "--purge-interval", type=float, default=3600.0,
+            help="Seconds between purges of dead events while polling.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        purged_at = None
+        try:
+            while True:
+                processed = process_batch(batch_size)
+                total += processed
+                if processed < batch_size:
+                    if purged_at is None or time.monotonic() - purged_at >= options["purge_interval"]:
+                        purge_dead_events()
+                        purged_at = time.monotonic()
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            logger.info("Notification outbox worker stopped.")
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} notification events."))
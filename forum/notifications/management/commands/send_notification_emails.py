@@ -0,0 +1,59 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.emails import DEFAULT_BATCH_SIZE, deliver_batch, purge_dead_emails
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued notification emails as one digest per recipient, "
+        "reusing one SMTP connection per batch. Several workers can run at the same time. "
+        "Emails that ran out of retries are purged once they are older than the dead-letter retention."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of queued emails claimed per transaction.",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=5.0,
+            help="Seconds to wait when no email is due.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once no email is due instead of polling.",
+        )
+        parser.add_argument(
+            "--purge-interval", type=float, default=settings.NOTIFICATION_EMAIL_PURGE_INTERVAL,
+            help="Seconds between purges of dead emails while polling.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        totals = {"emails_sent": 0, "notifications_sent": 0, "failed": 0, "seconds": 0.0}
+        purged_at = None
+        try:
+            while True:
+                stats = deliver_batch(batch_size)
+                for key in totals:
+                    totals[key] += stats[key]
+                if stats["claimed"] < batch_size:
+                    if purged_at is None or time.monotonic() - purged_at >= options["purge_interval"]:
+                        purge_dead_emails()
+                        purged_at = time.monotonic()
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            logger.info("Notification email worker stopped.")
+        rate = totals["emails_sent"] / totals["seconds"] if totals["seconds"] else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['emails_sent']} emails with {totals['notifications_sent']} notifications "
+            f"in {totals['seconds']:.2f}s ({rate:.1f} emails/s), {totals['failed']} failed."
+        ))
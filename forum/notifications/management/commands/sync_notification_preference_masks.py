@@ -0,0 +1,49 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.preference_masks import (
+    DEFAULT_BATCH_SIZE,
+    find_inconsistent_users,
+    iter_user_batches,
+    rebuild_preference_masks,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare notification preference masks with the preferences they are derived from "
+        "and rebuild the ones that differ."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of users checked per batch.",
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report inconsistent users and exit with an error if there are any.",
+        )
+
+    def handle(self, *args, **options):
+        inconsistent = []
+        rows = 0
+        for user_ids in iter_user_batches(options["batch_size"]):
+            stale = find_inconsistent_users(user_ids)
+            inconsistent.extend(stale)
+            if stale and not options["check"]:
+                rows += rebuild_preference_masks(stale)
+
+        if options["check"]:
+            if inconsistent:
+                logger.warning(f"Inconsistent notification preference masks for users: {inconsistent}")
+                raise CommandError(f"{len(inconsistent)} users have inconsistent notification preference masks.")
+            self.stdout.write(self.style.SUCCESS("Notification preference masks are consistent."))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows} notification preference masks for {len(inconsistent)} users."
+        ))
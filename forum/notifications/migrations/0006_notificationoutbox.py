@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-17 17:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_startupprofile_is_public'),
+        ('notifications', '0005_investornotification_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('profile_update', 'Profile update'), ('new_project', 'New project'), ('project_update', 'Project update')], max_length=50)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_events', to='profiles.startupprofile')),
+            ],
+            options={
+                'verbose_name': 'Notification Outbox Event',
+                'verbose_name_plural': 'Notification Outbox Events',
+                'db_table': 'notification_outbox',
+                'ordering': ['id'],
+            },
+        ),
+    ]
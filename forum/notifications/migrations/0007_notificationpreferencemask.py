@@ -0,0 +1,63 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import notifications.models
+
+# Frozen copy of NotificationPreferenceMask.METHOD_BITS at the time of this migration
+METHOD_BITS = {"in_app": 1 << 0, "email": 1 << 1}
+
+
+def backfill_preference_masks(apps, schema_editor):
+    NotificationPreference = apps.get_model("notifications", "NotificationPreference")
+    NotificationPreferenceMask = apps.get_model("notifications", "NotificationPreferenceMask")
+
+    methods = {}
+    method_rows = NotificationPreference.allowed_notification_methods.through.objects.values_list(
+        "notificationpreference__user_id", "notificationmethod__name"
+    )
+    for user_id, method_name in method_rows:
+        methods[user_id] = methods.get(user_id, 0) | METHOD_BITS.get(method_name, 0)
+
+    category_rows = NotificationPreference.allowed_notification_categories.through.objects.values_list(
+        "notificationpreference__user_id", "notificationcategory_id"
+    )
+    NotificationPreferenceMask.objects.bulk_create(
+        (
+            NotificationPreferenceMask(user_id=user_id, category_id=category_id, methods_mask=methods.get(user_id, 0))
+            for user_id, category_id in category_rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0006_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreferenceMask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('methods_mask', notifications.models.BitmaskField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preference_masks', to='notifications.notificationcategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_preference_masks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notification Preference Mask',
+                'verbose_name_plural': 'Notification Preference Masks',
+                'db_table': 'notification_preference_masks',
+                'ordering': ['user', 'category'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationpreferencemask',
+            constraint=models.UniqueConstraint(fields=('category', 'user'), name='unique_preference_mask'),
+        ),
+        migrations.RunPython(backfill_preference_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,117 @@
+import re
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLES = ("notifications_startupnotification", "notifications_investornotification")
+
+# Monthly partitions created after the current month; later ones are created
+# by the create_notification_partitions command.
+MONTHS_AHEAD = 3
+
+
+def add_months(value, months):
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_table(cursor, table):
+    """
+    Rebuild a table as a partitioned table with the same columns, indexes
+    and foreign keys, partitioned by month on created_at.
+
+    PostgreSQL requires the partition key in the primary key, so it becomes
+    (id, created_at); ids stay unique through a sequence owned by the new
+    table, which continues from the old one (identity columns are not
+    supported on partitioned tables before PostgreSQL 17).
+    """
+    legacy = f"{table}_legacy"
+    cursor.execute(
+        """
+        SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)
+        FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary
+        """,
+        [table],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('f', 'c')
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+        [table],
+    )
+    primary_key = cursor.fetchone()[0]
+    cursor.execute(f'SELECT GREATEST(MAX(id), 0) FROM "{table}"')
+    max_id = cursor.fetchone()[0]
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    cursor.execute(f"SELECT last_value, is_called FROM {cursor.fetchone()[0]}")
+    last_value, is_called = cursor.fetchone()
+    next_id = max(max_id, last_value if is_called else last_value - 1) + 1
+    cursor.execute(f'SELECT date_trunc(\'month\', MIN(created_at)) FROM "{table}"')
+    first_month = cursor.fetchone()[0]
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    cursor.execute(f'CREATE TABLE "{table}" (LIKE "{legacy}") PARTITION BY RANGE (created_at)')
+    cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    current = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month = min(first_month.astimezone(timezone.utc), current) if first_month else current
+    last = add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        upper = add_months(month, 1)
+        cursor.execute(
+            f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+    cursor.execute(f'DROP TABLE "{legacy}"')
+    cursor.execute(f'CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}".id START WITH {next_id}')
+    cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN id SET DEFAULT nextval(\'"{table}_id_seq"\')')
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{primary_key}" PRIMARY KEY (id, created_at)')
+    for name, definition in indexes:
+        cursor.execute(re.sub(rf'ON (\S+\.)?"?{legacy}"? ', f'ON "{table}" ', definition))
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition_notifications(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            partition_table(cursor, table)
+
+
+class Migration(migrations.Migration):
+    """
+    Range-partition the notification tables by month on created_at.
+
+    The (notification_category, investor, startup) unique constraint of
+    StartUpNotification cannot be kept, as unique constraints on partitioned
+    tables must include the partition key; 0011 adds it back with created_at.
+
+    This migration is irreversible: turning the partitioned tables back into
+    plain ones would mean copying every notification, so roll back by
+    restoring a backup instead.
+    """
+
+    dependencies = [
+        ("notifications", "0007_notificationpreferencemask"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="startupnotification",
+            name="unique_notification",
+        ),
+        # No reverse_code: unapplying raises IrreversibleError before RemoveConstraint is reversed
+        migrations.RunPython(partition_notifications),
+    ]
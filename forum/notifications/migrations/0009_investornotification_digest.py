@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0008_partition_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investornotification',
+            name='last_occurred_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunSQL(
+            "UPDATE notifications_investornotification SET last_occurred_at = created_at",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name='investornotification',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name='investornotification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['startup', 'notification_category', 'created_at'], name='investor_notification_digest'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0009_investornotification_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('startup', 'Startup notification'), ('investor', 'Investor notification')], max_length=20)),
+                ('notification_id', models.BigIntegerField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_emails', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notification Email',
+                'verbose_name_plural': 'Notification Emails',
+                'db_table': 'notification_emails',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['next_attempt_at'], name='notification_email_due')],
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TABLES = ("notifications_startupnotification", "notifications_investornotification")
+
+
+def list_leaf_partitions(cursor, table):
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def add_partition_id_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            for partition in list_leaf_partitions(cursor, table):
+                cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{partition}_id_key" ON "{partition}" (id)')
+
+
+def remove_partition_id_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            for partition in list_leaf_partitions(cursor, table):
+                cursor.execute(f'DROP INDEX IF EXISTS "{partition}_id_key"')
+
+
+def claim_existing_notifications(apps, schema_editor):
+    StartUpNotification = apps.get_model('notifications', 'StartUpNotification')
+    StartUpNotificationKey = apps.get_model('notifications', 'StartUpNotificationKey')
+    keys = (
+        StartUpNotification.objects.order_by()
+        .values_list('notification_category_id', 'investor_id', 'startup_id')
+        .distinct()
+    )
+    StartUpNotificationKey.objects.bulk_create(
+        (
+            StartUpNotificationKey(notification_category_id=category_id, investor_id=investor_id, startup_id=startup_id)
+            for category_id, investor_id, startup_id in keys.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Restore the uniqueness lost when the notification tables were partitioned.
+
+    A unique constraint on a partitioned table must include the partition
+    key, so (notification_category, investor, startup) cannot be unique on
+    the StartUpNotification table itself any more. It is enforced by the
+    unpartitioned StartUpNotificationKey table instead, filled here from the
+    existing notifications; new notifications claim their key first.
+
+    PostgreSQL cannot enforce a unique index on id alone across partitions
+    either, so every partition gets its own unique index on id (new
+    partitions get one from notifications.partitions.create_partition); ids
+    are only ever drawn from the table's sequence, which keeps them unique
+    across partitions.
+    """
+
+    dependencies = [
+        ('notifications', '0010_notificationemail'),
+        ('profiles', '0006_startupprofile_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartUpNotificationKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('investor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.investorprofile')),
+                ('notification_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='notifications.notificationcategory')),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.startupprofile')),
+            ],
+            options={
+                'verbose_name': 'Startup Notification Key',
+                'verbose_name_plural': 'Startup Notification Keys',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='startupnotificationkey',
+            constraint=models.UniqueConstraint(fields=('notification_category', 'investor', 'startup'), name='unique_notification'),
+        ),
+        migrations.RunPython(claim_existing_notifications, migrations.RunPython.noop),
+        migrations.RunPython(add_partition_id_indexes, remove_partition_id_indexes),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0011_notification_unique_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(fields=['next_attempt_at'], name='notification_outbox_due'),
+        ),
+    ]
@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import connection, models
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from profiles.models import InvestorProfile, StartupProfile
 
+from . import counters
+
 User = get_user_model()
 
 
@@ -132,6 +135,66 @@ class NotificationPreference(models.Model):
         verbose_name_plural = "Notification Preferences"
 
 
+class BitmaskField(models.PositiveSmallIntegerField):
+    """
+    Small integer storing a set of flags. Supports the `hasbits` lookup,
+    which matches rows where all the given bits are set.
+    """
+
+
+@BitmaskField.register_lookup
+class HasBits(models.Lookup):
+    lookup_name = "hasbits"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"({lhs} & {rhs}) = {rhs}", lhs_params + rhs_params + rhs_params
+
+
+class NotificationPreferenceMask(models.Model):
+    """
+    Denormalized copy of a user's NotificationPreference.
+
+    There is one row per allowed category, holding the allowed methods as a
+    bitmask, so eligibility for a (category, method) pair is a single indexed
+    predicate instead of a preference lookup plus two many-to-many scans.
+    Rows are rebuilt whenever the preference's categories or methods change.
+
+    Attributes:
+        user (ForeignKey): The user who owns the preference.
+        category (ForeignKey): A notification category the user allows.
+        methods_mask (BitmaskField): Allowed methods, see METHOD_BITS.
+    """
+    METHOD_BITS = {
+        "in_app": 1 << 0,
+        "email": 1 << 1,
+    }
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notification_preference_masks")
+    category = models.ForeignKey(NotificationCategory, on_delete=models.CASCADE, related_name="preference_masks")
+    methods_mask = BitmaskField(default=0)
+
+    class Meta:
+        db_table = "notification_preference_masks"
+        verbose_name = "Notification Preference Mask"
+        verbose_name_plural = "Notification Preference Masks"
+        ordering = ["user", "category"]
+        constraints = [
+            models.UniqueConstraint(fields=["category", "user"], name="unique_preference_mask"),
+        ]
+
+    def __str__(self):
+        return f"NotificationPreferenceMask(user={self.user_id}, category={self.category_id}, methods={self.methods_mask})"
+
+    @classmethod
+    def method_bit(cls, notification_method):
+        """
+        Return the bit of a NotificationMethod, or 0 if the method has none.
+        """
+        return cls.METHOD_BITS.get(notification_method.name, 0)
+
+
 class NotificationQuerySet(models.QuerySet):
     def unread(self):
         """
@@ -150,9 +213,50 @@ class NotificationQuerySet(models.QuerySet):
         Filter notifications for a specific startup.
         """
         return self.filter(startup=startup)
+
+    def matching(self, ids=None, before=None, notification_category=None):
+        """
+        Filter notifications by any combination of ids, an upper bound on
+        the creation time and a category id. Omitted criteria are ignored.
+        """
+        queryset = self
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        if before is not None:
+            queryset = queryset.filter(created_at__lt=before)
+        if notification_category is not None:
+            queryset = queryset.filter(notification_category_id=notification_category)
+        return queryset
     
 
-class StartUpNotification(models.Model):
+class ReadableNotificationMixin:
+    """
+    Read-state handling shared by StartUpNotification and InvestorNotification.
+
+    Subclasses set RECIPIENT_FIELD to the field holding the id of the profile
+    whose unread counter the notification belongs to.
+    """
+
+    def mark_as_read(self):
+        """
+        Mark the notification as read and update the recipient's unread counter.
+
+        The row is only updated while it is still unread, so concurrent
+        requests decrement the counter once.
+        """
+        if self.is_read:
+            return False
+        self.is_read = True
+        self.updated_at = timezone.now()
+        updated = type(self).objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, updated_at=self.updated_at
+        )
+        if updated:
+            counters.decrement_unread(type(self), [getattr(self, self.RECIPIENT_FIELD)])
+        return bool(updated)
+
+
+class StartUpNotification(ReadableNotificationMixin, models.Model):
     """
     Represents a notification sent to a startup about an investor's activity.
 
@@ -180,31 +284,93 @@ class StartUpNotification(models.Model):
     # Use the custom QuerySet as the default manager
     objects = NotificationQuerySet.as_manager()
 
+    # Profile whose unread counter this notification belongs to
+    RECIPIENT_FIELD = 'startup_id'
+
     class Meta:
         verbose_name = "Startup Notification"
         verbose_name_plural = "Startup Notifications"
         ordering = ['id']
+
+    @classmethod
+    def mark_all_as_read(cls, user):
+        """
+        Mark all unread notifications for a specific user as read.
+        """
+        profile = user.startup_profile
+        updated = cls.objects.unread().for_startup(profile).update(is_read=True)
+        counters.reset_unread(cls, [profile.id])
+        return updated
+
+
+class StartUpNotificationKey(models.Model):
+    """
+    Records that a startup was notified about an investor in a category.
+
+    A unique constraint on the partitioned notification table must include
+    created_at, so it could not stop the same notification from being sent
+    twice. This plain table holds the uniqueness instead: a notification is
+    only created after its key is claimed. Keys outlive their notification,
+    so deleting or archiving it does not let the same event notify again.
+
+    Attributes:
+        notification_category (NotificationCategory): The category of notification.
+        investor (InvestorProfile): The investor the notification is about.
+        startup (StartupProfile): The startup that was notified.
+    """
+    notification_category = models.ForeignKey(NotificationCategory, on_delete=models.CASCADE, related_name='+')
+    investor = models.ForeignKey(InvestorProfile, on_delete=models.CASCADE, related_name='+')
+    startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        verbose_name = "Startup Notification Key"
+        verbose_name_plural = "Startup Notification Keys"
         constraints = [
             models.UniqueConstraint(
                 fields=['notification_category', 'investor', 'startup'],
-                name='unique_notification'
-            )
+                name='unique_notification',
+            ),
         ]
 
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save()
+    def __str__(self):
+        return (
+            f"StartUpNotificationKey(category={self.notification_category_id}, "
+            f"investor={self.investor_id}, startup={self.startup_id})"
+        )
 
     @classmethod
-    def mark_all_as_read(cls, user):
+    def claim(cls, notification_category, startup, investor_ids):
         """
-        Mark all unread notifications for a specific user as read.
+        Take the keys of the given investors that are still free.
+
+        A single INSERT ... ON CONFLICT DO NOTHING decides each key, so of
+        two concurrent requests for the same notification only one wins.
+
+        Args:
+            notification_category: NotificationCategory instance
+            startup: StartupProfile to notify
+            investor_ids: iterable of InvestorProfile ids
+
+        Returns:
+            set[int]: ids of the investors whose key was claimed
         """
-        cls.objects.unread().for_startup(user.startup_profile).update(is_read=True)
+        investor_ids = sorted(set(investor_ids))
+        if not investor_ids:
+            return set()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO "{cls._meta.db_table}" (notification_category_id, investor_id, startup_id)
+                SELECT %s, investor_id, %s FROM unnest(%s::bigint[]) AS investor_id
+                ON CONFLICT DO NOTHING
+                RETURNING investor_id
+                """,
+                [notification_category.id, startup.id, investor_ids],
+            )
+            return {row[0] for row in cursor.fetchall()}
 
 
-class InvestorNotification(models.Model):
+class InvestorNotification(ReadableNotificationMixin, models.Model):
     """
     Represents a notification sent to an investor about a startup's activity.
 
@@ -215,6 +381,8 @@ class InvestorNotification(models.Model):
         is_read (bool): Indicates whether the notification has been read.
         created_at (datetime): The date and time the notification was created.
         updated_at: The date and time the notification was updated.
+        occurrences (int): Number of events coalesced into this notification.
+        last_occurred_at (datetime): The date and time of the latest coalesced event.
 
     Related models:
         NotificationCategory: The category of notification.
@@ -228,24 +396,166 @@ class InvestorNotification(models.Model):
     is_read = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
+    occurrences = models.PositiveIntegerField(default=1)
+    last_occurred_at = models.DateTimeField(default=timezone.now)
 
     # Use the custom QuerySet as the default manager
     objects = NotificationQuerySet.as_manager()
 
+    # Profile whose unread counter this notification belongs to
+    RECIPIENT_FIELD = 'investor_id'
+
     class Meta:
         verbose_name = "Investor Notification"
         verbose_name_plural = "Investor Notifications"
         ordering = ['id']
-
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save()
+        indexes = [
+            # Finds the unread notification a new event is coalesced into
+            models.Index(
+                fields=['startup', 'notification_category', 'created_at'],
+                condition=models.Q(is_read=False),
+                name='investor_notification_digest',
+            ),
+        ]
 
     @classmethod
     def mark_all_as_read(cls, user):
         """
         Mark all unread notifications for a specific user as read.
         """
-        cls.objects.unread().for_investor(user.investor_profile).update(is_read=True)
-        
\ No newline at end of file
+        profile = user.investor_profile
+        updated = cls.objects.unread().for_investor(profile).update(is_read=True)
+        counters.reset_unread(cls, [profile.id])
+        return updated
+
+
+class NotificationOutboxQuerySet(models.QuerySet):
+    def pending(self):
+        """
+        Filter events that still have to be fanned out.
+        """
+        return self.filter(attempts__lt=NotificationOutbox.MAX_ATTEMPTS)
+
+    def due(self, now=None):
+        """
+        Filter pending events whose retry delay has passed.
+        """
+        return self.pending().filter(next_attempt_at__lte=now or timezone.now())
+
+    def dead(self):
+        """
+        Filter events that ran out of retries and are only kept for inspection.
+        """
+        return self.filter(attempts__gte=NotificationOutbox.MAX_ATTEMPTS)
+
+
+class NotificationOutbox(models.Model):
+    """
+    Represents a notification event waiting to be fanned out by a worker.
+
+    Rows are written by the signal handlers on the same connection as the
+    change that caused them, so an event only becomes visible to workers once
+    that transaction commits. Workers delete the row in the same transaction
+    that creates the notifications. Failed events are retried with
+    exponential backoff; events that fail MAX_ATTEMPTS times stay in the
+    table as dead letters until purge_dead_events removes them.
+
+    Attributes:
+        event (str): The kind of change that happened.
+        startup (StartupProfile): The startup whose followers must be notified.
+        attempts (int): How many times processing this event has failed.
+        next_attempt_at (datetime): The earliest time the event may be processed or retried.
+        last_error (str): The error raised by the last failed attempt.
+        created_at (datetime): The date and time the event was recorded.
+    """
+    MAX_ATTEMPTS = 5
+
+    class Event(models.TextChoices):
+        PROFILE_UPDATE = 'profile_update', 'Profile update'
+        NEW_PROJECT = 'new_project', 'New project'
+        PROJECT_UPDATE = 'project_update', 'Project update'
+
+    event = models.CharField(max_length=50, choices=Event.choices)
+    startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='notification_events')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationOutboxQuerySet.as_manager()
+
+    class Meta:
+        db_table = "notification_outbox"
+        verbose_name = "Notification Outbox Event"
+        verbose_name_plural = "Notification Outbox Events"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='notification_outbox_due'),
+        ]
+
+    def __str__(self):
+        return f"NotificationOutbox(id={self.pk}, event={self.event}, startup={self.startup_id})"
+
+
+class NotificationEmailQuerySet(models.QuerySet):
+    def due(self, now=None):
+        """
+        Filter emails that can be sent now and have retries left.
+        """
+        return self.filter(
+            attempts__lt=NotificationEmail.MAX_ATTEMPTS,
+            next_attempt_at__lte=now or timezone.now(),
+        )
+
+    def dead(self):
+        """
+        Filter emails that ran out of retries and are only kept for inspection.
+        """
+        return self.filter(attempts__gte=NotificationEmail.MAX_ATTEMPTS)
+
+
+class NotificationEmail(models.Model):
+    """
+    Represents a created notification waiting to be delivered by email.
+
+    Rows are queued for recipients who allow the 'email' method for the
+    notification's category, and are deleted once the email is sent. The
+    notification is referenced by kind and id only, as the partitioned
+    notification tables cannot be the target of a foreign key.
+
+    Attributes:
+        user (User): The recipient of the email.
+        kind (str): Whether the notification is a startup or an investor notification.
+        notification_id (int): The id of the notification to deliver.
+        attempts (int): How many times sending this email has failed.
+        next_attempt_at (datetime): The earliest time the email may be sent or retried.
+        last_error (str): The error raised by the last failed attempt.
+        created_at (datetime): The date and time the email was queued.
+    """
+    MAX_ATTEMPTS = 5
+
+    class Kind(models.TextChoices):
+        STARTUP = 'startup', 'Startup notification'
+        INVESTOR = 'investor', 'Investor notification'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_emails')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    notification_id = models.BigIntegerField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationEmailQuerySet.as_manager()
+
+    class Meta:
+        db_table = "notification_emails"
+        verbose_name = "Notification Email"
+        verbose_name_plural = "Notification Emails"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='notification_email_due'),
+        ]
+
+    def __str__(self):
+        return f"NotificationEmail(id={self.pk}, kind={self.kind}, notification={self.notification_id})"
@@ -0,0 +1,164 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import fanout
+from .models import NotificationCategory, NotificationOutbox
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+# Delay before the first retry of a failed event, doubled on every further attempt
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# event -> (category name, name of the method followers must allow or None)
+EVENT_PREFERENCES = {
+    NotificationOutbox.Event.PROFILE_UPDATE: ('profile_update', 'in_app'),
+    NotificationOutbox.Event.NEW_PROJECT: ('new_project', 'in_app'),
+    NotificationOutbox.Event.PROJECT_UPDATE: ('Project Update', None),
+}
+
+# Events coalesced into recent unread notifications, see settings.NOTIFICATION_DIGEST_WINDOW
+DIGEST_EVENTS = {
+    NotificationOutbox.Event.PROFILE_UPDATE,
+    NotificationOutbox.Event.PROJECT_UPDATE,
+}
+
+
+def enqueue(event, startup):
+    """
+    Record a notification event to be fanned out by the outbox worker.
+
+    The row is written on the current connection, so it commits or rolls
+    back together with the change that triggered it.
+
+    Args:
+        event: NotificationOutbox.Event value
+        startup: StartupProfile whose followers must be notified
+
+    Returns:
+        NotificationOutbox: the recorded event
+    """
+    return NotificationOutbox.objects.create(event=event, startup=startup)
+
+
+def dispatch(entry):
+    """
+    Fan out a single outbox event.
+
+    Args:
+        entry: NotificationOutbox instance
+
+    Returns:
+        int: number of followers notified
+    """
+    category_name, method_name = EVENT_PREFERENCES[entry.event]
+    try:
+        notification_category = registry.category(category_name)
+    except NotificationCategory.DoesNotExist:
+        logger.warning(f"Notification category '{category_name}' does not exist. Skipping notification.")
+        return 0
+
+    notification_method = registry.method(method_name) if method_name else None
+    digest_window = settings.NOTIFICATION_DIGEST_WINDOW if entry.event in DIGEST_EVENTS else 0
+    return fanout.notify_followers(entry.startup, notification_category, notification_method, digest_window)
+
+
+def retry_delay(attempts):
+    """
+    Return how long to wait before retrying an event that failed `attempts` times.
+    """
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def process_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Lock and fan out a batch of pending events.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers can drain the outbox concurrently without processing an event
+    twice. Successful events are deleted in the same transaction as the
+    notifications they produce; failed events are kept with their error
+    and retried with exponential backoff until NotificationOutbox.MAX_ATTEMPTS
+    is reached.
+
+    Args:
+        batch_size: maximum number of events to claim
+
+    Returns:
+        int: number of events claimed
+    """
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects.due()
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('startup')
+            .order_by('id')[:batch_size]
+        )
+        done, failed = [], []
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    dispatch(entry)
+            except Exception as e:
+                logger.error(f"Failed to process notification event {entry.id}: {e}", exc_info=True)
+                entry.attempts += 1
+                entry.last_error = str(e)
+                entry.next_attempt_at = timezone.now() + retry_delay(entry.attempts)
+                failed.append(entry)
+                if entry.attempts >= NotificationOutbox.MAX_ATTEMPTS:
+                    logger.error(f"Notification event {entry.id} failed {entry.attempts} times "
+                                 f"and will not be retried.")
+            else:
+                done.append(entry.id)
+
+        if done:
+            NotificationOutbox.objects.filter(id__in=done).delete()
+        if failed:
+            NotificationOutbox.objects.bulk_update(failed, ['attempts', 'last_error', 'next_attempt_at'])
+    return len(entries)
+
+
+def process_outbox(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Process batches until no due events are left.
+
+    Returns:
+        int: number of events claimed
+    """
+    total = 0
+    while True:
+        processed = process_batch(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def purge_dead_events(retention_days=None):
+    """
+    Delete events that ran out of retries more than `retention_days` ago.
+
+    Dead events are kept for a while so their errors can be inspected (or
+    their attempts reset to retry them); this removes them afterwards so
+    they do not pile up in the outbox.
+
+    Args:
+        retention_days: days a dead event is kept, defaults to
+            settings.NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS
+
+    Returns:
+        int: number of events deleted
+    """
+    if retention_days is None:
+        retention_days = settings.NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = NotificationOutbox.objects.dead().filter(created_at__lt=cutoff).delete()
+    if deleted:
+        logger.warning(f"Purged {deleted} dead notification events older than {retention_days} days.")
+    return deleted
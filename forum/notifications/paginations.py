@@ -1,6 +1,59 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
 
 class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5  
-    page_size_query_param = 'page_size'  
-    max_page_size = 30  
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 30
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on (created_at, id), newest first.
+
+    Each page continues after the last row of the previous one, so it is a
+    range scan on the created_at index instead of COUNT(*) plus OFFSET, and
+    its cost does not depend on how deep into the history the client is.
+
+    Example Usage:
+    - GET /notifications/investor/
+    - GET /notifications/investor/?cursor=<next cursor from the previous page>
+    """
+    page_size = StandardResultsSetPagination.page_size
+    page_size_query_param = 'page_size'
+    max_page_size = StandardResultsSetPagination.max_page_size
+    ordering = ('-created_at', '-id')
+
+
+class NotificationPagination(KeysetPagination):
+    """
+    Keyset pagination by default; `?pagination=page` switches to the
+    page-number mode of StandardResultsSetPagination.
+    """
+    mode_query_param = 'pagination'
+    page_mode = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_paginator = None
+        if request.query_params.get(self.mode_query_param) == self.page_mode:
+            self.page_paginator = StandardResultsSetPagination()
+            return self.page_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_paginator is not None:
+            return self.page_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f"Set to '{self.page_mode}' for page-number pagination.",
+                'schema': {'type': 'string'},
+            },
+            *super().get_schema_operation_parameters(view),
+            *StandardResultsSetPagination().get_schema_operation_parameters(view)[:1],
+        ]
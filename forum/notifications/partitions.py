@@ -0,0 +1,163 @@
+import logging
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import InvestorNotification, StartUpNotification
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_MODELS = (StartUpNotification, InvestorNotification)
+
+# Number of monthly partitions kept ready after the current month
+DEFAULT_MONTHS_AHEAD = 3
+
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value):
+    """
+    Return the first moment of the month containing the given datetime.
+    """
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    """
+    Shift the first moment of a month by a number of months.
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def archive_table_name(table):
+    return f"{table}_archive"
+
+
+def list_partitions(table):
+    """
+    Return {month start: partition name} for the monthly partitions of a table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+            partitions[month] = name
+    return partitions
+
+
+def create_partition(table, month):
+    """
+    Create the partition of a table for one month.
+
+    Rows of that month that already landed in the default partition are
+    moved into the new partition before it is attached. Unique indexes of
+    the parent are created on attach; the partition's own unique index on
+    id is added here, as PostgreSQL cannot enforce one across partitions.
+
+    Returns:
+        str: name of the created partition
+    """
+    name = partition_name(table, month)
+    upper = add_months(month, 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM "{table}_default" WHERE created_at >= %s AND created_at < %s RETURNING *
+            )
+            INSERT INTO "{name}" SELECT * FROM moved
+            """,
+            [month, upper],
+        )
+        cursor.execute(f'CREATE UNIQUE INDEX "{name}_id_key" ON "{name}" (id)')
+        cursor.execute(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+    logger.info(f"Created partition {name}.")
+    return name
+
+
+def ensure_partitions(months_ahead=DEFAULT_MONTHS_AHEAD, now=None):
+    """
+    Create the missing partitions from the current month to `months_ahead`
+    months after it, for every partitioned notification table.
+
+    Returns:
+        list[str]: names of the created partitions
+    """
+    current = month_start(now or timezone.now())
+    created = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        existing = list_partitions(table)
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                created.append(create_partition(table, month))
+    return created
+
+
+def archive_read_notifications(retention_months, now=None, dry_run=False):
+    """
+    Apply the retention policy to partitions older than `retention_months`.
+
+    Read notifications of those partitions are moved to `<table>_archive`;
+    unread ones stay where they are. Partitions left empty are detached
+    and dropped.
+
+    Returns:
+        dict: {partition name: number of archived notifications}
+    """
+    cutoff = add_months(month_start(now or timezone.now()), -retention_months)
+    archived = {}
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        archive = archive_table_name(table)
+        for month, name in sorted(list_partitions(table).items()):
+            if add_months(month, 1) > cutoff:
+                continue
+            with transaction.atomic(), connection.cursor() as cursor:
+                if dry_run:
+                    cursor.execute(f'SELECT COUNT(*) FROM "{name}" WHERE is_read')
+                    archived[name] = cursor.fetchone()[0]
+                    continue
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS "{archive}" (LIKE "{table}")')
+                cursor.execute(
+                    f"""
+                    WITH moved AS (DELETE FROM "{name}" WHERE is_read RETURNING *)
+                    INSERT INTO "{archive}" SELECT * FROM moved
+                    """
+                )
+                archived[name] = cursor.rowcount
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{name}")')
+                if not cursor.fetchone()[0]:
+                    # Deferred foreign key checks must run before the partition can be dropped
+                    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                    cursor.execute(f'DROP TABLE "{name}"')
+                    logger.info(f"Dropped empty partition {name}.")
+            logger.info(f"Archived {archived[name]} read notifications from {name}.")
+    return archived
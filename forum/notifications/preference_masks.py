@@ -0,0 +1,114 @@
+import logging
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from .models import NotificationPreference, NotificationPreferenceMask
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+CategoriesThrough = NotificationPreference.allowed_notification_categories.through
+MethodsThrough = NotificationPreference.allowed_notification_methods.through
+
+_mask_table_ready = False
+
+
+def mask_table_exists():
+    """
+    Check whether the mask table has been created yet.
+
+    Data migrations that seed preferences run before the mask table exists,
+    so the signal handlers have nothing to maintain at that point. A positive
+    answer is cached; a negative one is re-checked on the next call.
+
+    Returns:
+        bool: True if the mask table exists
+    """
+    global _mask_table_ready
+    if not _mask_table_ready:
+        _mask_table_ready = (
+            NotificationPreferenceMask._meta.db_table in connection.introspection.table_names()
+        )
+    return _mask_table_ready
+
+
+def expected_masks(user_ids):
+    """
+    Compute the mask rows the given users should have from their preferences.
+
+    Args:
+        user_ids: iterable of user ids
+
+    Returns:
+        dict: {(user_id, category_id): methods_mask}
+    """
+    user_ids = list(user_ids)
+    methods = defaultdict(int)
+    method_rows = MethodsThrough.objects.filter(
+        notificationpreference__user_id__in=user_ids
+    ).values_list("notificationpreference__user_id", "notificationmethod__name")
+    for user_id, method_name in method_rows:
+        methods[user_id] |= NotificationPreferenceMask.METHOD_BITS.get(method_name, 0)
+
+    category_rows = CategoriesThrough.objects.filter(
+        notificationpreference__user_id__in=user_ids
+    ).values_list("notificationpreference__user_id", "notificationcategory_id")
+    return {(user_id, category_id): methods[user_id] for user_id, category_id in category_rows}
+
+
+def stored_masks(user_ids):
+    """
+    Return the mask rows currently stored for the given users.
+
+    Returns:
+        dict: {(user_id, category_id): methods_mask}
+    """
+    rows = NotificationPreferenceMask.objects.filter(user_id__in=list(user_ids)).values_list(
+        "user_id", "category_id", "methods_mask"
+    )
+    return {(user_id, category_id): mask for user_id, category_id, mask in rows}
+
+
+def rebuild_preference_masks(user_ids):
+    """
+    Replace the mask rows of the given users with ones computed from their preferences.
+
+    Args:
+        user_ids: iterable of user ids
+
+    Returns:
+        int: number of mask rows written
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    masks = expected_masks(user_ids)
+    with transaction.atomic():
+        NotificationPreferenceMask.objects.filter(user_id__in=user_ids).delete()
+        NotificationPreferenceMask.objects.bulk_create(
+            NotificationPreferenceMask(user_id=user_id, category_id=category_id, methods_mask=mask)
+            for (user_id, category_id), mask in masks.items()
+        )
+    return len(masks)
+
+
+def iter_user_batches(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield lists of ids of users who have a preference or stored mask rows.
+    """
+    user_ids = set(NotificationPreference.objects.values_list("user_id", flat=True))
+    user_ids.update(NotificationPreferenceMask.objects.values_list("user_id", flat=True).distinct())
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), batch_size):
+        yield user_ids[start:start + batch_size]
+
+
+def find_inconsistent_users(user_ids):
+    """
+    Return the ids of users whose stored masks differ from their preferences.
+    """
+    expected = expected_masks(user_ids)
+    stored = stored_masks(user_ids)
+    return sorted({user_id for (user_id, _), _ in expected.items() ^ stored.items()})
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .models import NotificationCategory
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+GROUP_NAME = "notifications_{model}_{profile_id}"
+
+
+def group_name(model, profile_id):
+    """
+    Return the channel layer group of a profile's notifications of a given model.
+    """
+    return GROUP_NAME.format(model=model._meta.model_name, profile_id=profile_id)
+
+
+def serialize(notification):
+    """
+    Build the message pushed to the client for a notification.
+
+    Only ids and cached category data are used, so serializing does not
+    query the database.
+    """
+    try:
+        category = registry.category_by_id(notification.notification_category_id)
+        category_name, description = category.name, category.description
+    except NotificationCategory.DoesNotExist:
+        category_name = description = None
+    return {
+        "id": notification.id,
+        "kind": notification._meta.model_name,
+        "notification_category": category_name,
+        "description": description,
+        "investor": notification.investor_id,
+        "startup": notification.startup_id,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        "occurrences": getattr(notification, "occurrences", 1),
+    }
+
+
+async def _send(messages):
+    """
+    Send the messages with one group_send per recipient group, all at once.
+    A failing group is logged and does not stop the others.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    by_group = defaultdict(list)
+    for group, message in messages:
+        by_group[group].append(message)
+    results = await asyncio.gather(
+        *(
+            channel_layer.group_send(group, {"type": "notification.batch", "notifications": batch})
+            for group, batch in by_group.items()
+        ),
+        return_exceptions=True,
+    )
+    for group, result in zip(by_group, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to push notifications to group {group}: {result}")
+
+
+def publish(notifications):
+    """
+    Push notifications to their recipients' groups once the current
+    transaction commits, so clients never see rows that are rolled back.
+
+    The notifications of each recipient travel in one channel layer message
+    and all recipients are sent to concurrently, so a fan-out costs a single
+    round of channel layer calls instead of one blocking call per row.
+
+    Args:
+        notifications: iterable of saved StartUpNotification or InvestorNotification instances
+    """
+    messages = [
+        (group_name(type(notification), getattr(notification, notification.RECIPIENT_FIELD)), serialize(notification))
+        for notification in notifications
+    ]
+    if messages:
+        transaction.on_commit(lambda: async_to_sync(_send)(messages), robust=True)
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+from users.models import Role
+from .models import NotificationCategory, NotificationMethod
+
+logger = logging.getLogger(__name__)
+
+ROLE_CATEGORIES = {
+    Role.STARTUP: ["follow"],
+    Role.INVESTOR: ["profile_update", "new_project", "Project Update"],
+}
+
+REGISTRY_VERSION_KEY = "notifications:registry:version"
+
+# How long a process trusts its copy before comparing it with the shared version
+VERSION_CHECK_INTERVAL = 5
+
+
+class NotificationRegistry:
+    """
+    Process-wide in-memory index of notification categories and methods.
+
+    Categories and methods are loaded with one query each and indexed by id
+    and by name, so hot paths resolve them with dict lookups. Every process
+    keeps its own copy and reloads it when the version stored in the shared
+    cache changes; `invalidate` bumps that version whenever a category or
+    method is saved or deleted.
+
+    Example Usage:
+    - registry.category("follow")
+    - registry.categories_for_role(Role.INVESTOR)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._categories_by_id = {}
+        self._categories_by_name = {}
+        self._methods_by_id = {}
+        self._methods_by_name = {}
+        self._role_categories = {}
+
+    def _shared_version(self):
+        return cache.get_or_set(REGISTRY_VERSION_KEY, 1, timeout=None)
+
+    def _load(self, version):
+        categories = list(NotificationCategory.objects.all())
+        methods = list(NotificationMethod.objects.all())
+        self._categories_by_id = {category.id: category for category in categories}
+        self._categories_by_name = {category.name: category for category in categories}
+        self._methods_by_id = {method.id: method for method in methods}
+        self._methods_by_name = {method.name: method for method in methods}
+        self._role_categories = {
+            role: [category for category in categories if category.name in names]
+            for role, names in ROLE_CATEGORIES.items()
+        }
+        self._version = version
+        logger.info(f"Notification registry loaded (version {version}).")
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        with self._lock:
+            version = self._shared_version()
+            if version != self._version:
+                self._load(version)
+            self._checked_at = now
+
+    def invalidate(self):
+        """
+        Drop this process' copy and tell other processes to reload theirs.
+        """
+        with self._lock:
+            try:
+                cache.incr(REGISTRY_VERSION_KEY)
+            except ValueError:
+                cache.set(REGISTRY_VERSION_KEY, 2, timeout=None)
+            self._version = None
+
+    def category(self, name):
+        """
+        Return the category with the given name.
+
+        Raises:
+            NotificationCategory.DoesNotExist: if there is no such category
+        """
+        self._ensure_loaded()
+        try:
+            return self._categories_by_name[name]
+        except KeyError:
+            raise NotificationCategory.DoesNotExist(f"Notification category '{name}' does not exist.")
+
+    def category_by_id(self, category_id):
+        """
+        Return the category with the given id.
+
+        Raises:
+            NotificationCategory.DoesNotExist: if there is no such category
+        """
+        self._ensure_loaded()
+        try:
+            return self._categories_by_id[int(category_id)]
+        except (KeyError, TypeError, ValueError):
+            raise NotificationCategory.DoesNotExist(f"Notification category {category_id} does not exist.")
+
+    def method(self, name):
+        """
+        Return the method with the given name.
+
+        Raises:
+            NotificationMethod.DoesNotExist: if there is no such method
+        """
+        self._ensure_loaded()
+        try:
+            return self._methods_by_name[name]
+        except KeyError:
+            raise NotificationMethod.DoesNotExist(f"Notification method '{name}' does not exist.")
+
+    def method_by_id(self, method_id):
+        """
+        Return the method with the given id.
+
+        Raises:
+            NotificationMethod.DoesNotExist: if there is no such method
+        """
+        self._ensure_loaded()
+        try:
+            return self._methods_by_id[int(method_id)]
+        except (KeyError, TypeError, ValueError):
+            raise NotificationMethod.DoesNotExist(f"Notification method {method_id} does not exist.")
+
+    def categories(self, names):
+        """
+        Return the existing categories among the given names.
+        """
+        self._ensure_loaded()
+        return [self._categories_by_name[name] for name in names if name in self._categories_by_name]
+
+    def methods(self, names):
+        """
+        Return the existing methods among the given names.
+        """
+        self._ensure_loaded()
+        return [self._methods_by_name[name] for name in names if name in self._methods_by_name]
+
+    def categories_for_role(self, role):
+        """
+        Return the categories a role can manage, ordered by name.
+        """
+        self._ensure_loaded()
+        return list(self._role_categories.get(role, []))
+
+
+registry = NotificationRegistry()
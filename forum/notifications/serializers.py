@@ -1,6 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from .models import NotificationMethod, NotificationCategory, NotificationPreference
-from .models import StartUpNotification, InvestorProfile, StartupProfile, InvestorNotification
+from .models import StartUpNotification, StartUpNotificationKey, InvestorProfile, StartupProfile, InvestorNotification
 
 
 class NotificationMethodSerializer(serializers.ModelSerializer):
@@ -43,6 +45,29 @@ class NotificationPreferenceSerializer(serializers.ModelSerializer):
         return NotificationCategorySerializer(notification_categories, many=True).data
 
 
+class NotificationBulkActionSerializer(serializers.Serializer):
+    """
+    Serializer for selecting the notifications a bulk action applies to.
+
+    Attributes:
+        ids (list[int]): Notification ids.
+        before (datetime): Only notifications created before this moment.
+        notification_category (int): Only notifications of this category.
+    """
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=MAX_IDS
+    )
+    before = serializers.DateTimeField(required=False)
+    notification_category = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide ids, before or notification_category.")
+        return attrs
+
+
 class NotificationPreferenceUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating the NotificationCategory model."""
 
@@ -103,9 +128,22 @@ class StartUpNotificationCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = StartUpNotification
         fields = ['notification_category', 'investor', 'startup', 'is_read']
+        # Reports duplicates as field errors; create() enforces them through StartUpNotificationKey
+        validators = [
+            UniqueTogetherValidator(
+                queryset=StartUpNotification.objects.all(),
+                fields=['notification_category', 'investor', 'startup'],
+            )
+        ]
 
     def create(self, validated_data):
-        return StartUpNotification.objects.create(**validated_data)
+        with transaction.atomic():
+            claimed = StartUpNotificationKey.claim(
+                validated_data['notification_category'], validated_data['startup'], [validated_data['investor'].id]
+            )
+            if not claimed:
+                raise serializers.ValidationError("This notification already exists.", code='unique')
+            return StartUpNotification.objects.create(**validated_data)
     
     def validate(self, data):
         if StartUpNotification.objects.filter(
@@ -123,7 +161,8 @@ class InvestorNotificationReadSerializer(serializers.ModelSerializer):
 
     Serializer is used to represent InvestorNotification objects in a read-only format.
     It includes fields `notification_category`, `investor`, `startup`, `is_read`,
-    `created_at`, and a `notification_url` for detailed view access.
+    `created_at`, `occurrences`, `last_occurred_at` and a `notification_url`
+    for detailed view access.
     """
     notification_category = serializers.StringRelatedField(source='notification_category.description', read_only=True)
     investor = serializers.StringRelatedField(read_only=True)
@@ -135,8 +174,14 @@ class InvestorNotificationReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = InvestorNotification
-        fields = ['notification_category', 'investor', 'startup', 'is_read', 'created_at', 'notification_url']
-        read_only_fields = ['notification_category', 'investor', 'startup', 'created_at', 'notification_url']
+        fields = [
+            'notification_category', 'investor', 'startup', 'is_read', 'created_at',
+            'occurrences', 'last_occurred_at', 'notification_url',
+        ]
+        read_only_fields = [
+            'notification_category', 'investor', 'startup', 'created_at',
+            'occurrences', 'last_occurred_at', 'notification_url',
+        ]
 
 
 class InvestorNotificationCreateSerializer(serializers.ModelSerializer):
@@ -1,62 +1,86 @@
-from django.db.models.signals import m2m_changed, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import NotificationCategory, NotificationPreference, NotificationMethod, InvestorNotification
-from profiles.models import InvestorProfile, StartupProfile
-from .serializers import (
-    StartUpNotificationCreateSerializer,
-    InvestorNotificationCreateSerializer
+from .models import (
+    NotificationCategory,
+    NotificationPreference,
+    NotificationPreferenceMask,
+    NotificationMethod,
+    NotificationOutbox,
+    StartUpNotification,
+    InvestorNotification,
 )
+from profiles.models import InvestorProfile, StartupProfile
 from projects.models import Project
+from . import counters, emails, fanout, outbox, push
+from .preference_masks import mask_table_exists, rebuild_preference_masks
+from .registry import registry
 import logging
-from django.db.models.signals import post_migrate
 
 
 logger = logging.getLogger(__name__)
 
-class NotificationPropertyManager:
-    _objects = None
+# Notification field that cascades from each model whose deletion removes notifications
+CASCADE_FIELDS = {
+    StartupProfile: 'startup',
+    InvestorProfile: 'investor',
+    NotificationCategory: 'notification_category',
+}
 
-    def __getitem__(self, key: str) -> object:
-        
-        if self._objects[key] is None:
-            self._initialize()
-        
-        return self._objects[key]
-    
-    @classmethod
-    def _initialize(cls) -> None:
-        ...
-
-
-class NotificationCategoriesManager(NotificationPropertyManager):
-    _objects = {
-        'follow': None,
-        'profile_update': None,
-        'new_project': None
-    }
-    @classmethod
-    def _initialize(cls):
-        for name in cls._objects:
-            cls._objects[name] = NotificationCategory.objects.get(name=name)
+@receiver([post_save, post_delete], sender=NotificationCategory)
+@receiver([post_save, post_delete], sender=NotificationMethod)
+def invalidate_notification_registry(sender, **kwargs):
+    """
+    Signal handler that makes every process reload the notification registry
+    after a category or method change is committed. Bumping the version any
+    earlier would let other processes reload before the change is visible
+    to them and then trust that stale copy.
+    """
+    transaction.on_commit(registry.invalidate)
 
 
-class NotificationMethodsManager(NotificationPropertyManager):
-    _objects = {
-        'in_app': None,
-        'email': None
-    }
-    @classmethod
-    def _initialize(cls):
-        for name in cls._objects:
-            cls._objects[name] = NotificationMethod.objects.get(name=name)
+@receiver(m2m_changed, sender=NotificationPreference.allowed_notification_categories.through)
+@receiver(m2m_changed, sender=NotificationPreference.allowed_notification_methods.through)
+def sync_preference_masks(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal handler that rebuilds the preference masks of the affected users
+    whenever allowed categories or methods change.
 
-NOTIFICATION_CATEGORIES = NotificationCategoriesManager()
+    Triggered by:
+    - NotificationPreferenceUpdateSerializer and create_default_notification_preferences
+    - Any other change of the preference many-to-many relationships
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if kwargs.get('raw') or not mask_table_exists():
+        return
+    if not reverse:
+        rebuild_preference_masks([instance.user_id])
+    elif action == 'post_clear':
+        # pk_set is not provided on clear, so rebuild every user who has masks
+        # for the cleared category; a cleared method affects all users.
+        rebuild_preference_masks(
+            NotificationPreference.objects.values_list('user_id', flat=True)
+            if isinstance(instance, NotificationMethod)
+            else NotificationPreferenceMask.objects.filter(category=instance).values_list('user_id', flat=True)
+        )
+    elif pk_set:
+        rebuild_preference_masks(
+            NotificationPreference.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=NotificationPreference)
+def delete_preference_masks(sender, instance, **kwargs):
+    """
+    Signal handler that drops the masks of a deleted preference.
+    """
+    NotificationPreferenceMask.objects.filter(user_id=instance.user_id).delete()
 
-NOTIFICATION_METHODS = NotificationMethodsManager()
 
 def have_preference(notification_receiver, notification_category):
     """
-    Check if a user has enabled notifications for a specific category.
+    Check if a user has enabled in-app notifications for a specific category.
     
     Args:
         notification_receiver: Profile instance (InvestorProfile or StartupProfile)
@@ -65,45 +89,59 @@ def have_preference(notification_receiver, notification_category):
     Returns:
         bool: True if user has enabled this notification type, False otherwise
     """
-    try:
-        profile_preference = NotificationPreference.objects.get(user=notification_receiver.user)
-        
-        if NOTIFICATION_METHODS['in_app'] not in profile_preference.allowed_notification_methods.all():
-            logger.info(f"Profile {notification_receiver.id} does not have a preference for "
-                       f"the '{NOTIFICATION_METHODS['in_app'].name}' method. Skipping notification creation.")
-            return False
-        
-        if notification_category not in profile_preference.allowed_notification_categories.all():
-            logger.info(f"Profile {notification_receiver.id} does not have a preference for "
-                       f"the '{notification_category.name}' category. Skipping notification creation.")
-            return False
-        return True
-    except NotificationPreference.DoesNotExist:
-        logger.info(f"No notification preferences found for user {notification_receiver.user.id}. "
-                   f"Skipping notification creation.")
-        return False
-
+    in_app_method = registry.method('in_app')
+    allowed = NotificationPreferenceMask.objects.filter(
+        user_id=notification_receiver.user_id,
+        category=notification_category,
+        methods_mask__hasbits=NotificationPreferenceMask.method_bit(in_app_method),
+    ).exists()
+    if not allowed:
+        logger.info(f"Profile {notification_receiver.id} does not allow '{in_app_method.name}' notifications "
+                    f"of the '{notification_category.name}' category. Skipping notification creation.")
+    return allowed
+
+
+@receiver(post_save, sender=StartUpNotification)
+@receiver(post_save, sender=InvestorNotification)
+def count_and_push_created_notification(sender, instance, created, **kwargs):
+    """
+    Signal handler that counts, pushes and queues the email of a notification
+    created one at a time. Bulk inserts do this in the fan-out engine instead.
 
-def create_notification(notification_receiver, notification_category, data, serializer_class):
+    There is deliberately no post_delete counterpart: it would stop Django
+    from deleting notifications with a single DELETE, so bulk deletes reset
+    the counter instead and cascades are handled by
+    reset_counters_of_cascaded_notifications.
     """
-    Create a notification after validating user preferences and data.
-    
-    Args:
-        notification_receiver: Profile instance receiving the notification
-        notification_category: NotificationCategory instance
-        data: Dictionary containing notification data
-        serializer_class: Serializer class to use for validation and creation
+    if not created:
+        return
+    if not instance.is_read:
+        counters.increment_unread(sender, [getattr(instance, sender.RECIPIENT_FIELD)])
+    push.publish([instance])
+    emails.enqueue_emails([instance])
+
+
+@receiver(pre_delete, sender=StartupProfile)
+@receiver(pre_delete, sender=InvestorProfile)
+@receiver(pre_delete, sender=NotificationCategory)
+def reset_counters_of_cascaded_notifications(sender, instance, **kwargs):
     """
+    Signal handler that resets the unread counters of every profile that is
+    about to lose unread notifications to a cascade delete, e.g. investors
+    notified by a startup that deletes its profile.
 
-    if not have_preference(notification_receiver, notification_category):
-        return False
-    
-    serializer = serializer_class(data=data)
-    if serializer.is_valid():
-        serializer.save()
-        logger.info(f"Notification created for {notification_receiver.__class__.__name__} {notification_receiver.id}.")
-    else:
-        logger.error(f"Failed to create notification: {serializer.errors}")
+    The counters are dropped once the delete commits and rebuilt on the next
+    read; this costs one query per notification model.
+    """
+    field = CASCADE_FIELDS[sender]
+    for model in (StartUpNotification, InvestorNotification):
+        recipients = (
+            model.objects.unread()
+            .filter(**{field: instance})
+            .values_list(model.RECIPIENT_FIELD, flat=True)
+            .distinct()
+        )
+        counters.reset_unread(model, list(recipients))
 
 
 @receiver(m2m_changed, sender=StartupProfile.followers.through)
@@ -116,16 +154,13 @@ def create_startup_notification(sender, instance, action, reverse, model, pk_set
     - Changes to the StartupProfile.followers many-to-many relationship
     """
     try:
-        if action == 'post_add' and reverse:
-            for pk in pk_set:
-                investor = InvestorProfile.objects.get(pk=pk)
-                notification_category = NOTIFICATION_CATEGORIES['follow']
-                data = {
-                    'notification_category': notification_category.id,
-                    'investor': investor.id,
-                    'startup': instance.id,
-                }
-                create_notification(instance, notification_category, data, StartUpNotificationCreateSerializer)
+        if action == 'post_add' and reverse and pk_set:
+            fanout.notify_startup(
+                instance,
+                registry.category('follow'),
+                pk_set,
+                registry.method('in_app'),
+            )
     except Exception as e:
         logger.error(f"Unexpected error occurs during StartUp notification creation: {e}")
 
@@ -134,48 +169,34 @@ def create_startup_notification(sender, instance, action, reverse, model, pk_set
 def notify_startup_update(sender, instance, created, **kwargs):
     """
     Signal handler for startup profile updates.
-    Notifies all followers when a startup updates their profile.
+    Queues a notification for all followers when a startup updates their profile.
     
     Triggered by:
-    - Any save operation on StartupProfile
+    - Any update of an existing StartupProfile
     """
-    followers = instance.followers.all()
-    notification_category = NOTIFICATION_CATEGORIES['profile_update']
-    for investor in followers:
-        data = {
-            'notification_category': notification_category.id,
-            'investor': investor.id,
-            'startup': instance.id,
-        }
-        create_notification(investor, notification_category, data, InvestorNotificationCreateSerializer)
+    if created:
+        return
+    outbox.enqueue(NotificationOutbox.Event.PROFILE_UPDATE, instance)
 
 
 @receiver(post_save, sender=Project)
 def notify_investors_about_new_project(sender, instance, created, **kwargs):
     """
     Signal handler for new project creation.
-    Notifies all followers of the startup when they create a new project.
+    Queues a notification for all followers of the startup when they create a new project.
     
     Triggered by:
     - Creation of a new Project instance
     """
     if not created:
         return
-    followers = instance.startup.followers.all()
-    notification_category = NOTIFICATION_CATEGORIES['new_project']
-    for investor in followers:
-        data = {
-            'notification_category': notification_category.id,
-            'investor': investor.id,
-            'startup': instance.startup.id,
-        }
-        create_notification(investor, notification_category, data, InvestorNotificationCreateSerializer)
+    outbox.enqueue(NotificationOutbox.Event.NEW_PROJECT, instance.startup)
 
 #notify investors when a followed project is updated
 @receiver(post_save, sender=Project)
 def notify_investors_about_project_update(sender, instance, created, **kwargs):
     """
-    Notify investors when a project they are following is updated.
+    Queue a notification for investors when a project they are following is updated.
     """
     logger.info("Signal triggered for project update.")
     logger.info(f"Project ID: {instance.id}, Created: {created}")
@@ -185,48 +206,4 @@ def notify_investors_about_project_update(sender, instance, created, **kwargs):
         logger.info("Project is being created. Skipping notification.")
         return
 
-    try:
-        # Get the "Project Update" notification category
-        notification_category = NotificationCategory.objects.get(name='Project Update')
-        logger.info(f"Notification category: {notification_category.id}")
-
-        # Get all investors who are following the startup associated with the project
-        investors = instance.startup.followers.select_related('user').all()
-        logger.info(f"Investors found: {investors.count()}")
-
-        # Prepare a list of valid notifications
-        notifications_to_create = []
-
-        for investor in investors:
-            # Check if the investor has allowed notifications for this category
-            try:
-                preference = NotificationPreference.objects.get(
-                    user=investor.user,
-                    allowed_notification_categories=notification_category,
-                )
-                if not preference:
-                    logger.info(f"Investor {investor.id} does not allow notifications for this category.")
-                    continue
-            except NotificationPreference.DoesNotExist:
-                logger.info(f"Investor {investor.id} does not have a notification preference for this category.")
-                continue
-            logger.info(f"Creating notification for investor: {investor.id}")
-            notifications_to_create.append({
-                'notification_category': notification_category,
-                'investor': investor,
-                'startup': instance.startup,
-            })
-            
-        # Bulk create notifications to reduce database queries
-        if notifications_to_create:
-            created_notifications = InvestorNotification.objects.bulk_create([
-                InvestorNotification(**data) for data in notifications_to_create
-            ])
-            logger.info(f"Successfully created {len(created_notifications)} notifications.")
-        else:
-            logger.info("No notifications to create.")
-
-    except NotificationCategory.DoesNotExist:
-        logger.warning("Notification category 'Project Update' does not exist. Skipping notification.")
-    except Exception as e:
-        logger.error(f"An error occurred while processing project update notifications: {e}", exc_info=True)               
\ No newline at end of file
+    outbox.enqueue(NotificationOutbox.Event.PROJECT_UPDATE, instance.startup)
@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from profiles.models import InvestorProfile
+from ..benchmarks import run_benchmarks
+from ..factories import InvestorProfileFactory, create_profiles_batch
+from ..models import InvestorNotification
+
+SCENARIOS = {
+    "follow", "profile_update", "project_create", "project_update",
+    "startup_list", "investor_list", "detail", "mark_read", "bulk_mark_read",
+}
+
+
+class NotificationBenchmarkTests(TestCase):
+    def test_bulk_factory_creates_profiles_with_users(self):
+        investors = create_profiles_batch(InvestorProfileFactory, 5)
+
+        self.assertEqual(InvestorProfile.objects.filter(id__in=[i.id for i in investors]).count(), 5)
+        self.assertEqual(len({investor.user.email for investor in investors}), 5)
+
+    def test_report_covers_every_scenario_and_rolls_back(self):
+        report = run_benchmarks([2, 6])
+
+        self.assertEqual(report["follower_counts"], [2, 6])
+        self.assertEqual({r["scenario"] for r in report["results"]}, SCENARIOS)
+        self.assertEqual(len(report["results"]), 2 * len(SCENARIOS))
+        for result in report["results"]:
+            self.assertGreaterEqual(result["seconds"], 0)
+            self.assertGreater(result["queries"], 0)
+        self.assertFalse(InvestorNotification.objects.exists())
+
+        fan_out = {
+            r["followers"]: r for r in report["results"] if r["scenario"] == "profile_update"
+        }
+        self.assertEqual(fan_out[2]["queries"], fan_out[6]["queries"])
+        self.assertGreater(fan_out[6]["rows_written"], fan_out[2]["rows_written"])
+
+    def test_followers_are_spread_across_startups(self):
+        single = {r["scenario"]: r for r in run_benchmarks([4])["results"]}
+        spread = {r["scenario"]: r for r in run_benchmarks([4], startups=3)["results"]}
+
+        self.assertEqual(spread["profile_update"]["startups"], 3)
+        self.assertEqual(spread["profile_update"]["rows_written"], 3 * single["profile_update"]["rows_written"])
+        self.assertFalse(InvestorNotification.objects.exists())
+
+    def test_command_prints_json_report(self):
+        out = StringIO()
+        call_command("benchmark_notifications", "--followers", "3", "--startups", "2", stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual({r["followers"] for r in report["results"]}, {3})
+        self.assertEqual(report["startups"], 2)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..counters import get_unread_count, unread_count_key
+from ..factories import (
+    InvestorNotificationFactory,
+    InvestorProfileFactory,
+    NotificationCategoryFactory,
+    StartupProfileFactory,
+    StartUpNotificationFactory,
+)
+from ..models import InvestorNotification, StartUpNotification
+
+
+class NotificationBulkActionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.investor = InvestorProfileFactory()
+        cls.startup = StartupProfileFactory()
+        cls.category = NotificationCategoryFactory()
+        cls.notifications = InvestorNotificationFactory.create_batch(
+            4, investor=cls.investor, startup=cls.startup, notification_category=cls.category
+        )
+        cls.other = InvestorNotificationFactory(investor=cls.investor, startup=cls.startup)
+        cls.foreign = InvestorNotificationFactory(startup=cls.startup, notification_category=cls.category)
+        cls.url = reverse('notifications:investor_notifications_bulk')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.investor.user)
+
+    def test_mark_ids_as_read_in_one_update(self):
+        ids = [notification.id for notification in self.notifications[:2]] + [self.foreign.id]
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 5)
+
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'count': 2})
+        self.assertEqual([query['sql'].split()[0] for query in context.captured_queries].count('UPDATE'), 1)
+        self.assertFalse(InvestorNotification.objects.get(id=self.foreign.id).is_read)
+        self.assertEqual(cache.get(unread_count_key(InvestorNotification, self.investor.id)), 3)
+
+    def test_mark_category_as_read_skips_read_notifications(self):
+        InvestorNotification.objects.filter(id=self.notifications[0].id).update(is_read=True)
+
+        response = self.client.patch(self.url, {'notification_category': self.category.id}, format='json')
+
+        self.assertEqual(response.data, {'count': 3})
+        self.assertFalse(InvestorNotification.objects.get(id=self.other.id).is_read)
+
+    def test_delete_before_timestamp(self):
+        InvestorNotification.objects.filter(id=self.other.id).update(created_at=timezone.now() + timedelta(days=1))
+        get_unread_count(InvestorNotification, self.investor.id)
+
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.url, {'before': timezone.now().isoformat()}, format='json')
+
+        self.assertEqual(response.data, {'count': 4})
+        statements = [query['sql'] for query in context.captured_queries if 'investornotification' in query['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('DELETE'))
+        self.assertEqual(list(InvestorNotification.objects.filter(investor=self.investor)), [self.other])
+        self.assertTrue(InvestorNotification.objects.filter(id=self.foreign.id).exists())
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 1)
+
+    def test_empty_selection_is_rejected(self):
+        response = self.client.delete(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(InvestorNotification.objects.filter(investor=self.investor).count(), 5)
+
+    def test_startup_bulk_mark_as_read(self):
+        StartUpNotificationFactory.create_batch(3, startup=self.startup)
+        self.client.force_authenticate(user=self.startup.user)
+
+        response = self.client.patch(
+            reverse('notifications:startup_notifications_bulk'),
+            {'before': (timezone.now() + timedelta(seconds=1)).isoformat()},
+            format='json',
+        )
+
+        self.assertEqual(response.data, {'count': 3})
+        self.assertFalse(StartUpNotification.objects.unread().for_startup(self.startup).exists())
@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase, override_settings
+
+from ..consumers import NotificationConsumer
+from ..factories import InvestorNotificationFactory, InvestorProfileFactory, StartupProfileFactory
+from ..outbox import process_outbox
+from ..push import publish
+from users.serializers import create_default_notification_preferences
+
+IN_MEMORY_CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationConsumerTest(TestCase):
+    def setUp(self):
+        self.investor = InvestorProfileFactory()
+        self.startup = StartupProfileFactory()
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/api/v1/notifications/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    def create_committed(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            return func()
+
+    async def test_anonymous_user_is_rejected(self):
+        _, connected = await self.connect(AnonymousUser())
+        self.assertFalse(connected)
+
+    async def test_created_notification_is_pushed_to_recipient(self):
+        communicator, connected = await self.connect(self.investor.user)
+        self.assertTrue(connected)
+
+        notification = await sync_to_async(self.create_committed)(
+            lambda: InvestorNotificationFactory(investor=self.investor, startup=self.startup)
+        )
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "notification")
+        self.assertEqual(response["notification"]["id"], notification.id)
+        self.assertEqual(response["notification"]["kind"], "investornotification")
+        self.assertEqual(response["notification"]["startup"], self.startup.id)
+        await communicator.disconnect()
+
+    async def test_notifications_of_one_recipient_are_pushed_in_one_group_send(self):
+        communicator, _ = await self.connect(self.investor.user)
+        notifications = await sync_to_async(InvestorNotificationFactory.build_batch)(
+            2, investor=self.investor, startup=self.startup
+        )
+        for notification_id, notification in enumerate(notifications, start=1):
+            notification.id = notification_id
+
+        with patch.object(InMemoryChannelLayer, "group_send", autospec=True,
+                          side_effect=InMemoryChannelLayer.group_send) as group_send:
+            await sync_to_async(self.create_committed)(lambda: publish(notifications))
+
+        self.assertEqual(group_send.call_count, 1)
+        received = [(await communicator.receive_json_from())["notification"]["id"] for _ in notifications]
+        self.assertEqual(received, [notification.id for notification in notifications])
+        await communicator.disconnect()
+
+    async def test_fan_out_is_pushed_to_followers_only(self):
+        other_investor = await sync_to_async(InvestorProfileFactory)()
+        follower, _ = await self.connect(self.investor.user)
+        bystander, _ = await self.connect(other_investor.user)
+
+        def update_followed_startup():
+            create_default_notification_preferences(self.investor.user)
+            self.startup.followers.add(self.investor)
+            self.startup.save()
+            process_outbox()
+
+        await sync_to_async(self.create_committed)(update_followed_startup)
+
+        response = await follower.receive_json_from()
+        self.assertEqual(response["notification"]["notification_category"], "profile_update")
+        self.assertEqual(response["notification"]["investor"], self.investor.id)
+        self.assertTrue(await bystander.receive_nothing())
+        await follower.disconnect()
+        await bystander.disconnect()
+
+    async def test_follow_is_pushed_to_startup(self):
+        communicator, connected = await self.connect(self.startup.user)
+        self.assertTrue(connected)
+
+        def follow():
+            create_default_notification_preferences(self.startup.user)
+            self.startup.followers.add(self.investor)
+
+        await sync_to_async(self.create_committed)(follow)
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["notification"]["kind"], "startupnotification")
+        self.assertEqual(response["notification"]["notification_category"], "follow")
+        self.assertEqual(response["notification"]["investor"], self.investor.id)
+        await communicator.disconnect()
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.serializers import create_default_notification_preferences
+from .test_notificationpreference import generate_auth_header
+from ..counters import get_unread_count, unread_count_key
+from ..factories import (
+    InvestorNotificationFactory,
+    InvestorProfileFactory,
+    StartupProfileFactory,
+    StartUpNotificationFactory,
+)
+from ..models import InvestorNotification, StartUpNotification
+from ..outbox import process_outbox
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.startup = StartupProfileFactory()
+        self.investor = InvestorProfileFactory()
+        create_default_notification_preferences(self.investor.user)
+        self.startup_header = generate_auth_header(self.startup.user, 1)
+        self.investor_header = generate_auth_header(self.investor.user, 2)
+
+    def get_count(self, url_name, header):
+        response = self.client.get(reverse(url_name), **header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['unread_count']
+
+    def test_counter_is_rebuilt_then_served_from_cache(self):
+        InvestorNotificationFactory.create_batch(3, investor=self.investor, startup=self.startup)
+        InvestorNotificationFactory(investor=self.investor, startup=self.startup, is_read=True)
+
+        self.assertEqual(self.get_count('notifications:investor_unread_count', self.investor_header), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 3)
+
+    def test_rebuild_keeps_counter_stored_meanwhile(self):
+        InvestorNotificationFactory.create_batch(2, investor=self.investor, startup=self.startup)
+        key = unread_count_key(InvestorNotification, self.investor.id)
+        add = cache.add
+
+        def add_after_concurrent_increment(*args, **kwargs):
+            # Another request rebuilt the counter and incremented it between
+            # our COUNT and our store
+            cache.set(key, 3)
+            return add(*args, **kwargs)
+
+        with patch.object(cache, 'add', side_effect=add_after_concurrent_increment):
+            self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 3)
+        self.assertEqual(cache.get(key), 3)
+
+    def test_increment_during_rebuild_forces_a_recount(self):
+        InvestorNotificationFactory.create_batch(2, investor=self.investor, startup=self.startup)
+        key = unread_count_key(InvestorNotification, self.investor.id)
+        add = cache.add
+
+        def add_after_concurrent_insert(*args, **kwargs):
+            # A notification was committed after our COUNT, while the counter was still missing
+            with self.captureOnCommitCallbacks(execute=True):
+                InvestorNotificationFactory(investor=self.investor, startup=self.startup)
+            return add(*args, **kwargs)
+
+        with patch.object(cache, 'add', side_effect=add_after_concurrent_insert):
+            self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 2)
+        self.assertEqual(cache.get(key), 2)
+
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 3)
+        self.assertEqual(cache.get(key), 3)
+
+    def test_fan_out_increments_counter(self):
+        self.startup.followers.add(self.investor)
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.startup.save()
+            process_outbox()
+
+        self.assertEqual(cache.get(unread_count_key(InvestorNotification, self.investor.id)), 1)
+        self.assertEqual(self.get_count('notifications:investor_unread_count', self.investor_header), 1)
+
+    def test_patch_decrements_counter_once(self):
+        notification = StartUpNotificationFactory(startup=self.startup, investor=self.investor)
+        self.assertEqual(get_unread_count(StartUpNotification, self.startup.id), 1)
+        url = reverse('notifications:startup_notification_detail', kwargs={'id': notification.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, **self.startup_header)
+            self.client.patch(url, **self.startup_header)
+
+        self.assertEqual(cache.get(unread_count_key(StartUpNotification, self.startup.id)), 0)
+
+    def test_mark_all_as_read_resets_counter(self):
+        InvestorNotificationFactory.create_batch(2, investor=self.investor, startup=self.startup)
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            InvestorNotification.mark_all_as_read(self.investor.user)
+
+        self.assertIsNone(cache.get(unread_count_key(InvestorNotification, self.investor.id)))
+        self.assertEqual(self.get_count('notifications:investor_unread_count', self.investor_header), 0)
+
+    def test_cascade_delete_resets_counters_of_other_profiles(self):
+        other_startup = StartupProfileFactory()
+        InvestorNotificationFactory.create_batch(2, investor=self.investor, startup=other_startup)
+        InvestorNotificationFactory(investor=self.investor, startup=self.startup)
+        self.assertEqual(get_unread_count(InvestorNotification, self.investor.id), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other_startup.delete()
+
+        self.assertIsNone(cache.get(unread_count_key(InvestorNotification, self.investor.id)))
+        self.assertEqual(self.get_count('notifications:investor_unread_count', self.investor_header), 1)
+
+    def test_unread_count_requires_matching_profile(self):
+        response = self.client.get(reverse('notifications:startup_unread_count'), **self.investor_header)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
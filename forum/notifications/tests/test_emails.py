@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users.serializers import create_default_notification_preferences
+from ..emails import deliver_batch, purge_dead_emails, retry_delay
+from ..factories import InvestorProfileFactory, StartupProfileFactory
+from ..models import InvestorNotification, NotificationEmail, NotificationPreference
+from ..outbox import process_outbox
+from ..registry import registry
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+class ClaimCheckingEmailBackend(EmailBackend):
+    due_while_sending = None
+
+    def send_messages(self, messages):
+        ClaimCheckingEmailBackend.due_while_sending = NotificationEmail.objects.due().count()
+        return super().send_messages(messages)
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP server unavailable")
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class NotificationEmailTests(TestCase):
+    def setUp(self):
+        self.startup = StartupProfileFactory()
+        self.investors = InvestorProfileFactory.create_batch(3)
+        for investor in self.investors:
+            create_default_notification_preferences(investor.user)
+        self.startup.followers.add(*self.investors)
+
+    def update_startup(self, times=1):
+        for _ in range(times):
+            self.startup.save()
+            process_outbox()
+
+    def test_notifications_are_queued_for_email_recipients_only(self):
+        opted_out = NotificationPreference.objects.get(user=self.investors[0].user)
+        opted_out.allowed_notification_methods.remove(registry.method('email'))
+
+        self.update_startup()
+
+        self.assertEqual(
+            set(NotificationEmail.objects.values_list('user_id', flat=True)),
+            {investor.user.pk for investor in self.investors[1:]},
+        )
+        self.assertEqual(InvestorNotification.objects.filter(startup=self.startup).count(), 3)
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    def test_notifications_are_sent_as_one_digest_per_recipient(self):
+        self.update_startup(times=2)
+
+        stats = deliver_batch()
+
+        self.assertEqual(stats["claimed"], 6)
+        self.assertEqual(stats["emails_sent"], 3)
+        self.assertEqual(stats["notifications_sent"], 6)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(investor.user.email for investor in self.investors),
+        )
+        self.assertEqual(mail.outbox[0].subject, "You have 2 new notifications")
+        self.assertFalse(NotificationEmail.objects.exists())
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.test_emails.CountingEmailBackend")
+    def test_batch_reuses_one_connection(self):
+        CountingEmailBackend.opened = 0
+        self.update_startup()
+
+        deliver_batch()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.test_emails.ClaimCheckingEmailBackend")
+    def test_claimed_emails_are_hidden_from_other_workers_while_sending(self):
+        self.update_startup()
+
+        deliver_batch()
+
+        self.assertEqual(ClaimCheckingEmailBackend.due_while_sending, 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(NotificationEmail.objects.exists())
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.test_emails.FailingEmailBackend")
+    def test_failed_emails_are_retried_with_backoff(self):
+        self.update_startup()
+
+        stats = deliver_batch()
+
+        self.assertEqual(stats["failed"], 3)
+        entry = NotificationEmail.objects.first()
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(entry.last_error, "SMTP server unavailable")
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+        self.assertEqual(deliver_batch()["claimed"], 0)
+
+        NotificationEmail.objects.update(next_attempt_at=timezone.now())
+        with self.settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+            self.assertEqual(deliver_batch()["emails_sent"], 3)
+        self.assertFalse(NotificationEmail.objects.exists())
+
+    def test_exhausted_emails_are_not_retried(self):
+        self.update_startup()
+        NotificationEmail.objects.update(attempts=NotificationEmail.MAX_ATTEMPTS)
+
+        self.assertEqual(deliver_batch()["claimed"], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_old_dead_emails_are_purged(self):
+        self.update_startup()
+        expired, kept, pending = NotificationEmail.objects.order_by('id')
+        NotificationEmail.objects.exclude(id=pending.id).update(attempts=NotificationEmail.MAX_ATTEMPTS)
+        NotificationEmail.objects.filter(id=expired.id).update(created_at=timezone.now() - timedelta(days=8))
+
+        self.assertEqual(purge_dead_emails(7), 1)
+        self.assertEqual(list(NotificationEmail.objects.values_list('id', flat=True)), [kept.id, pending.id])
+
+    def test_retry_delay_doubles_up_to_the_limit(self):
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+        self.assertEqual(retry_delay(20), retry_delay(30))
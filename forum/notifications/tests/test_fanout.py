@@ -0,0 +1,160 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from users.serializers import create_default_notification_preferences
+from ..factories import InvestorProfileFactory, ProjectFactory, StartupProfileFactory
+from ..fanout import eligible_profiles, notify_followers
+from ..models import InvestorNotification, NotificationPreference, StartUpNotification
+from ..outbox import process_outbox
+from ..registry import registry
+from profiles.models import InvestorProfile
+
+
+class FanOutQueryCountBenchmark(TestCase):
+    """
+    Benchmark for the notification fan-out engine.
+
+    The number of queries issued while notifying followers must not grow
+    with the number of followers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Warm the registry so category/method lookups are not counted
+        registry.category('profile_update')
+
+    def create_followed_startup(self, followers_count):
+        startup = StartupProfileFactory()
+        investors = InvestorProfileFactory.create_batch(followers_count)
+        for investor in investors:
+            create_default_notification_preferences(investor.user)
+        startup.followers.add(*investors)
+        process_outbox()
+        return startup, investors
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context.captured_queries)
+
+    def test_profile_update_query_count_is_constant(self):
+        small_startup, small_followers = self.create_followed_startup(2)
+        large_startup, large_followers = self.create_followed_startup(20)
+
+        small_startup.save()
+        small_queries = self.count_queries(process_outbox)
+        large_startup.save()
+        large_queries = self.count_queries(process_outbox)
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(
+            InvestorNotification.objects.filter(startup=small_startup).count(), len(small_followers)
+        )
+        self.assertEqual(
+            InvestorNotification.objects.filter(startup=large_startup).count(), len(large_followers)
+        )
+
+    def test_new_project_query_count_is_constant(self):
+        small_startup, _ = self.create_followed_startup(2)
+        large_startup, large_followers = self.create_followed_startup(20)
+
+        ProjectFactory(startup=small_startup)
+        small_queries = self.count_queries(process_outbox)
+        ProjectFactory(startup=large_startup)
+        large_queries = self.count_queries(process_outbox)
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(
+            InvestorNotification.objects.filter(
+                startup=large_startup,
+                notification_category=registry.category('new_project'),
+            ).count(),
+            len(large_followers),
+        )
+
+    def test_followers_without_preference_are_skipped(self):
+        startup, investors = self.create_followed_startup(3)
+        preference = NotificationPreference.objects.get(user=investors[0].user)
+        preference.allowed_notification_methods.remove(registry.method('in_app'))
+        NotificationPreference.objects.filter(user=investors[1].user).delete()
+
+        created = notify_followers(
+            startup, registry.category('profile_update'), registry.method('in_app')
+        )
+
+        self.assertEqual(created, 1)
+        self.assertEqual(
+            list(InvestorNotification.objects.filter(startup=startup).values_list('investor_id', flat=True)),
+            [investors[2].id],
+        )
+
+    def test_eligible_profiles_uses_single_query(self):
+        startup, investors = self.create_followed_startup(5)
+        with self.assertNumQueries(1):
+            eligible = list(eligible_profiles(
+                InvestorProfile.objects.filter(followed_startups=startup),
+                registry.category('profile_update'),
+                registry.method('in_app'),
+            ))
+        self.assertCountEqual(eligible, investors)
+
+    def test_follow_notification_is_not_duplicated(self):
+        startup, investors = self.create_followed_startup(1)
+        create_default_notification_preferences(startup.user)
+        startup.followers.remove(*investors)
+        startup.followers.add(*investors)
+        startup.followers.remove(*investors)
+        startup.followers.add(*investors)
+
+        self.assertEqual(StartUpNotification.objects.filter(startup=startup).count(), 1)
+
+
+@override_settings(NOTIFICATION_DIGEST_WINDOW=300)
+class NotificationDigestTests(TestCase):
+    def setUp(self):
+        self.startup = StartupProfileFactory()
+        self.investor = InvestorProfileFactory()
+        create_default_notification_preferences(self.investor.user)
+        self.startup.followers.add(self.investor)
+
+    def update_profile(self, times):
+        for _ in range(times):
+            self.startup.save()
+        process_outbox()
+
+    def notifications(self):
+        return InvestorNotification.objects.filter(
+            startup=self.startup, notification_category=registry.category('profile_update')
+        ).order_by('id')
+
+    def test_burst_of_updates_is_coalesced(self):
+        self.update_profile(10)
+
+        notification = self.notifications().get()
+        self.assertEqual(notification.occurrences, 10)
+        self.assertGreater(notification.last_occurred_at, notification.created_at)
+
+    def test_read_notification_is_not_coalesced(self):
+        self.update_profile(2)
+        self.notifications().update(is_read=True)
+        self.update_profile(1)
+
+        self.assertEqual([n.occurrences for n in self.notifications()], [2, 1])
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    def test_digest_can_be_disabled(self):
+        self.update_profile(3)
+        self.assertEqual([n.occurrences for n in self.notifications()], [1, 1, 1])
+
+    def test_new_projects_are_not_coalesced(self):
+        ProjectFactory(startup=self.startup)
+        ProjectFactory(startup=self.startup)
+        process_outbox()
+
+        self.assertEqual(
+            InvestorNotification.objects.filter(
+                startup=self.startup, notification_category=registry.category('new_project')
+            ).count(),
+            2,
+        )
@@ -10,6 +10,8 @@ from rest_framework_simplejwt.exceptions import InvalidToken
 from django.db.models.signals import post_save
 from projects.models import Project
 from notifications.signals import notify_investors_about_project_update
+from notifications.outbox import process_outbox
+from notifications.registry import registry
 from notifications.models import InvestorNotification, NotificationCategory
 
 
@@ -457,6 +459,8 @@ class ProjectUpdateNotificationSignalTests(APITestCase):
 
         # Create a project owned by the startup
         cls.project = ProjectFactory(startup=cls.startup)
+        # Drain the events queued while building the fixtures
+        process_outbox()
 
         # Add the investor as a follower of the startup
         cls.startup.followers.add(cls.investor)
@@ -477,6 +481,9 @@ class ProjectUpdateNotificationSignalTests(APITestCase):
         """
         Set up data for each individual test. This method runs before each test.
         """
+        # The category created in setUpTestData is never committed, so the
+        # registry is not invalidated on its own
+        registry.invalidate()
         # Connect the signal
         post_save.connect(notify_investors_about_project_update, sender=Project)
 
@@ -494,6 +501,7 @@ class ProjectUpdateNotificationSignalTests(APITestCase):
         # Update the project
         self.project.title = "Updated Project Title"
         self.project.save()
+        process_outbox()
 
         # Check that a notification was created for the investor
         notifications = InvestorNotification.objects.filter(
@@ -517,6 +525,7 @@ class ProjectUpdateNotificationSignalTests(APITestCase):
             is_published=True,
             is_completed=False,
         )
+        process_outbox()
 
         # Check that no notification was created for the investor
         notifications = InvestorNotification.objects.filter(
@@ -536,6 +545,7 @@ class ProjectUpdateNotificationSignalTests(APITestCase):
         # Update the project
         self.project.title = "Updated Project Title"
         self.project.save()
+        process_outbox()
 
         # Check that no notification was created for the other investor
         notifications = InvestorNotification.objects.filter(
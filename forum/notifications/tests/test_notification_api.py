@@ -5,6 +5,7 @@ from django.urls import reverse
 
 from .test_notificationpreference import generate_auth_header
 from users.serializers import create_default_notification_preferences
+from ..outbox import process_outbox
 
 
 class NotificationsAPITests(APITestCase):
@@ -69,7 +70,7 @@ class NotificationsAPITests(APITestCase):
 
         url = reverse('notifications:startup_notifications')
         response = self.client.get(url, **self.auth_header_startup)
-        self.assertEqual(response.json()['count'], 1, "Expected 1 notification.")
+        self.assertEqual(len(response.json()['results']), 1, "Expected 1 notification.")
 
         body = {
             "allowed_notification_methods": [1, 2],
@@ -84,7 +85,7 @@ class NotificationsAPITests(APITestCase):
 
         url = reverse('notifications:startup_notifications')
         response = self.client.get(url, **self.auth_header_startup)
-        self.assertEqual(response.json()['count'], 1, "Expected 1 notification.")
+        self.assertEqual(len(response.json()['results']), 1, "Expected 1 notification.")
     
     
     def test_startup_update_notifications(self):
@@ -103,7 +104,7 @@ class NotificationsAPITests(APITestCase):
             self.auth_header_startup,
             (self.auth_header_investor_1, self.auth_header_investor_2)
         )
-        self.assertEqual(response.json()['count'], 2, "Expected 2 notifications.")
+        self.assertEqual(len(response.json()['results']), 2, "Expected 2 notifications.")
 
         body = {
             "allowed_notification_methods": [1, 2],
@@ -124,11 +125,13 @@ class NotificationsAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()['phone'], "+380987654321")
 
+        process_outbox()
+
         url = reverse('notifications:investor_notifications')
         response = self.client.get(url, **self.auth_header_investor_1)
-        self.assertEqual(response.json()['count'], 0, "Expected 0 notifications.")
+        self.assertEqual(len(response.json()['results']), 0, "Expected 0 notifications.")
         response = self.client.get(url, **self.auth_header_investor_2)
-        self.assertEqual(response.json()['count'], 1, "Expected 1 notification.")
+        self.assertEqual(len(response.json()['results']), 1, "Expected 1 notification.")
 
 
     def test_new_project_notifications(self):
@@ -147,11 +150,12 @@ class NotificationsAPITests(APITestCase):
             self.auth_header_startup,
             (self.auth_header_investor_1, self.auth_header_investor_2)
         )
-        self.assertEqual(response.json()['count'], 2, "Expected 2 notifications.")
+        self.assertEqual(len(response.json()['results']), 2, "Expected 2 notifications.")
 
         url = reverse('projects:projects-list')
         response = self.client.post(url, self.project_info, format='json', **self.auth_header_startup)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        process_outbox()
         
         body = {
             "allowed_notification_methods": [1, 2],
@@ -166,11 +170,13 @@ class NotificationsAPITests(APITestCase):
         response = self.client.post(url, self.project_info, format='json', **self.auth_header_startup)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+        process_outbox()
+
         url = reverse('notifications:investor_notifications')
         response = self.client.get(url, **self.auth_header_investor_1)
-        self.assertEqual(response.json()['count'], 1, "Expected 1 notification.")
+        self.assertEqual(len(response.json()['results']), 1, "Expected 1 notification.")
         response = self.client.get(url, **self.auth_header_investor_2)
-        self.assertEqual(response.json()['count'], 2, "Expected 2 notifications.")
+        self.assertEqual(len(response.json()['results']), 2, "Expected 2 notifications.")
         
 
     def test_in_app_preference(self):
@@ -199,8 +205,10 @@ class NotificationsAPITests(APITestCase):
         response = self.client.post(url, self.project_info, format='json', **self.auth_header_startup)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+        process_outbox()
+
         url = reverse('notifications:investor_notifications')
         response = self.client.get(url, **self.auth_header_investor_1)
-        self.assertEqual(response.json()['count'], 0, "Expected 0 notifications.")
+        self.assertEqual(len(response.json()['results']), 0, "Expected 0 notifications.")
         response = self.client.get(url, **self.auth_header_investor_2)
-        self.assertEqual(response.json()['count'], 1, "Expected 1 notification.")
\ No newline at end of file
+        self.assertEqual(len(response.json()['results']), 1, "Expected 1 notification.")
\ No newline at end of file
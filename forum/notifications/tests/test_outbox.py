@@ -0,0 +1,101 @@
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from users.serializers import create_default_notification_preferences
+from ..factories import InvestorProfileFactory, StartupProfileFactory
+from ..models import InvestorNotification, NotificationOutbox
+from ..outbox import enqueue, process_batch, process_outbox, purge_dead_events, retry_delay
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.startup = StartupProfileFactory()
+        self.investor = InvestorProfileFactory()
+        create_default_notification_preferences(self.investor.user)
+        self.startup.followers.add(self.investor)
+        process_outbox()
+
+    def test_profile_update_is_queued_instead_of_fanned_out(self):
+        self.startup.save()
+
+        self.assertEqual(InvestorNotification.objects.filter(startup=self.startup).count(), 0)
+        event = NotificationOutbox.objects.get()
+        self.assertEqual(event.event, NotificationOutbox.Event.PROFILE_UPDATE)
+        self.assertEqual(event.startup, self.startup)
+
+    def test_rolled_back_save_does_not_queue_event(self):
+        try:
+            with transaction.atomic():
+                self.startup.save()
+                raise RuntimeError("rollback")
+        except RuntimeError:
+            pass
+
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_processing_creates_notifications_once(self):
+        self.startup.save()
+
+        self.assertEqual(process_outbox(), 1)
+        self.assertEqual(process_outbox(), 0)
+        self.assertEqual(InvestorNotification.objects.filter(investor=self.investor).count(), 1)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_failed_event_is_kept_for_retry(self):
+        self.startup.save()
+
+        with patch('notifications.outbox.dispatch', side_effect=RuntimeError("boom")):
+            process_batch()
+
+        event = NotificationOutbox.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "boom")
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(process_batch(), 0)
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        process_batch()
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertEqual(InvestorNotification.objects.filter(investor=self.investor).count(), 1)
+
+    def test_exhausted_event_is_not_retried(self):
+        self.startup.save()
+        NotificationOutbox.objects.update(attempts=NotificationOutbox.MAX_ATTEMPTS)
+
+        self.assertEqual(process_batch(), 0)
+        self.assertEqual(InvestorNotification.objects.filter(investor=self.investor).count(), 0)
+
+    def test_retry_delay_doubles_up_to_the_limit(self):
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+        self.assertEqual(retry_delay(20), retry_delay(30))
+
+    def test_old_dead_events_are_purged(self):
+        self.startup.save()
+        self.startup.save()
+        kept, expired = NotificationOutbox.objects.all()
+        NotificationOutbox.objects.update(attempts=NotificationOutbox.MAX_ATTEMPTS)
+        NotificationOutbox.objects.filter(id=expired.id).update(created_at=timezone.now() - timedelta(days=8))
+        self.startup.save()
+        pending = NotificationOutbox.objects.pending().get()
+
+        self.assertEqual(purge_dead_events(7), 1)
+        self.assertEqual(
+            list(NotificationOutbox.objects.values_list('id', flat=True)),
+            [kept.id, pending.id],
+        )
+
+    def test_worker_command_drains_outbox(self):
+        self.startup.save()
+        enqueue(NotificationOutbox.Event.NEW_PROJECT, self.startup)
+        out = StringIO()
+
+        call_command('process_notification_outbox', '--once', '--batch-size', '1', stdout=out)
+
+        self.assertIn("Processed 2 notification events.", out.getvalue())
+        self.assertEqual(InvestorNotification.objects.filter(investor=self.investor).count(), 2)
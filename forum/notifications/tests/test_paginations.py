@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..factories import (
+    InvestorNotificationFactory,
+    InvestorProfileFactory,
+    NotificationCategoryFactory,
+    StartupProfileFactory,
+)
+from ..models import InvestorNotification
+
+
+class NotificationKeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.investor = InvestorProfileFactory()
+        cls.startup = StartupProfileFactory()
+        cls.category = NotificationCategoryFactory()
+        cls.other_category = NotificationCategoryFactory()
+        cls.notifications = InvestorNotificationFactory.create_batch(
+            7, investor=cls.investor, startup=cls.startup, notification_category=cls.category
+        )
+        InvestorNotificationFactory.create_batch(
+            2, investor=cls.investor, startup=cls.startup, notification_category=cls.other_category
+        )
+        # Several rows share a timestamp, so the id has to break ties
+        InvestorNotification.objects.filter(id__in=[n.id for n in cls.notifications[2:5]]).update(
+            created_at=timezone.now()
+        )
+        cls.url = reverse('notifications:investor_notifications')
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.investor.user)
+
+    def collect_pages(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids += [int(result['notification_url'].rstrip('/').rsplit('/', 1)[1]) for result in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_cursor_walks_every_notification_newest_first(self):
+        ids, pages = self.collect_pages(f'{self.url}?page_size=2')
+
+        expected = list(
+            InvestorNotification.objects.filter(investor=self.investor)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 5)
+
+    def test_cursor_keeps_category_filter(self):
+        ids, _ = self.collect_pages(f'{self.url}?page_size=3&notification_category={self.category.id}')
+        self.assertCountEqual(ids, [notification.id for notification in self.notifications])
+
+    def test_page_cost_does_not_depend_on_depth(self):
+        # The first page ends on the last of the tied rows, so the next one
+        # needs no offset to skip them
+        first = self.client.get(f'{self.url}?page_size=3')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(first.data['next'])
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('COUNT(', sql.upper())
+        self.assertNotIn('OFFSET', sql.upper())
+
+    def test_page_number_mode_is_still_available(self):
+        response = self.client.get(f'{self.url}?pagination=page&page=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 9)
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_invalid_cursor_returns_not_found(self):
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from users.serializers import create_default_notification_preferences
+from ..factories import (
+    InvestorNotificationFactory,
+    InvestorProfileFactory,
+    StartUpNotificationFactory,
+    StartupProfileFactory,
+)
+from ..fanout import notify_startup
+from ..models import InvestorNotification, StartUpNotification, StartUpNotificationKey
+from ..partitions import archive_read_notifications, archive_table_name, ensure_partitions, list_partitions
+from ..registry import registry
+
+
+def backdate(notification, created_at, **fields):
+    type(notification).objects.filter(id=notification.id).update(created_at=created_at, **fields)
+
+
+def stored_in(notification):
+    table = notification._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT tableoid::regclass::text FROM "{table}" WHERE id = %s', [notification.id])
+        return cursor.fetchone()[0]
+
+
+class NotificationPartitionTests(TestCase):
+    def test_notification_tables_are_partitioned_by_month(self):
+        notification = StartUpNotificationFactory()
+        month = notification.created_at.strftime('%Y%m')
+
+        self.assertEqual(stored_in(notification), f'notifications_startupnotification_p{month}')
+        self.assertTrue(list_partitions('notifications_investornotification'))
+
+    def test_new_partition_takes_over_rows_from_default(self):
+        notification = InvestorNotificationFactory()
+        backdate(notification, datetime(2040, 1, 10, tzinfo=timezone.utc))
+        self.assertEqual(stored_in(notification), 'notifications_investornotification_default')
+
+        created = ensure_partitions(months_ahead=1, now=datetime(2040, 1, 15, tzinfo=timezone.utc))
+
+        self.assertIn('notifications_investornotification_p204001', created)
+        self.assertIn('notifications_startupnotification_p204002', created)
+        self.assertEqual(stored_in(notification), 'notifications_investornotification_p204001')
+        self.assertEqual(InvestorNotification.objects.get(id=notification.id).created_at.year, 2040)
+        self.assertEqual(ensure_partitions(months_ahead=1, now=datetime(2040, 1, 15, tzinfo=timezone.utc)), [])
+
+    def test_partitions_keep_ids_unique(self):
+        ensure_partitions(months_ahead=0, now=datetime(2042, 5, 1, tzinfo=timezone.utc))
+        notification = StartUpNotificationFactory()
+        backdate(notification, datetime(2042, 5, 3, tzinfo=timezone.utc))
+        duplicate = StartUpNotificationFactory()
+        backdate(duplicate, datetime(2042, 5, 3, tzinfo=timezone.utc))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StartUpNotification.objects.filter(id=duplicate.id).update(id=notification.id)
+
+    def test_notification_keys_keep_notifications_unique_across_partitions(self):
+        ensure_partitions(months_ahead=0, now=datetime(2042, 5, 1, tzinfo=timezone.utc))
+        startup = StartupProfileFactory()
+        investor = InvestorProfileFactory()
+        create_default_notification_preferences(startup.user)
+        follow = registry.category('follow')
+        self.assertEqual(notify_startup(startup, follow, [investor.id]), 1)
+        # Moved to another partition, with a created_at no new row would share
+        backdate(StartUpNotification.objects.get(startup=startup), datetime(2042, 5, 3, tzinfo=timezone.utc))
+
+        self.assertEqual(notify_startup(startup, follow, [investor.id]), 0)
+        self.assertEqual(StartUpNotification.objects.filter(startup=startup).count(), 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StartUpNotificationKey.objects.create(notification_category=follow, investor=investor, startup=startup)
+
+    def test_retention_archives_read_notifications_only(self):
+        ensure_partitions(months_ahead=1, now=datetime(2041, 3, 1, tzinfo=timezone.utc))
+        read = StartUpNotificationFactory()
+        unread = StartUpNotificationFactory()
+        backdate(read, datetime(2041, 3, 5, tzinfo=timezone.utc), is_read=True)
+        backdate(unread, datetime(2041, 4, 5, tzinfo=timezone.utc))
+
+        archived = archive_read_notifications(retention_months=1, now=datetime(2041, 6, 1, tzinfo=timezone.utc))
+
+        self.assertEqual(archived['notifications_startupnotification_p204103'], 1)
+        self.assertEqual(archived['notifications_startupnotification_p204104'], 0)
+        partitions = list_partitions('notifications_startupnotification').values()
+        self.assertNotIn('notifications_startupnotification_p204103', partitions)
+        self.assertIn('notifications_startupnotification_p204104', partitions)
+        self.assertEqual(list(StartUpNotification.objects.filter(id__in=[read.id, unread.id])), [unread])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM "{archive_table_name(StartUpNotification._meta.db_table)}"')
+            self.assertEqual(cursor.fetchall(), [(read.id,)])
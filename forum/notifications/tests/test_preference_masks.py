@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from users.serializers import create_default_notification_preferences
+from ..factories import InvestorProfileFactory
+from ..models import NotificationPreference, NotificationPreferenceMask
+from ..preference_masks import find_inconsistent_users
+from ..registry import registry
+from ..serializers import NotificationPreferenceUpdateSerializer
+from ..signals import have_preference
+
+IN_APP = NotificationPreferenceMask.METHOD_BITS['in_app']
+EMAIL = NotificationPreferenceMask.METHOD_BITS['email']
+
+
+class NotificationPreferenceMaskTests(TestCase):
+    def setUp(self):
+        self.investor = InvestorProfileFactory()
+        self.user = self.investor.user
+        create_default_notification_preferences(self.user)
+        self.preference = NotificationPreference.objects.get(user=self.user)
+
+    def masks(self):
+        return dict(
+            NotificationPreferenceMask.objects.filter(user=self.user)
+            .values_list('category__name', 'methods_mask')
+        )
+
+    def test_default_preferences_create_masks(self):
+        self.assertEqual(
+            self.masks(),
+            {'follow': IN_APP | EMAIL, 'profile_update': IN_APP | EMAIL, 'new_project': IN_APP | EMAIL},
+        )
+
+    def test_serializer_update_rebuilds_masks(self):
+        serializer = NotificationPreferenceUpdateSerializer(
+            self.preference,
+            data={
+                'allowed_notification_methods': [registry.method('email').id],
+                'allowed_notification_categories': [registry.category('new_project').id],
+            },
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(self.masks(), {'new_project': EMAIL})
+        self.assertFalse(have_preference(self.investor, registry.category('new_project')))
+
+    def test_have_preference_reads_masks(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(have_preference(self.investor, registry.category('profile_update')))
+
+        self.preference.allowed_notification_categories.remove(registry.category('profile_update'))
+        self.assertFalse(have_preference(self.investor, registry.category('profile_update')))
+
+    def test_deleting_preference_deletes_masks(self):
+        self.preference.delete()
+        self.assertEqual(self.masks(), {})
+
+    def test_check_reports_and_sync_repairs_inconsistent_masks(self):
+        NotificationPreferenceMask.objects.filter(user=self.user).update(methods_mask=0)
+        self.assertEqual(find_inconsistent_users([self.user.pk]), [self.user.pk])
+
+        with self.assertRaises(CommandError):
+            call_command('sync_notification_preference_masks', '--check', stdout=StringIO())
+
+        call_command('sync_notification_preference_masks', stdout=StringIO())
+        self.assertEqual(find_inconsistent_users([self.user.pk]), [])
+        call_command('sync_notification_preference_masks', '--check', stdout=StringIO())
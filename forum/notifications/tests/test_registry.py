@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+
+from users.models import Role
+from ..models import NotificationCategory, NotificationMethod
+from ..registry import REGISTRY_VERSION_KEY, NotificationRegistry, registry
+from ..views import RoleLayer
+
+
+class NotificationRegistryTests(TestCase):
+    def setUp(self):
+        registry.invalidate()
+
+    def test_lookups_do_not_query_once_loaded(self):
+        registry.category('follow')
+        with self.assertNumQueries(0):
+            follow = registry.category('follow')
+            self.assertEqual(registry.category_by_id(follow.id), follow)
+            self.assertEqual(registry.method('in_app').name, 'in_app')
+            self.assertEqual(
+                [category.name for category in registry.categories_for_role(Role.INVESTOR)],
+                ['new_project', 'profile_update'],
+            )
+
+    def test_missing_category_raises_does_not_exist(self):
+        with self.assertRaises(NotificationCategory.DoesNotExist):
+            registry.category('missing')
+        with self.assertRaises(NotificationMethod.DoesNotExist):
+            registry.method_by_id('not-an-id')
+
+    def test_saving_category_invalidates_registry(self):
+        registry.category('follow')
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationCategory.objects.create(name='Project Update', description='Project updates.')
+
+        self.assertEqual(registry.category('Project Update').name, 'Project Update')
+        self.assertIn(
+            'Project Update',
+            [category.name for category in registry.categories_for_role(Role.INVESTOR)],
+        )
+
+    def test_other_processes_reload_on_version_change(self):
+        other_process = NotificationRegistry()
+        other_process.method('email')
+        version = cache.get(REGISTRY_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationMethod.objects.create(name='sms', description='Text messages.')
+        other_process._checked_at = 0.0
+
+        self.assertNotEqual(cache.get(REGISTRY_VERSION_KEY), version)
+        self.assertEqual(other_process.method('sms').name, 'sms')
+
+    def test_version_is_bumped_only_on_commit(self):
+        version = cache.get(REGISTRY_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            NotificationMethod.objects.create(name='sms', description='Text messages.')
+            self.assertEqual(cache.get(REGISTRY_VERSION_KEY), version)
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(cache.get(REGISTRY_VERSION_KEY), version)
+
+    def test_role_layer_resolves_categories_without_queries(self):
+        follow = registry.category('follow')
+        new_project = registry.category('new_project')
+        request = APIRequestFactory().put(
+            '/', {'allowed_notification_categories': [follow.id]}, format='json'
+        )
+        request = Request(request)
+        request.auth = {'role': Role.STARTUP}
+        request._full_data = {'allowed_notification_categories': [follow.id]}
+
+        with self.assertNumQueries(0):
+            self.assertTrue(RoleLayer.can_update_categories(request))
+            request._full_data = {'allowed_notification_categories': [follow.id, new_project.id]}
+            self.assertFalse(RoleLayer.can_update_categories(request))
@@ -6,7 +6,11 @@ from .views import (
     NotificationListView, 
     NotificationDetailView,
     InvestorNotificationDetailView,
-    InvestorNotificationListView
+    InvestorNotificationListView,
+    NotificationUnreadCountView,
+    InvestorNotificationUnreadCountView,
+    NotificationBulkActionView,
+    InvestorNotificationBulkActionView,
 )
 
 app_name = "notifications"
@@ -28,7 +32,11 @@ urlpatterns = [
         name="user_notification_preferences",
     ),
     path('startup/', NotificationListView.as_view(), name='startup_notifications'),
+    path('startup/unread-count/', NotificationUnreadCountView.as_view(), name='startup_unread_count'),
+    path('startup/bulk/', NotificationBulkActionView.as_view(), name='startup_notifications_bulk'),
     path('startup/<int:id>/', NotificationDetailView.as_view(), name='startup_notification_detail'),
     path('investor/', InvestorNotificationListView.as_view(), name='investor_notifications'),
+    path('investor/unread-count/', InvestorNotificationUnreadCountView.as_view(), name='investor_unread_count'),
+    path('investor/bulk/', InvestorNotificationBulkActionView.as_view(), name='investor_notifications_bulk'),
     path('investor/<int:id>/', InvestorNotificationDetailView.as_view(), name='investor_notification_detail'),
 ]
\ No newline at end of file
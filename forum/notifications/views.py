@@ -1,5 +1,6 @@
 import logging
 
+from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, status
@@ -7,7 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from users.models import Role
+from . import counters
 from .models import (
     NotificationCategory,
     NotificationMethod,
@@ -15,7 +16,8 @@ from .models import (
     StartUpNotification,
     InvestorNotification,
 )
-from .paginations import StandardResultsSetPagination
+from .paginations import NotificationPagination
+from .registry import ROLE_CATEGORIES, registry
 from .permissions import (
     HasStartupProfilePermission,
     HasStartupAccessPermission,
@@ -23,6 +25,7 @@ from .permissions import (
     HasInvestorAccessPermission,
 )
 from .serializers import (
+    NotificationBulkActionSerializer,
     NotificationCategorySerializer,
     NotificationMethodSerializer,
     NotificationPreferenceSerializer,
@@ -33,11 +36,6 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
-ROLE_CATEGORIES = {
-    Role.STARTUP: ["follow"],
-    Role.INVESTOR: ["profile_update", "new_project", "Project Update"],
-}
-
 PREFERENCE_RESPONSES = {
     200: openapi.Response(
         description="Successful operation", schema=NotificationPreferenceSerializer
@@ -53,6 +51,27 @@ NOTIFICATION_METHODS_RESPONSES = {
     ),
 }
 
+UNREAD_COUNT_RESPONSES = {
+    200: openapi.Response(
+        description="Successful operation",
+        schema=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={"unread_count": openapi.Schema(type=openapi.TYPE_INTEGER)},
+        ),
+    ),
+}
+
+BULK_ACTION_RESPONSES = {
+    200: openapi.Response(
+        description="Number of affected notifications",
+        schema=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={"count": openapi.Schema(type=openapi.TYPE_INTEGER)},
+        ),
+    ),
+    400: openapi.Response(description="Invalid data."),
+}
+
 NOTIFICATION_CATEGORIES_RESPONSES = {
     200: openapi.Response(
         description="Successful operation",
@@ -133,9 +152,7 @@ class NotificationCategoryView(APIView):
     )
     def get(self, request):
         role = request.auth.get("role")
-        notification_categories = NotificationCategory.objects.filter(
-            name__in=ROLE_CATEGORIES.get(role, [])
-        )
+        notification_categories = registry.categories_for_role(role)
         serializer = NotificationCategorySerializer(notification_categories, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -236,17 +253,24 @@ class NotificationListView(generics.ListAPIView):
     """
 
     permission_classes = [IsAuthenticated, HasStartupProfilePermission]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = NotificationPagination
     serializer_class = StartUpNotificationReadSerializer
 
     def get_queryset(self):
         startup_id = self.request.user.startup_profile.id
-        return (
+        queryset = (
             StartUpNotification.objects.filter(startup_id=startup_id)
             .order_by("id")
             .select_related("notification_category", "investor", "startup")
         )
 
+        # Apply notification_category filter if provided
+        notification_category_id = self.request.query_params.get("notification_category")
+        if notification_category_id:
+            queryset = queryset.filter(notification_category_id=notification_category_id)
+
+        return queryset
+
     def get_serializer_context(self):
         return {"request": self.request}
 
@@ -270,9 +294,7 @@ class NotificationDetailView(generics.RetrieveAPIView):
         Mark a notification as read.
         """
         instance = self.get_object()
-        if not instance.is_read:
-            instance.is_read = True
-            instance.save()
+        instance.mark_as_read()
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
@@ -280,12 +302,29 @@ class NotificationDetailView(generics.RetrieveAPIView):
         return {'request': self.request}
     
 
+class NotificationUnreadCountView(APIView):
+    """
+    To get the number of unread notifications of the current startup.
+    Served from a cached counter, so it is cheap enough to poll for a badge.
+    """
+
+    permission_classes = [IsAuthenticated, HasStartupProfilePermission]
+
+    @swagger_auto_schema(
+        operation_description="Retrieve the number of unread startup notifications.",
+        responses=UNREAD_COUNT_RESPONSES,
+    )
+    def get(self, request):
+        count = counters.get_unread_count(StartUpNotification, request.user.startup_profile.id)
+        return Response({"unread_count": count}, status=status.HTTP_200_OK)
+
+
 class InvestorNotificationListView(generics.ListAPIView):
     """
     To get all notifications as a list of dicts
     """
     permission_classes = [IsAuthenticated, HasInvestorProfilePermission]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = NotificationPagination
     serializer_class = InvestorNotificationReadSerializer
 
     def get_queryset(self):
@@ -317,9 +356,7 @@ class InvestorNotificationDetailView(generics.RetrieveAPIView):
         Mark a notification as read.
         """
         instance = self.get_object()
-        if not instance.is_read:
-            instance.is_read = True
-            instance.save()
+        instance.mark_as_read()
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
@@ -327,6 +364,97 @@ class InvestorNotificationDetailView(generics.RetrieveAPIView):
         return {"request": self.request}
 
 
+class InvestorNotificationUnreadCountView(APIView):
+    """
+    To get the number of unread notifications of the current investor.
+    Served from a cached counter, so it is cheap enough to poll for a badge.
+    """
+
+    permission_classes = [IsAuthenticated, HasInvestorProfilePermission]
+
+    @swagger_auto_schema(
+        operation_description="Retrieve the number of unread investor notifications.",
+        responses=UNREAD_COUNT_RESPONSES,
+    )
+    def get(self, request):
+        count = counters.get_unread_count(InvestorNotification, request.user.investor_profile.id)
+        return Response({"unread_count": count}, status=status.HTTP_200_OK)
+
+
+class NotificationBulkView(APIView):
+    """
+    Base view for bulk actions on the notifications of the current profile.
+
+    The notifications are selected by ids, a "before" timestamp and/or a
+    category, and the action is applied with a single UPDATE or DELETE.
+
+    Methods:
+    - PATCH: Mark the selected notifications as read.
+    - DELETE: Delete the selected notifications.
+
+    Both return the number of affected notifications.
+    """
+
+    model = None
+    profile_attr = None
+
+    def get_profile(self):
+        return getattr(self.request.user, self.profile_attr)
+
+    def get_queryset(self, profile):
+        serializer = NotificationBulkActionSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.model.objects.filter(**{self.model.RECIPIENT_FIELD: profile.id}).matching(
+            **serializer.validated_data
+        )
+
+    @swagger_auto_schema(
+        operation_description="Mark the selected notifications as read.",
+        request_body=NotificationBulkActionSerializer,
+        responses=BULK_ACTION_RESPONSES,
+    )
+    def patch(self, request):
+        profile = self.get_profile()
+        updated = self.get_queryset(profile).unread().update(is_read=True, updated_at=timezone.now())
+        if updated:
+            counters.decrement_unread(self.model, [profile.id], updated)
+        logger.info(f"Marked {updated} notifications as read for {self.profile_attr} {profile.id}")
+        return Response({"count": updated}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Delete the selected notifications.",
+        request_body=NotificationBulkActionSerializer,
+        responses=BULK_ACTION_RESPONSES,
+    )
+    def delete(self, request):
+        profile = self.get_profile()
+        deleted, _ = self.get_queryset(profile).delete()
+        if deleted:
+            counters.reset_unread(self.model, [profile.id])
+        logger.info(f"Deleted {deleted} notifications for {self.profile_attr} {profile.id}")
+        return Response({"count": deleted}, status=status.HTTP_200_OK)
+
+
+class NotificationBulkActionView(NotificationBulkView):
+    """
+    To mark as read or delete many notifications of the current startup at once.
+    """
+
+    permission_classes = [IsAuthenticated, HasStartupProfilePermission]
+    model = StartUpNotification
+    profile_attr = "startup_profile"
+
+
+class InvestorNotificationBulkActionView(NotificationBulkView):
+    """
+    To mark as read or delete many notifications of the current investor at once.
+    """
+
+    permission_classes = [IsAuthenticated, HasInvestorProfilePermission]
+    model = InvestorNotification
+    profile_attr = "investor_profile"
+
+
 class RoleLayer:
     """
     Helper class to work with jsons. Provides methods for extending of functionality
@@ -363,11 +491,23 @@ class RoleLayer:
         categories_to_modify = ROLE_CATEGORIES.get(role, [])
         request_categories = request.data.get("allowed_notification_categories")
         request_categories = [
-            NotificationCategory.objects.get(id=category).name
-            for category in request_categories
+            category.name
+            for category in map(cls._find_category, request_categories)
+            if category is not None
         ]
         return all(category in categories_to_modify for category in request_categories)
 
+    @staticmethod
+    def _find_category(category_id):
+        """
+        Resolve a category id through the registry. Unknown ids are left
+        for the serializer to reject.
+        """
+        try:
+            return registry.category_by_id(category_id)
+        except NotificationCategory.DoesNotExist:
+            return None
+
     @classmethod
     def filter_categories_dict_by_role(cls, request, preference_dict):
         """
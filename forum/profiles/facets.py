@@ -0,0 +1,143 @@
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models import StartupFacetCount, StartupProfile
+
+FACET_FIELDS = ("industry", "country", "city", "size")
+
+# Values returned per facet, most frequent first
+FACET_LIMIT = 20
+
+
+def facet_counts(queryset, fields=FACET_FIELDS, limit=FACET_LIMIT):
+    """
+    Count the startups of a queryset per value of each facet field.
+
+    On PostgreSQL all facets are computed in one GROUPING SETS query over
+    the filtered queryset, keeping the `limit` most frequent values of
+    each facet (every value when `limit` is None).
+
+    Returns:
+        dict: {field: [{"value": ..., "count": ...}, ...]} ordered by count, then value
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return {
+            field: [
+                {"value": row[field], "count": row["count"]}
+                for row in queryset.order_by().values(field).annotate(count=Count("pk")).order_by("-count", field)[:limit]
+            ]
+            for field in fields
+        }
+
+    sql, params = queryset.order_by().values(*fields).query.sql_with_params()
+    columns = [connection.ops.quote_name(field) for field in fields]
+    facet = "CASE " + " ".join(f"WHEN GROUPING({column}) = 0 THEN %s" for column in columns) + " END"
+    value = "CASE " + " ".join(f"WHEN GROUPING({column}) = 0 THEN {column}" for column in columns) + " END"
+    grouping_sets = ", ".join(f"({column})" for column in columns)
+    params = [*fields, *fields, *params]
+    if limit is not None:
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT facet, value, count FROM (
+                SELECT {facet} AS facet, {value} AS value, COUNT(*) AS count,
+                       ROW_NUMBER() OVER (PARTITION BY {facet} ORDER BY COUNT(*) DESC, {value}) AS position
+                FROM ({sql}) AS startups
+                GROUP BY GROUPING SETS ({grouping_sets})
+            ) AS facets
+            {"WHERE position <= %s" if limit is not None else ""}
+            ORDER BY facet, position
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+
+    counts = {field: [] for field in fields}
+    for field, value, count in rows:
+        counts[field].append({"value": value, "count": count})
+    return counts
+
+
+def stored_facet_counts(limit=FACET_LIMIT):
+    """
+    Read the facet counts of the whole public directory from the
+    StartupFacetCount aggregate, which does not grow with the number of
+    startups.
+
+    Returns:
+        dict: same shape as facet_counts
+    """
+    rows = (
+        StartupFacetCount.objects.filter(count__gt=0)
+        .annotate(position=Window(RowNumber(), partition_by=F("facet"), order_by=[F("count").desc(), F("value")]))
+        .filter(position__lte=limit)
+        .order_by("facet", "position")
+        .values_list("facet", "value", "count")
+    )
+    counts = {field: [] for field in FACET_FIELDS}
+    for field, value, count in rows:
+        counts[field].append({"value": value, "count": count})
+    return counts
+
+
+def facet_values(startup):
+    """
+    Return the facet values a startup contributes to the aggregate, or None
+    for startups that are not public.
+    """
+    if startup is None or not startup["is_public"]:
+        return None
+    return {field: startup[field] for field in FACET_FIELDS}
+
+
+def apply_facet_changes(old, new):
+    """
+    Move one startup's contribution in the StartupFacetCount aggregate from
+    its old facet values to the new ones.
+
+    Args:
+        old: dict of facet values before the change, or None
+        new: dict of facet values after the change, or None
+    """
+    deltas = Counter()
+    for values, sign in ((old, -1), (new, 1)):
+        for field, value in (values or {}).items():
+            deltas[field, value] += sign
+    deltas = [(field, value, delta) for (field, value), delta in deltas.items() if delta]
+    if not deltas:
+        return
+
+    table = StartupFacetCount._meta.db_table
+    with connections[StartupFacetCount.objects.db].cursor() as cursor:
+        cursor.executemany(
+            f"""
+            INSERT INTO {table} (facet, value, count) VALUES (%s, %s, %s)
+            ON CONFLICT (facet, value) DO UPDATE SET count = {table}.count + EXCLUDED.count
+            """,
+            deltas,
+        )
+
+
+def rebuild_facet_counts():
+    """
+    Recompute the StartupFacetCount aggregate from the public startups,
+    e.g. after bulk updates that bypass model signals.
+
+    Returns:
+        int: number of stored facet values
+    """
+    counts = facet_counts(StartupProfile.objects.filter(is_public=True), limit=None)
+    with transaction.atomic():
+        StartupFacetCount.objects.all().delete()
+        StartupFacetCount.objects.bulk_create(
+            StartupFacetCount(facet=field, value=row["value"], count=row["count"])
+            for field, rows in counts.items()
+            for row in rows
+        )
+    return sum(len(rows) for rows in counts.values())
@@ -0,0 +1,64 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+WORD = re.compile(r"\w+")
+
+
+@lru_cache
+def trigram_enabled(alias):
+    """
+    Return whether the pg_trgm extension is installed in the given database.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        return cursor.fetchone()[0]
+
+
+def prefix_query(terms):
+    """
+    Build a raw tsquery matching every word of the search terms as a prefix,
+    e.g. ['Super Comp'] -> 'super:* & comp:*'.
+    """
+    words = [word.lower() for term in terms for word in WORD.findall(term)]
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class StartupSearchFilter(SearchFilter):
+    """
+    Ranked search over startup profiles backed by PostgreSQL.
+
+    Matches every word of `?search=` as a prefix against the
+    `search_vector` column (GIN indexed) and, where pg_trgm is installed,
+    company names within pg_trgm's word similarity threshold of the search
+    text, so typos still match (trigram GIN indexed). Results are ordered
+    by relevance unless the client asked for an explicit `?ordering=`.
+
+    On other databases it falls back to DRF's SearchFilter over `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        raw_query = prefix_query(terms)
+        if not raw_query:
+            return queryset
+
+        query = SearchQuery(raw_query, search_type="raw", config="simple")
+        condition = Q(search_vector=query)
+        rank = SearchRank(F("search_vector"), query)
+        if trigram_enabled(queryset.db):
+            text = " ".join(terms)
+            condition |= Q(company_name__trigram_word_similar=text)
+            rank = rank + TrigramWordSimilarity(text, "company_name")
+
+        queryset = queryset.annotate(search_rank=rank).filter(condition)
+        if request.query_params.get(OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by("-search_rank", *(queryset.query.order_by or queryset.model._meta.ordering))
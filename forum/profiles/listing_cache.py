@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+LISTING_KEY = "startups:public:{digest}"
+TAG_KEY = "startups:tag:{tag}"
+METRIC_KEY = "startups:public:{outcome}"
+
+# Invalidated when startups enter, leave or move within the public listings
+DIRECTORY_TAG = "directory"
+
+# Fields the public listings are filtered, searched or ordered by
+DIRECTORY_FIELDS = ("company_name", "industry", "country", "city")
+
+
+def startup_tag(startup_id):
+    return f"startup:{startup_id}"
+
+
+def listing_key(host, query_params):
+    """
+    Return the cache key of a listing page. Query parameters are
+    normalized, so their order and empty values do not create new entries.
+    """
+    query = urlencode(sorted(
+        (name, value) for name in query_params for value in query_params.getlist(name) if value
+    ))
+    digest = hashlib.md5(f"{host}?{query}".encode()).hexdigest()
+    return LISTING_KEY.format(digest=digest)
+
+
+def tag_versions(tags):
+    """
+    Return the current version of each tag, creating missing ones.
+
+    Returns:
+        dict: {tag: version}
+    """
+    keys = {TAG_KEY.format(tag=tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, time.time_ns(), timeout=settings.PUBLIC_STARTUPS_CACHE_TIMEOUT)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def record(outcome):
+    key = METRIC_KEY.format(outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def get_listing(host, query_params):
+    """
+    Return a cached listing page, or None on a miss.
+
+    An entry is only served while none of its tags were invalidated after
+    it was stored. Every lookup is counted as a hit or a miss.
+    """
+    entry = cache.get(listing_key(host, query_params))
+    if entry is not None:
+        keys = {TAG_KEY.format(tag=tag): version for tag, version in entry["versions"].items()}
+        if cache.get_many(keys) == keys:
+            record("hits")
+            return entry["data"]
+    record("misses")
+    return None
+
+
+def store_listing(host, query_params, data, startup_ids, versions):
+    """
+    Cache a listing page for PUBLIC_STARTUPS_CACHE_TIMEOUT seconds, tagged
+    with the startups it contains.
+
+    Args:
+        host: host the page was rendered for, as pagination links are absolute
+        query_params: QueryDict of the request
+        data: response data of the page
+        startup_ids: ids of the startups listed on the page
+        versions: tag versions read before the page was queried, so changes
+            committed while it was rendered invalidate it
+    """
+    versions = {**versions, **tag_versions(startup_tag(startup_id) for startup_id in startup_ids)}
+    cache.set(
+        listing_key(host, query_params),
+        {"versions": versions, "data": data},
+        timeout=settings.PUBLIC_STARTUPS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_tags(tags):
+    """
+    Give the tags new versions once the current transaction commits, which
+    invalidates every cached listing page carrying one of them.
+    """
+    keys = [TAG_KEY.format(tag=tag) for tag in tags]
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, timeout=settings.PUBLIC_STARTUPS_CACHE_TIMEOUT)
+        logger.debug(f"Invalidated public startup listings tagged {tags}")
+
+    transaction.on_commit(bump)
+
+
+def cache_metrics():
+    """
+    Return the hit and miss counters of the public listing cache.
+
+    Returns:
+        dict: {"hits": int, "misses": int, "hit_ratio": float | None}
+    """
+    counters = cache.get_many([METRIC_KEY.format(outcome=outcome) for outcome in ("hits", "misses")])
+    hits = counters.get(METRIC_KEY.format(outcome="hits"), 0)
+    misses = counters.get(METRIC_KEY.format(outcome="misses"), 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+
+
+def reset_cache_metrics():
+    cache.delete_many([METRIC_KEY.format(outcome=outcome) for outcome in ("hits", "misses")])
@@ -0,0 +1,21 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from profiles.listing_cache import cache_metrics, reset_cache_metrics
+
+
+class Command(BaseCommand):
+    help = "Print the hit and miss counters of the public startup listing cache as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true",
+            help="Reset the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(cache_metrics()))
+        if options["reset"]:
+            reset_cache_metrics()
+            self.stdout.write(self.style.SUCCESS("Public startup listing cache counters reset."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from profiles.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored facet counts of the public startup directory, "
+        "e.g. after bulk updates that bypass model signals."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"Stored {rows} startup facet counts."))
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_TRIGGER = """
+CREATE FUNCTION startup_profiles_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.company_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.industry, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.country, '') || ' ' || coalesce(NEW.city, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER startup_profiles_search_vector
+    BEFORE INSERT OR UPDATE OF company_name, industry, country, city, search_vector ON startup_profiles
+    FOR EACH ROW EXECUTE FUNCTION startup_profiles_search_vector();
+
+UPDATE startup_profiles SET search_vector = NULL;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS startup_profiles_search_vector ON startup_profiles;
+DROP FUNCTION IF EXISTS startup_profiles_search_vector();
+DROP INDEX IF EXISTS startup_company_name_trgm;
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    """
+    Maintain startup_profiles.search_vector in the database, so bulk
+    writes and raw SQL keep it in sync as well as the ORM.
+
+    The trigram index on company_name, used for typo-tolerant matching,
+    is only created where the pg_trgm extension is available.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_TRIGGER)
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")
+        if cursor.fetchone()[0]:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS startup_company_name_trgm "
+                "ON startup_profiles USING gin (company_name gin_trgm_ops)"
+            )
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_startupprofile_is_public'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='startupprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='startup_search_vector'),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
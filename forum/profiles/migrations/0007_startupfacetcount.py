@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-17 18:58
+
+from django.db import migrations, models
+from django.db.models import Count
+
+FACET_FIELDS = ("industry", "country", "city", "size")
+
+
+def populate_facet_counts(apps, schema_editor):
+    StartupProfile = apps.get_model("profiles", "StartupProfile")
+    StartupFacetCount = apps.get_model("profiles", "StartupFacetCount")
+    public = StartupProfile.objects.filter(is_public=True).order_by()
+    StartupFacetCount.objects.bulk_create(
+        StartupFacetCount(facet=field, value=row[field], count=row["count"])
+        for field in FACET_FIELDS
+        for row in public.values(field).annotate(count=Count("pk"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_startupprofile_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'startup_facet_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='startupfacetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_startup_facet_value'),
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, validate_email
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
@@ -25,6 +27,8 @@ class StartupProfile(models.Model):
         email (EmailField): The unique email address of the startup.
         description (TextField): A detailed description of the startup (max length: 1000 characters, optional).
         is_public (BooleanField): Whether the startup is public or not.
+        search_vector (SearchVectorField): Weighted full-text document of the name, industry and location,
+                                           maintained by a database trigger.
         created_at (DateTimeField): The date and time the profile was created.
         updated_at (DateTimeField): The date and time the profile was last updated.
     """
@@ -40,6 +44,7 @@ class StartupProfile(models.Model):
     email = models.EmailField(unique=True, db_index=True, validators=[validate_email])
     description = models.TextField(max_length=1000, blank=True, null=True)
     is_public = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -48,6 +53,7 @@ class StartupProfile(models.Model):
         verbose_name = "Startup Profile"
         verbose_name_plural = "Startup Profiles"
         ordering = ["-created_at"]
+        indexes = [GinIndex(fields=["search_vector"], name="startup_search_vector")]
 
     def __str__(self):
         return (
@@ -111,3 +117,25 @@ class InvestorProfile(models.Model):
             f"email={self.email}"
             f")"
         )
+
+
+class StartupFacetCount(models.Model):
+    """
+    Number of public startups per value of a facet field, kept up to date
+    incrementally whenever a StartupProfile is saved or deleted.
+
+    Attributes:
+        facet (CharField): The StartupProfile field counted (industry, country, city or size).
+        value (CharField): The value of the field.
+        count (IntegerField): The number of public startups with that value.
+    """
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "startup_facet_counts"
+        constraints = [models.UniqueConstraint(fields=["facet", "value"], name="unique_startup_facet_value")]
+
+    def __str__(self):
+        return f"StartupFacetCount(facet={self.facet}, value={self.value}, count={self.count})"
@@ -58,7 +58,7 @@ class StartupProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = StartupProfile
-        fields = '__all__'
+        exclude = ['search_vector']
         read_only_fields = ['user']
 
     def validate(self, data):
@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .facets import FACET_FIELDS, apply_facet_changes, facet_values
+from .listing_cache import DIRECTORY_FIELDS, DIRECTORY_TAG, invalidate_tags, startup_tag
+from .models import StartupProfile
+
+TRACKED_FIELDS = ("is_public", *dict.fromkeys((*FACET_FIELDS, *DIRECTORY_FIELDS)))
+
+
+def tracked_values(startup):
+    return {field: getattr(startup, field) for field in TRACKED_FIELDS}
+
+
+def invalidate_listings(startup, previous, current):
+    """
+    Invalidate the cached public listings a startup change can affect.
+
+    Startups entering or leaving the public directory, or changing a field
+    listings are filtered, searched or ordered by, invalidate every listing;
+    other changes of a public startup only the pages that show it.
+    """
+    was_public = bool(previous and previous["is_public"])
+    is_public = bool(current and current["is_public"])
+    if not was_public and not is_public:
+        return
+    if was_public != is_public or any(previous[field] != current[field] for field in DIRECTORY_FIELDS):
+        invalidate_tags([DIRECTORY_TAG])
+    else:
+        invalidate_tags([startup_tag(startup.pk)])
+
+
+@receiver(pre_save, sender=StartupProfile)
+def remember_tracked_values(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler that keeps the stored values of a startup before it is
+    saved, so post_save can tell what changed.
+    """
+    if raw or instance.pk is None:
+        instance._previous_values = None
+        return
+    instance._previous_values = StartupProfile.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+
+
+@receiver(post_save, sender=StartupProfile)
+def startup_saved(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler that updates the StartupFacetCount aggregate and
+    invalidates cached public listings after a startup is created or changed.
+    """
+    if raw:
+        return
+    previous = getattr(instance, "_previous_values", None)
+    current = tracked_values(instance)
+    apply_facet_changes(facet_values(previous), facet_values(current))
+    invalidate_listings(instance, previous, current)
+
+
+@receiver(post_delete, sender=StartupProfile)
+def startup_deleted(sender, instance, **kwargs):
+    """
+    Signal handler that removes a deleted startup from the StartupFacetCount
+    aggregate and from cached public listings.
+    """
+    previous = tracked_values(instance)
+    apply_facet_changes(facet_values(previous), None)
+    invalidate_listings(instance, previous, None)
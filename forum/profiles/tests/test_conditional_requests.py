@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from profiles.models import InvestorProfile
+from profiles.tests.test_startup_search import create_startup
+from projects.models import Description, Project
+
+User = get_user_model()
+
+
+class StartupConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        self.startup = create_startup("Nimbus Robotics")
+        self.project = Project.objects.create(title="Arm", funding_goal="1000", startup=self.startup)
+        Description.objects.create(project=self.project, description="First arm")
+        self.client.force_authenticate(self.startup.user)
+        self.list_url = reverse('profiles:startup-profile-list')
+        self.detail_url = reverse('profiles:startup-profile-detail', args=[self.startup.pk])
+
+    def assertNotModified(self, url, etag):
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unchanged_list_returns_not_modified(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Last-Modified', response)
+
+        self.assertNotModified(self.list_url, response['ETag'])
+
+    def test_unchanged_detail_returns_not_modified_without_serializing(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        # The startup, then the ETag aggregate; its projects are only prefetched to render
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_nested_project_changes_change_the_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        self.project.description.description = "Second arm"
+        self.project.description.save()
+        changed = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data['projects'][0]['description'], "Second arm")
+
+        Project.objects.create(title="Leg", funding_goal="1000", startup=self.startup).delete()
+        self.project.delete()
+        deleted = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+        self.assertEqual(deleted.data['projects'], [])
+
+    def test_list_etag_follows_filters(self):
+        create_startup("Harvest Bakery", industry="Food")
+        everything = self.client.get(self.list_url)['ETag']
+
+        response = self.client.get(self.list_url, {'industry': 'Food'}, HTTP_IF_NONE_MATCH=everything)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+
+class SavedStartupsConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        self.older = create_startup("Harvest Bakery")
+        self.followed = create_startup("Nimbus Robotics")
+        # Followed throughout and updated last, so the latest timestamp never moves
+        self.newest = create_startup("Orbit Logistics")
+        user = User.objects.create_user(email="follower@example.com", password="Passw0rd!")
+        self.investor = InvestorProfile.objects.create(
+            user=user, country="USA", city="Denver", zip_code="80202", email="desk@follower.com"
+        )
+        self.investor.followed_startups.add(self.followed, self.newest)
+        self.client.force_authenticate(user)
+        self.url = reverse('profiles:startups-list')
+
+    def test_swapping_a_followed_startup_for_an_older_one_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.investor.followed_startups.remove(self.followed)
+        self.investor.followed_startups.add(self.older)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual([startup['id'] for startup in response.data], [self.older.pk, self.newest.pk])
+
+
+class InvestorConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="investor@example.com", password="Passw0rd!")
+        self.investor = InvestorProfile.objects.create(
+            user=user, country="USA", city="Denver", zip_code="80202", email="desk@investor.com"
+        )
+        self.client.force_authenticate(user)
+        self.url = reverse('profiles:investor-profile-detail', args=[self.investor.pk])
+
+    def test_detail_is_validated_by_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+
+        not_modified = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
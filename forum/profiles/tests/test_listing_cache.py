@@ -0,0 +1,90 @@
+from io import StringIO
+import json
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import QueryDict
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from profiles.listing_cache import cache_metrics, listing_key
+from profiles.tests.test_startup_search import create_startup
+
+
+class PublicListingCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('profiles:public-startups-list')
+        self.nimbus = create_startup("Nimbus Robotics", industry="Technology")
+        self.harvest = create_startup("Harvest Bakery", industry="Food")
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def save(self, startup, **fields):
+        for field, value in fields.items():
+            setattr(startup, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            startup.save()
+
+    def test_key_ignores_parameter_order_and_empty_values(self):
+        self.assertEqual(
+            listing_key('testserver', QueryDict('industry=Food&search=&page=1')),
+            listing_key('testserver', QueryDict('page=1&industry=Food')),
+        )
+        self.assertNotEqual(
+            listing_key('testserver', QueryDict('page=1')),
+            listing_key('testserver', QueryDict('page=2')),
+        )
+
+    def test_repeated_listing_is_served_from_cache(self):
+        first = self.get(industry='Food')
+        with self.assertNumQueries(0):
+            second = self.get(industry='Food')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(cache_metrics(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_change_of_listed_startup_invalidates_its_pages_only(self):
+        self.get(industry='Food')
+        self.get(industry='Technology')
+
+        self.save(self.harvest, description="Sourdough every morning")
+
+        food = self.get(industry='Food')
+        self.assertEqual(food['X-Cache'], 'MISS')
+        self.assertEqual(food.data['results'][0]['description'], "Sourdough every morning")
+        self.assertEqual(self.get(industry='Technology')['X-Cache'], 'HIT')
+
+    def test_startups_entering_or_leaving_the_directory_invalidate_every_page(self):
+        self.get(industry='Technology')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_startup("Pixel Labs", industry="Technology")
+        self.assertEqual(self.get(industry='Technology').data['count'], 2)
+
+        self.save(self.nimbus, is_public=False)
+        self.assertEqual(self.get(industry='Technology').data['count'], 1)
+
+    def test_deleted_startup_invalidates_its_pages(self):
+        self.get(industry='Food')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.harvest.delete()
+
+        self.assertEqual(self.get(industry='Food').data['count'], 0)
+
+    def test_stats_command_prints_and_resets_counters(self):
+        self.get()
+        self.get()
+        out = StringIO()
+
+        call_command('public_startups_cache_stats', '--reset', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue().splitlines()[0]), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertEqual(cache_metrics()['hits'], 0)
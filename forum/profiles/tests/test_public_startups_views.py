@@ -2,6 +2,7 @@ from faker import Faker
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from profiles.models import StartupProfile
 
@@ -11,6 +12,7 @@ fake = Faker()
 
 class PublicStartupTestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         User.objects.all().delete()
         StartupProfile.objects.all().delete()
         self.url = reverse('profiles:public-startups-list')
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from profiles.models import InvestorProfile
+from profiles.tests.test_startup_search import create_startup
+from profiles.views import SaveStartupViewSet
+from projects.models import Description, Project
+
+User = get_user_model()
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Endpoints must run a fixed number of queries, however many startups
+    and nested projects they return.
+
+    Each budget is checked twice, before and after more rows are added.
+    """
+    LIST_BUDGET = 3  # ETag aggregate, startups, projects with descriptions
+    DETAIL_BUDGET = 3  # startup, its projects with descriptions, ETag aggregate
+    SAVED_BUDGET = 4  # investor, ETag aggregate, followed startups, projects with descriptions
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="investor@example.com", password="Passw0rd!")
+        self.investor = InvestorProfile.objects.create(
+            user=self.user, country="USA", city="Denver", zip_code="80202", email="desk@investor.com"
+        )
+        self.client.force_authenticate(self.user)
+        self.startups = []
+        self.add_startups(2)
+
+    def add_startups(self, count):
+        for index in range(count):
+            startup = create_startup(f"Startup {len(self.startups)}")
+            for title in ("Arm", "Leg", "Eye"):
+                project = Project.objects.create(title=title, funding_goal="1000", startup=startup, is_published=True)
+                if title != "Eye":
+                    Description.objects.create(project=project, description=f"{title} of {startup.company_name}")
+            self.investor.followed_startups.add(startup)
+            self.startups.append(startup)
+
+    def assertQueryBudget(self, budget, url):
+        for _ in range(2):
+            with self.assertNumQueries(budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.add_startups(3)
+        return response
+
+    def test_startup_list_budget(self):
+        response = self.assertQueryBudget(self.LIST_BUDGET, reverse('profiles:startup-profile-list'))
+
+        startup = next(item for item in response.data if item['company_name'] == 'Startup 0')
+        self.assertEqual(
+            sorted(project['description'] for project in startup['projects'] if project['description']),
+            ['Arm of Startup 0', 'Leg of Startup 0'],
+        )
+
+    def test_startup_detail_budget(self):
+        url = reverse('profiles:startup-profile-detail', args=[self.startups[0].pk])
+        response = self.assertQueryBudget(self.DETAIL_BUDGET, url)
+
+        self.assertEqual(len(response.data['projects']), 3)
+
+    def test_saved_startups_budget(self):
+        response = self.assertQueryBudget(self.SAVED_BUDGET, reverse('profiles:startups-list'))
+
+        self.assertEqual(len(response.data), 5)
+
+    def test_project_list_budget(self):
+        self.assertQueryBudget(2, reverse('projects:projects-list'))
+
+    def test_favorite_actions_load_the_startup_user(self):
+        view = SaveStartupViewSet(action='save_startup', request=None)
+
+        startup = view.plan_queryset(type(self.startups[0]).objects.all()).get(pk=self.startups[0].pk)
+
+        with self.assertNumQueries(0):
+            str(startup)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from profiles.facets import facet_counts, stored_facet_counts
+from profiles.models import StartupProfile
+from profiles.tests.test_startup_search import create_startup
+
+
+class StartupFacetsTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('profiles:public-startups-facets')
+        self.startups = [
+            create_startup("Nimbus Robotics", industry="Technology", country="Germany", city="Berlin"),
+            create_startup("Pixel Labs", industry="Technology", country="USA", city="Denver"),
+            create_startup("Harvest Bakery", industry="Food", country="USA", city="Denver"),
+            create_startup("Stealth Co", industry="Finance", country="USA", city="Austin"),
+        ]
+        self.startups[-1].is_public = False
+        self.startups[-1].save()
+
+    def test_counts_every_facet_of_public_startups(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['industry'], [
+            {'value': 'Technology', 'count': 2},
+            {'value': 'Food', 'count': 1},
+        ])
+        self.assertEqual(response.data['country'], [
+            {'value': 'USA', 'count': 2},
+            {'value': 'Germany', 'count': 1},
+        ])
+        self.assertEqual(response.data['city'], [
+            {'value': 'Denver', 'count': 2},
+            {'value': 'Berlin', 'count': 1},
+        ])
+        self.assertEqual(response.data['size'], [{'value': '10', 'count': 3}])
+
+    def test_counts_follow_search_and_filters(self):
+        response = self.client.get(self.url, {'country': 'USA', 'search': 'labs'})
+
+        self.assertEqual(response.data['industry'], [{'value': 'Technology', 'count': 1}])
+        self.assertEqual(response.data['city'], [{'value': 'Denver', 'count': 1}])
+
+    def test_facets_are_computed_in_one_query(self):
+        with self.assertNumQueries(1):
+            facet_counts(StartupProfile.objects.filter(is_public=True))
+
+    def test_unfiltered_directory_is_read_from_stored_counts(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data, facet_counts(StartupProfile.objects.filter(is_public=True)))
+
+    def test_each_facet_is_limited_to_most_frequent_values(self):
+        counts = facet_counts(StartupProfile.objects.filter(pk__in=[startup.pk for startup in self.startups]), limit=1)
+
+        self.assertEqual(counts['country'], [{'value': 'USA', 'count': 3}])
+        self.assertEqual(counts['industry'], [{'value': 'Technology', 'count': 2}])
+
+    def test_stored_counts_follow_saves_and_deletes(self):
+        nimbus = self.startups[0]
+        nimbus.country = "USA"
+        nimbus.save()
+        self.startups[1].delete()
+
+        self.assertEqual(stored_facet_counts()['country'], [{'value': 'USA', 'count': 2}])
+        self.assertEqual(stored_facet_counts()['industry'], [
+            {'value': 'Food', 'count': 1},
+            {'value': 'Technology', 'count': 1},
+        ])
+
+    def test_rebuild_matches_incremental_counts(self):
+        stored = stored_facet_counts()
+        StartupProfile.objects.filter(pk=self.startups[1].pk).update(is_public=False)
+
+        call_command('rebuild_startup_facets', stdout=StringIO())
+
+        self.assertNotEqual(stored_facet_counts(), stored)
+        self.assertEqual(stored_facet_counts(), facet_counts(StartupProfile.objects.filter(is_public=True)))
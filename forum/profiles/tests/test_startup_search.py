@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from profiles.filters import prefix_query, trigram_enabled
+from profiles.models import StartupProfile
+
+User = get_user_model()
+
+
+def create_startup(company_name, industry="Technology", country="USA", city="Denver"):
+    user = User.objects.create_user(email=f"{company_name.replace(' ', '').lower()}@example.com", password="Passw0rd!")
+    return StartupProfile.objects.create(
+        user=user,
+        company_name=company_name,
+        industry=industry,
+        size="10",
+        country=country,
+        city=city,
+        zip_code="80202",
+        email=f"contact@{company_name.replace(' ', '').lower()}.com",
+        is_public=True,
+    )
+
+
+class StartupSearchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('profiles:public-startups-list')
+        self.robotics = create_startup("Nimbus Robotics", industry="Manufacturing", city="Berlin", country="Germany")
+        self.analytics = create_startup("Robotics Analytics Lab", industry="Finance")
+        self.bakery = create_startup("Harvest Bakery", industry="Food")
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {'search': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [startup['id'] for startup in response.data['results']]
+
+    def test_prefix_query_matches_every_word_as_prefix(self):
+        self.assertEqual(prefix_query(['Nimbus Rob', "o'brien"]), 'nimbus:* & rob:* & o:* & brien:*')
+        self.assertEqual(prefix_query(['&!:*']), '')
+
+    def test_search_vector_is_maintained_on_insert_and_update(self):
+        self.assertEqual(self.search('harv'), [self.bakery.id])
+
+        self.bakery.company_name = "Golden Oven"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bakery.save()
+
+        self.assertEqual(self.search('harv'), [])
+        self.assertEqual(self.search('gold ove'), [self.bakery.id])
+
+    def test_search_matches_industry_and_location_prefixes(self):
+        self.assertEqual(self.search('manufact'), [self.robotics.id])
+        self.assertEqual(self.search('berl germ'), [self.robotics.id])
+
+    def test_results_are_ranked_by_relevance(self):
+        supplier = create_startup("Gear Supply", industry="Robotics")
+
+        self.assertEqual(self.search('robotics analytics'), [self.analytics.id])
+        # Name matches outrank the newer industry match; equal ranks keep the default ordering
+        self.assertEqual(self.search('robot'), [self.analytics.id, self.robotics.id, supplier.id])
+
+    def test_explicit_ordering_overrides_rank(self):
+        ids = self.search('robot', ordering='-company_name')
+        self.assertEqual(ids, [self.analytics.id, self.robotics.id])
+
+    def test_punctuation_only_search_returns_everything(self):
+        response = self.client.get(self.url, {'search': '&!'})
+        self.assertEqual(response.data['count'], 3)
+
+    def test_typos_in_company_name_still_match(self):
+        if connection.vendor != 'postgresql' or not trigram_enabled(connection.alias):
+            self.skipTest('pg_trgm is not installed')
+        self.assertIn(self.robotics.id, self.search('Nimbos Robotcs'))
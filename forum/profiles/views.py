@@ -1,14 +1,17 @@
 from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from django_ratelimit.decorators import ratelimit
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from forum.conditional import ConditionalGetMixin
+from forum.query_plans import QueryPlanMixin
 from projects.models import Project
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.mixins import ListModelMixin
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
@@ -16,24 +19,32 @@ from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from .facets import facet_counts, stored_facet_counts
+from .filters import StartupSearchFilter
+from .listing_cache import DIRECTORY_TAG, get_listing, store_listing, tag_versions
 from .models import InvestorProfile, StartupProfile
 from .permissions import IsOwnerOrReadOnly, IsStartup, IsInvestor
 from .serializers import InvestorProfileSerializer, StartupProfileSerializer, PublicStartupProfileSerializer
 
+# Timestamps of everything StartupProfileSerializer renders, including nested projects
+STARTUP_TIMESTAMPS = ['updated_at', 'projects__updated_at', 'projects__description__updated_at']
 
-class InvestorViewSet(ModelViewSet):
+# Nested projects of StartupProfileSerializer, with the description each one renders
+PROJECTS_WITH_DESCRIPTION = Prefetch('projects', queryset=Project.objects.select_related('description'))
+
+
+class InvestorViewSet(ConditionalGetMixin, QueryPlanMixin, ModelViewSet):
     """
     API Endpoint for Investor Profiles
     """
     queryset = InvestorProfile.objects.all()
     serializer_class = InvestorProfileSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly, IsInvestor]
+    query_plans = {'default': {'select_related': ['user']}}
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return InvestorProfile.objects.filter(user=self.request.user).select_related(
-                "user"
-            )
+            return self.plan_queryset(InvestorProfile.objects.filter(user=self.request.user))
         return InvestorProfile.objects.none()
 
     def perform_create(self, serializer):
@@ -46,15 +57,18 @@ class InvestorViewSet(ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class StartupProfileViewSet(ModelViewSet):
+class StartupProfileViewSet(ConditionalGetMixin, QueryPlanMixin, ModelViewSet):
     """
     API Endpoint for Startup Profiles
     """
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly, IsStartup]
     queryset = StartupProfile.objects.all().order_by('company_name', 'created_at')
     serializer_class = StartupProfileSerializer
+    conditional_timestamps = STARTUP_TIMESTAMPS
+    conditional_counts = ['projects']
+    query_plans = {'default': {'prefetch_related': [PROJECTS_WITH_DESCRIPTION]}}
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StartupSearchFilter, OrderingFilter]
     search_fields = ['company_name', 'industry', 'country', 'city']
     filterset_fields = ['industry', 'country', 'city', 'size']
     ordering_fields = ['company_name', 'created_at']
@@ -91,27 +105,34 @@ class StartupProfileViewSet(ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class SaveStartupViewSet(ListModelMixin, GenericViewSet):
+class SaveStartupViewSet(ConditionalGetMixin, QueryPlanMixin, ListModelMixin, GenericViewSet):
     """Managing user's favourite startups"""
     permission_classes = [IsAuthenticated]
     serializer_class = StartupProfileSerializer
+    conditional_timestamps = STARTUP_TIMESTAMPS
+    conditional_counts = ['projects']
+    query_plans = {
+        'list': {'prefetch_related': [PROJECTS_WITH_DESCRIPTION]},
+        # StartupProfile.__str__ in the response detail reads the user
+        'save_startup': {'select_related': ['user']},
+        'delete_favorite': {'select_related': ['user']},
+    }
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StartupSearchFilter, OrderingFilter]
 
     search_fields = ['company_name', 'industry', 'country', 'city']
     filterset_fields = ['industry', 'country', 'city', 'size']
     ordering_fields = ['company_name', 'created_at']
 
+    @cached_property
+    def investor(self):
+        """The current user's investor profile, looked up once per request"""
+        return get_object_or_404(InvestorProfile, user=self.request.user)
+
     def get_queryset(self):
         """Returns queryset for current user's saved startups"""
         if self.request.user.is_authenticated:
-            investor = get_object_or_404(InvestorProfile, user=self.request.user)
-            return investor.followed_startups.prefetch_related(
-                Prefetch(
-                    'projects',
-                    queryset=Project.objects.select_related('description')
-                )
-            )
+            return self.plan_queryset(self.investor.followed_startups.all())
 
     def get_serializer_class(self):
         """Returns the appropriate serializer class based on the action"""
@@ -149,8 +170,8 @@ class SaveStartupViewSet(ListModelMixin, GenericViewSet):
         return super().list(request, *args, **kwargs)
 
     def get_investor_and_startup(self, startup_pk: int) -> tuple:
-        investor = get_object_or_404(InvestorProfile, user=self.request.user)
-        startup = get_object_or_404(StartupProfile, pk=startup_pk)
+        investor = self.investor
+        startup = get_object_or_404(self.plan_queryset(StartupProfile.objects.all()), pk=startup_pk)
         startup_exists = startup.followers.filter(pk=investor.pk).exists()
         return investor, startup, startup_exists
 
@@ -182,17 +203,50 @@ class PublicStartupViewSet(ListModelMixin, GenericViewSet):
     queryset = StartupProfile.objects.filter(is_public=True)
     pagination_class = PageNumberPagination
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, StartupSearchFilter]
     filterset_fields = ['industry', 'country', 'city']
     search_fields = ['company_name', 'industry', 'country', 'city']
     ordering_fields = ['company_name', 'created_at']
 
     @swagger_auto_schema(tags=['Public Startups'])
     def list(self, request, *args, **kwargs):
+        """
+        Pages are served from the shared cache, keyed by the normalized query
+        string; the X-Cache header tells whether a page was a HIT or a MISS.
+        """
+        host = request.get_host()
+        data = get_listing(host, request.query_params)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        versions = tag_versions([DIRECTORY_TAG])
         try:
-            return super().list(request, *args, **kwargs)
+            response = super().list(request, *args, **kwargs)
         except Exception as e:
             return Response(
                 {'error': '"Invalid filter or search parameter."'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if response.status_code == status.HTTP_200_OK:
+            startup_ids = [startup['id'] for startup in response.data['results']]
+            store_listing(host, request.query_params, response.data, startup_ids, versions)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @swagger_auto_schema(
+        tags=['Public Startups'],
+        operation_summary="Facet counts of public startups",
+        operation_description=(
+                "Returns the number of startups per `industry`, `country`, `city` and `size` "
+                "for the current search and filters, most frequent values first. Counts of the whole "
+                "directory are read from a precomputed aggregate."
+        ),
+    )
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Counts of the filtered public startups per facet value"""
+        params = (*self.filterset_fields, StartupSearchFilter.search_param)
+        if not any(request.query_params.get(param) for param in params):
+            return Response(stored_facet_counts())
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(facet_counts(queryset))
@@ -286,3 +286,17 @@ class ProjectTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         for project in response.data:
             self.assertEqual(project['is_published'], True)
+
+    def test_unchanged_project_returns_not_modified(self):
+        """Test that a project is not sent again until it or its description changes"""
+        url = reverse('projects:projects-detail', kwargs={'pk': self.project1.pk})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Description.objects.create(project=self.project1, description='New description')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'New description')
@@ -9,6 +9,8 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from forum.conditional import ConditionalGetMixin
+from forum.query_plans import QueryPlanMixin
 
 
 from .models import Project
@@ -17,19 +19,21 @@ from .serializers import ProjectSerializer, InvestmentCreateSerializer
 from .permissions import IsOwnerOrReadOnly
 
 
-class ProjectViewSet(ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, QueryPlanMixin, ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
-    queryset = Project.objects.select_related('description')
+    queryset = Project.objects.all()
     serializer_class = ProjectSerializer
+    conditional_timestamps = ['updated_at', 'description__updated_at']
+    query_plans = {'default': {'select_related': ['description']}}
 
     def get_queryset(self):
         """
         Override the default queryset for GET method (list).
         """
         if self.action in ['list']:
-            return Project.objects.select_related('description').filter(is_published=True)
+            return self.plan_queryset(Project.objects.filter(is_published=True))
         else:
-            return self.queryset
+            return self.plan_queryset(self.queryset)
 
     def perform_create(self, serializer):
         """Automatically assigns project to correct startup based on user's token"""
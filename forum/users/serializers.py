@@ -9,19 +9,16 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import CustomUser, Role
 import logging
 from django.db import transaction
-from notifications.models import(
-    NotificationCategory,
-    NotificationMethod,
-    NotificationPreference
-)
+from notifications.models import NotificationPreference
+from notifications.registry import registry
 
 logger = logging.getLogger(__name__)
 
 def create_default_notification_preferences(user):
     try:
         with transaction.atomic():
-            default_methods = NotificationMethod.objects.filter(name__in=["email", "in_app"])
-            default_categories = NotificationCategory.objects.filter(name__in=["follow", "profile_update", "new_project"])
+            default_methods = registry.methods(["email", "in_app"])
+            default_categories = registry.categories(["follow", "profile_update", "new_project"])
             notification_preference = NotificationPreference.objects.create(user=user)
             notification_preference.allowed_notification_methods.set(default_methods)
             notification_preference.allowed_notification_categories.set(default_categories)